@@ -31,14 +31,41 @@ import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass, asdict
-from typing import List, Literal, Optional, Dict, Any
+from dataclasses import dataclass, asdict, fields, MISSING
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Literal, Optional, Dict, Any, Tuple
+import hashlib
 import json
 from pathlib import Path
 import io
 import base64
-
-@dataclass
+import re
+import sys
+import threading
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional: without it the simulation kernels run as plain Python
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
+
+# dataclass(slots=True) drops the per-instance __dict__ (Python 3.10+)
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
 class LiquidityEvent:
     """Represents a liquidity event (one-time or recurring cash flow)."""
     type: str
@@ -66,7 +93,22 @@ class LiquidityEvent:
         return cls(**data)
 
 
-@dataclass
+LIQUIDITY_EVENT_FIELDS = tuple(field.name for field in fields(LiquidityEvent))
+# Defaults for the optional event fields; older saved events may omit them
+LIQUIDITY_EVENT_DEFAULTS = {field.name: field.default for field in fields(LiquidityEvent) if field.default is not MISSING}
+
+
+@lru_cache(maxsize=256)
+def _event_from_items(items: frozenset) -> LiquidityEvent:
+    return LiquidityEvent.from_dict(dict(items))
+
+
+def event_from_dict(data: Dict[str, Any]) -> LiquidityEvent:
+    """LiquidityEvent.from_dict memoized on the event's contents; repeated events within a run share one instance."""
+    return _event_from_items(frozenset(data.items()))
+
+
+@dataclass(**DATACLASS_OPTIONS)
 class TimelineRow:
     """Single year in projection timeline."""
     age: int
@@ -82,9 +124,9 @@ class TimelineRow:
     end_balance_real: float
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
 class Scenario:
-    """Complete scenario configuration."""
+    """Complete scenario configuration (immutable; use dataclasses.replace to derive a modified copy)."""
     name: str
     current_age: int
     retirement_age: int
@@ -100,7 +142,7 @@ class Scenario:
     withdrawal_pct: float
     withdrawal_real_amount: float
     withdrawal_frequency: str
-    liquidity_events: List[Dict[str, Any]]
+    liquidity_events: Tuple[Dict[str, Any], ...]
     enable_mc: bool
     mc_runs: int
     enable_taxes: bool
@@ -110,6 +152,10 @@ class Scenario:
     black_swan_age: int = 70
     black_swan_loss_pct: float = 50.0
     
+    def __post_init__(self):
+        # Store events as a tuple so the whole scenario is immutable
+        object.__setattr__(self, 'liquidity_events', tuple(self.liquidity_events))
+    
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
     
@@ -122,13 +168,155 @@ class Scenario:
             data['black_swan_age'] = 70
         if 'black_swan_loss_pct' not in data:
             data['black_swan_loss_pct'] = 50.0
+        # Events are saved column-wise; older files store one dict per event
+        if isinstance(data.get('liquidity_events'), dict):
+            data['liquidity_events'] = _events_from_columns(data['liquidity_events'])
         return cls(**data)
 
 
+# Scenario fields restored into session_state (same key names) when a scenario is loaded
+SCENARIO_SESSION_FIELDS = (
+    'current_age', 'retirement_age', 'end_age', 'current_balance',
+    'contrib_amount', 'contrib_cadence', 'nominal_return_pct', 'return_stdev_pct',
+    'inflation_pct', 'fee_pct', 'withdrawal_method', 'withdrawal_pct',
+    'withdrawal_real_amount', 'withdrawal_frequency', 'enable_mc', 'mc_runs',
+    'enable_taxes', 'effective_tax_rate_pct', 'inflation_enabled'
+)
+
+
 # Gordon Goss Brand Colors (Rolex-inspired)
 BRAND_PRIMARY = "#003d29"      # Deep forest green (Rolex green)
 BRAND_SECONDARY = "#c9a961"    # Champagne gold
 
+# Page-wide stylesheet, including the compact sidebar scenario buttons
+APP_CSS = """
+<style>
+/* Gordon Goss Brand Styling */
+.main {
+    background-color: #ffffff;
+}
+
+/* Header styling */
+h1, h2, h3 {
+    color: #003d29 !important;
+    font-family: 'Helvetica Neue', Arial, sans-serif;
+    font-weight: 300;
+    letter-spacing: 0.5px;
+}
+
+h1 {
+    font-size: 2.5rem !important;
+    margin-bottom: 0.5rem !important;
+    border-bottom: 2px solid #c9a961;
+    padding-bottom: 1rem;
+}
+
+/* Sidebar styling */
+[data-testid="stSidebar"] {
+    background-color: #f8f8f8;
+    border-right: 1px solid #e0e0e0;
+}
+
+[data-testid="stSidebar"] h1, 
+[data-testid="stSidebar"] h2, 
+[data-testid="stSidebar"] h3 {
+    color: #003d29 !important;
+}
+
+/* Metrics styling */
+[data-testid="stMetricValue"] {
+    color: #003d29 !important;
+    font-weight: 400;
+}
+
+[data-testid="stMetricLabel"] {
+    color: #2c2c2c !important;
+    font-size: 0.9rem;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+/* Button styling */
+.stButton > button {
+    background-color: #003d29;
+    color: white;
+    border: none;
+    padding: 0.5rem 2rem;
+    font-weight: 400;
+    letter-spacing: 0.5px;
+    transition: all 0.3s ease;
+}
+
+.stButton > button:hover {
+    background-color: #00563a;
+    box-shadow: 0 2px 8px rgba(0, 61, 41, 0.3);
+}
+
+/* Download button styling */
+.stDownloadButton > button {
+    background-color: #c9a961;
+    color: #1a1a1a;
+    border: none;
+    padding: 0.5rem 2rem;
+    font-weight: 400;
+    letter-spacing: 0.5px;
+}
+
+.stDownloadButton > button:hover {
+    background-color: #d4b56d;
+    box-shadow: 0 2px 8px rgba(201, 169, 97, 0.4);
+}
+
+/* Dataframe styling */
+.dataframe {
+    font-family: 'Helvetica Neue', Arial, sans-serif;
+    font-size: 0.9rem;
+}
+
+/* Info/warning box styling */
+.stAlert {
+    border-left: 4px solid #c9a961;
+}
+
+/* Expander styling */
+.streamlit-expanderHeader {
+    background-color: #f8f8f8;
+    border: 1px solid #e0e0e0;
+    color: #003d29;
+    font-weight: 400;
+}
+
+/* Compact sidebar scenario buttons */
+div[data-testid="stSidebar"] button[kind="primary"],
+div[data-testid="stSidebar"] button[kind="secondary"] {
+    font-size: 11px !important;
+    padding: 0.5rem 0.3rem !important;
+    line-height: 1.2 !important;
+    min-height: 2.5rem !important;
+    max-height: 2.5rem !important;
+    white-space: nowrap !important;
+    overflow: hidden !important;
+    text-overflow: clip !important;
+    width: 100% !important;
+}
+div[data-testid="stSidebar"] button p {
+    font-size: 11px !important;
+    margin: 0 !important;
+    white-space: nowrap !important;
+}
+div[data-testid="stSidebar"] div[data-testid="column"] {
+    padding: 0 2px !important;
+}
+
+/* Rule above each sidebar expander, in place of separate "---" markdown elements */
+div[data-testid="stSidebar"] div[data-testid="stExpander"] {
+    border-top: 1px solid #e0e0e0;
+    margin-top: 1rem;
+    padding-top: 1rem;
+}
+</style>
+"""
+
 # Configuration Constants
 CURRENT_AGE = 30
 RETIREMENT_AGE = 65
@@ -144,8 +332,16 @@ WITHDRAWAL_REAL_AMOUNT = 50000
 ENABLE_MC = True
 MC_RUNS = 1000
 MC_SEED = 42
+MC_BLOCK_SIZE = 256  # Monte Carlo runs simulated together per block
 CURRENCY = "USD"
+# Sidebar/chart option lists (shared, never modified)
+CONTRIB_CADENCE_OPTIONS = ("Monthly", "Annual")
+WITHDRAWAL_METHOD_OPTIONS = ("Fixed % of prior-year end balance", "Fixed real dollars")
+WITHDRAWAL_FREQUENCY_OPTIONS = ("Annual", "Monthly")
+SHOW_VALUES_OPTIONS = ("Real", "Nominal")
+X_AXIS_OPTIONS = ("Age", "Year")
 SCENARIOS_FILE = Path("scenarios.json")
+CASHFLOW_TOTAL_COLUMNS = ['contributions', 'withdrawals', 'fees', 'taxes', 'growth', 'liquidity_net']
 # Default house sale example values (used for initial template events)
 HOUSE_SALE_AGE = 66
 HOUSE_SALE_NET = 250000
@@ -154,58 +350,317 @@ HOUSE_SALE_COSTS = 50000
 HOUSE_PURCHASE_AGE = 40
 HOUSE_PURCHASE_PRICE = 400000
 HOUSE_PURCHASE_DOWNPAYMENT = 80000
-    
-def apply_liquidity_events(
-    age: int,
-    events: List[LiquidityEvent]
-) -> tuple[float, List[str], float]:
+
+# Session-state defaults, merged in once at the top of each run
+SESSION_DEFAULTS = {
+    'page': "dashboard",
+    'current_age': CURRENT_AGE,
+    'retirement_age': RETIREMENT_AGE,
+    'end_age': END_AGE,
+    'current_balance': float(CURRENT_BALANCE),
+    'contrib_amount': float(CONTRIB_AMOUNT),
+    'contrib_cadence': 'Monthly',
+    'nominal_return_pct': NOMINAL_RETURN_PCT,
+    'inflation_pct': INFLATION_PCT,
+    'inflation_enabled': True,
+    'fee_pct': FEE_PCT,
+    'withdrawal_method': "Fixed % of prior-year end balance",
+    'withdrawal_pct': WITHDRAWAL_PCT,
+    'withdrawal_frequency': 'Annual',
+    'withdrawal_real_amount': float(WITHDRAWAL_REAL_AMOUNT),
+    'enable_mc': ENABLE_MC,
+    'mc_runs': MC_RUNS,
+    'return_stdev_pct': RETURN_STDEV_PCT,
+    'effective_tax_rate_pct': 0.0,
+    'liquidity_events_end_age': END_AGE,
+    'black_swan_enabled': False,
+    'black_swan_age': 70,
+    'black_swan_loss_pct': 50.0,
+    'selected_scenario_for_action': None,
+    'comparison_active': False,
+    'comparison_scenario_a': None,
+    'comparison_scenario_b': None,
+}
+    
+def precompute_liquidity(
+    events: List[LiquidityEvent],
+    current_age: int,
+    end_age: int
+) -> tuple[np.ndarray, np.ndarray]:
     """
-    Calculate net liquidity events for a given age.
-    Returns (net_amount, labels_list, event_taxes)
+    Resolve liquidity events into per-year arrays covering current_age..end_age.
+    Returns (net_by_year, taxes_by_year), indexed by age - current_age
 
     Note: Amounts should already be signed correctly:
     - Positive for inflows
     - Negative for outflows
     Only processes events where enabled=True
     """
-    net = 0.0
-    labels = []
-    event_taxes = 0.0
+    num_years = end_age - current_age + 1
+    net = np.zeros(num_years)
+    taxes = np.zeros(num_years)
     
     for event in events:
         # Skip disabled events
         if not event.enabled:
             continue
-            
-        # Check if event applies this age
-        if event.start_age <= age <= event.end_age:
-            if event.recurrence == "One-time":
-                # One-time events only apply at start_age
-                if age == event.start_age:
-                    amount = event.amount
-                    # Amount is already signed correctly (negative for debits)
-                    net += amount
-                    labels.append(event.label)
-                    
-                    # Calculate taxes if taxable and has positive value (credit/inflow)
-                    # Debits are negative so they won't be taxed
-                    if event.taxable and amount > 0:
-                        event_taxes += amount * (event.tax_rate / 100.0)
-            else:
-                # Recurring events (Annual or Monthly)
-                amount = event.amount
-                if event.recurrence == "Monthly":
-                    amount *= 12  # Annual aggregate
-                # Amount is already signed correctly (negative for debits)
-                net += amount
-                labels.append(event.label)
-                
-                # Calculate taxes if taxable and has positive value (credit/inflow)
-                # Debits are negative so they won't be taxed
-                if event.taxable and amount > 0:
-                    event_taxes += amount * (event.tax_rate / 100.0)
+        
+        if event.recurrence == "One-time":
+            # One-time events only apply at start_age
+            if event.start_age > event.end_age:
+                continue
+            start_age, last_age = event.start_age, event.start_age
+            amount = event.amount
+        else:
+            # Recurring events (Annual or Monthly)
+            start_age, last_age = event.start_age, event.end_age
+            amount = event.amount
+            if event.recurrence == "Monthly":
+                amount *= 12  # Annual aggregate
+        
+        # Clip the event window to the projection horizon
+        start_idx = max(start_age, current_age) - current_age
+        end_idx = min(last_age, end_age) - current_age
+        if start_idx > end_idx:
+            continue
+        
+        # Amount is already signed correctly (negative for debits)
+        net[start_idx:end_idx + 1] += amount
+        
+        # Calculate taxes if taxable and has positive value (credit/inflow)
+        # Debits are negative so they won't be taxed
+        if event.taxable and amount > 0:
+            taxes[start_idx:end_idx + 1] += amount * (event.tax_rate / 100.0)
     
-    return net, labels, event_taxes
+    return net, taxes
+
+
+@njit(cache=True)
+def _timeline_kernel(
+    current_balance, contributions, liquidity_net, liquidity_event_taxes,
+    withdrawal_pct_schedule, withdrawal_fixed_schedule,
+    fee_rate, tax_rate, nominal_return, black_swan_idx, black_swan_loss_pct
+):
+    """
+    Deterministic balance recursion over per-year input arrays.
+    Each year's withdrawal is balance * withdrawal_pct_schedule + withdrawal_fixed_schedule,
+    so the loop body has no branch on withdrawal method or retirement.
+    Returns (start_balance, withdrawals, fees, taxes, growth, end_balance_nominal)
+    """
+    num_years = contributions.shape[0]
+    start_balance = np.empty(num_years)
+    withdrawals = np.empty(num_years)
+    fees = np.empty(num_years)
+    taxes = np.empty(num_years)
+    growth = np.empty(num_years)
+    end_balance_nominal = np.empty(num_years)
+
+    balance = current_balance
+    for i in range(num_years):
+        start_balance[i] = balance
+
+        # Withdrawals (schedules are zero before retirement)
+        withdrawals[i] = balance * withdrawal_pct_schedule[i] + withdrawal_fixed_schedule[i]
+        fees[i] = balance * fee_rate
+        taxes[i] = liquidity_event_taxes[i] + withdrawals[i] * tax_rate
+
+        balance_after_cashflows = (
+            balance + contributions[i] + liquidity_net[i] - withdrawals[i] - fees[i] - taxes[i]
+        )
+        growth[i] = balance_after_cashflows * nominal_return
+        balance = balance_after_cashflows + growth[i]
+
+        # Black Swan event
+        if i == black_swan_idx:
+            balance -= balance * black_swan_loss_pct
+
+        end_balance_nominal[i] = balance
+
+    return start_balance, withdrawals, fees, taxes, growth, end_balance_nominal
+
+
+@njit(fastmath=True, cache=True)
+def _monte_carlo_kernel(
+    returns, current_balance, contributions, liquidity_net, liquidity_event_taxes,
+    cpi_index, withdrawal_pct_schedule, withdrawal_fixed_schedule,
+    fee_rate, tax_rate, show_real, return_paths
+):
+    """
+    Simulate every Monte Carlo path over a year-major (years, runs) matrix of
+    returns, so each year's returns for a block of runs are contiguous.
+    Runs are split into blocks of MC_BLOCK_SIZE; within a block all runs step
+    together one year at a time. The kernel is deliberately serial: Streamlit
+    calls it from script-runner threads, where Numba's parallel threading
+    layers either hang at interpreter exit (TBB) or abort on concurrent calls
+    (workqueue).
+    All arrays and rates are float32 so the simulation stays in single precision.
+    Returns (terminal_values, min_balances, paths); paths is (years, runs) and
+    has no rows unless return_paths is set
+    """
+    num_years, runs = returns.shape
+    terminal_values = np.empty(runs, dtype=np.float32)
+    min_balances = np.empty(runs, dtype=np.float32)
+    paths = np.empty((num_years if return_paths else 0, runs), dtype=np.float32)
+    num_blocks = (runs + MC_BLOCK_SIZE - 1) // MC_BLOCK_SIZE
+
+    for block_idx in range(num_blocks):
+        lo = block_idx * MC_BLOCK_SIZE
+        hi = min(lo + MC_BLOCK_SIZE, runs)
+        balance = np.full(hi - lo, current_balance, dtype=np.float32)
+        min_balance = balance.copy()
+
+        for year_idx in range(num_years):
+            # Withdrawals (schedules are zero before retirement)
+            withdrawals = balance * withdrawal_pct_schedule[year_idx] + withdrawal_fixed_schedule[year_idx]
+            fees = balance * fee_rate
+            taxes = liquidity_event_taxes[year_idx] + withdrawals * tax_rate
+
+            balance_after_cashflows = (
+                balance + contributions[year_idx] + liquidity_net[year_idx] - withdrawals - fees - taxes
+            )
+            balance = balance_after_cashflows + balance_after_cashflows * returns[year_idx, lo:hi]
+
+            np.minimum(min_balance, balance, min_balance)
+
+            # Store path in real or nominal values
+            if return_paths:
+                if show_real:
+                    paths[year_idx, lo:hi] = balance / cpi_index[year_idx]
+                else:
+                    paths[year_idx, lo:hi] = balance
+
+        # Each block writes only its own slice of the outputs
+        terminal_values[lo:hi] = balance
+        min_balances[lo:hi] = min_balance
+
+    return terminal_values, min_balances, paths
+
+
+def _warm_kernels():
+    """Compile (or load from the on-disk cache) both kernels on tiny inputs of the production types."""
+    ones = np.ones(2)
+    _timeline_kernel(1.0, ones, ones, ones, ones, ones, 0.0, 0.0, 0.0, -1, 0.0)
+    ones32 = ones.astype(np.float32)
+    zero32 = np.float32(0.0)
+    _monte_carlo_kernel(
+        np.zeros((2, 2), dtype=np.float32), np.float32(1.0), ones32, ones32, ones32,
+        ones32, ones32, ones32, zero32, zero32, True, True
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def start_kernel_warmup() -> Optional[threading.Thread]:
+    """
+    Warm the Numba kernels once per server process in a background thread,
+    so the first projection doesn't wait on JIT compilation / cache loading.
+    Both kernels are serial njit functions, so the warmup may overlap the first
+    script run's calls: Numba serializes compilation, and serial kernels are
+    safe to enter from several threads. Keep them serial (no parallel=True) or
+    this thread would race the script runner into the same threading layer.
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    thread = threading.Thread(target=_warm_kernels, name="kernel-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _timeline_inputs(
+    scenario: Scenario,
+    liquidity_events: List[LiquidityEvent]
+) -> tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Precompute everything _timeline_kernel needs for a scenario.
+    Returns (ages, cpi_index, kernel_kwargs)
+    """
+    # Read scenario fields once; string options become flags/multipliers
+    current_age = scenario.current_age
+    retirement_age = scenario.retirement_age
+    end_age = scenario.end_age
+    contrib_monthly = scenario.contrib_cadence == "Monthly"
+    withdrawal_is_pct = scenario.withdrawal_method == "Fixed % of prior-year end balance"
+    withdrawal_monthly_mult = 12 if scenario.withdrawal_frequency == "Monthly" else 1
+    inflation_rate = scenario.inflation_pct / 100.0
+    inflation_enabled = getattr(scenario, 'inflation_enabled', True)
+    black_swan_age = getattr(scenario, 'black_swan_age', None) if getattr(scenario, 'black_swan_enabled', False) else None
+
+    ages = np.arange(current_age, end_age + 1)
+    num_years = len(ages)
+
+    # Contributions (stop after retirement)
+    annual_contrib = scenario.contrib_amount * (12 if contrib_monthly else 1)
+    contributions = np.where(ages < retirement_age, float(annual_contrib), 0.0)
+
+    # Liquidity events
+    liquidity_net, liquidity_event_taxes = precompute_liquidity(liquidity_events, current_age, end_age)
+
+    # CPI index is 1.0 for the first two years, then compounds annually
+    # (inflation only applies to future years, not initial capital)
+    cpi_index = np.ones(num_years)
+    if inflation_enabled and num_years > 2:
+        cpi_index[2:] = np.cumprod(np.full(num_years - 2, 1 + inflation_rate))
+
+    # Withdrawals start at retirement; exactly one schedule is non-zero.
+    # Percentage is always annual; fixed real amounts are annualized
+    retired = ages >= retirement_age
+    withdrawal_pct_schedule = np.zeros(num_years)
+    withdrawal_fixed_schedule = np.zeros(num_years)
+    if withdrawal_is_pct:
+        withdrawal_pct_schedule[retired] = scenario.withdrawal_pct / 100.0
+    else:
+        withdrawal_real_annual = float(scenario.withdrawal_real_amount * withdrawal_monthly_mult)
+        withdrawal_fixed_schedule[retired] = withdrawal_real_annual * cpi_index[retired]
+
+    return ages, cpi_index, {
+        'current_balance': float(scenario.current_balance),
+        'contributions': contributions,
+        'liquidity_net': liquidity_net,
+        'liquidity_event_taxes': liquidity_event_taxes,
+        'withdrawal_pct_schedule': withdrawal_pct_schedule,
+        'withdrawal_fixed_schedule': withdrawal_fixed_schedule,
+        'fee_rate': scenario.fee_pct / 100.0,
+        'tax_rate': scenario.effective_tax_rate_pct / 100.0 if scenario.enable_taxes else 0.0,
+        'nominal_return': scenario.nominal_return_pct / 100.0,
+        'black_swan_idx': black_swan_age - current_age if black_swan_age is not None else -1,
+        'black_swan_loss_pct': getattr(scenario, 'black_swan_loss_pct', 50.0) / 100.0,
+    }
+
+
+def _simulate_timeline_arrays(
+    ages: np.ndarray,
+    cpi_index: np.ndarray,
+    kernel_kwargs: Dict[str, Any]
+) -> tuple[Dict[str, np.ndarray], Optional[int]]:
+    """
+    Run the deterministic kernel on precomputed inputs (see _timeline_inputs).
+    Returns (columns, first_shortfall_age) where columns maps each timeline
+    column name to its numpy array.
+    """
+    (start_balance, withdrawals, fees, taxes, growth,
+     end_balance_nominal) = _timeline_kernel(**kernel_kwargs)
+
+    # First shortfall is the first year the balance goes negative
+    shortfall = end_balance_nominal < 0
+    first_shortfall_idx = np.argmax(shortfall)
+    first_shortfall_age = int(ages[first_shortfall_idx]) if shortfall[first_shortfall_idx] else None
+
+    # Real balances are pointwise, so convert in one pass after the recursion
+    end_balance_real = end_balance_nominal / cpi_index
+
+    columns = {
+        'age': ages,
+        'start_balance_nominal': start_balance,
+        'contributions': kernel_kwargs['contributions'],
+        'liquidity_net': kernel_kwargs['liquidity_net'],
+        'withdrawals': withdrawals,
+        'fees': fees,
+        'taxes': taxes,
+        'growth': growth,
+        'end_balance_nominal': end_balance_nominal,
+        'cpi_index': cpi_index,
+        'end_balance_real': end_balance_real,
+    }
+    return columns, first_shortfall_age
 
 
 def build_timeline(
@@ -220,111 +675,15 @@ def build_timeline(
         (timeline_df, metrics_dict)
     """
 
-    rows = []
-    # Initialize
-    balance_nominal = scenario.current_balance
-    cpi_index = 1.0
-    inflation_rate = scenario.inflation_pct / 100.0
-    inflation_enabled = getattr(scenario, 'inflation_enabled', True)
-    nominal_return = scenario.nominal_return_pct / 100.0
-    fee_rate = scenario.fee_pct / 100.0
-    tax_rate = scenario.effective_tax_rate_pct / 100.0 if scenario.enable_taxes else 0.0
-    prior_year_end_balance = balance_nominal
-    first_shortfall_age = None
-
-    for age in range(scenario.current_age, scenario.end_age + 1):
-        start_balance = balance_nominal
-
-        # Contributions (stop after retirement)
-        contributions = 0.0
-        if age < scenario.retirement_age:
-            contributions = scenario.contrib_amount
-            if scenario.contrib_cadence == "Monthly":
-                contributions *= 12
-
-        # Liquidity events
-        liquidity_net, _, liquidity_event_taxes = apply_liquidity_events(age, liquidity_events)
-
-        # Withdrawals (start at retirement)
-        withdrawals = 0.0
-        if age >= scenario.retirement_age:
-            if scenario.withdrawal_method == "Fixed % of prior-year end balance":
-                withdrawal_pct = scenario.withdrawal_pct / 100.0
-                # Percentage is always annual, regardless of frequency
-                withdrawals = prior_year_end_balance * withdrawal_pct
-            else:
-                real_amount = scenario.withdrawal_real_amount
-                # Inflation only applies to future years, not initial capital
-                if inflation_enabled:
-                    # For the first year, cpi_index is 1.0 (no inflation)
-                    withdrawals = real_amount * cpi_index
-                else:
-                    withdrawals = real_amount
-                # For fixed real amount, multiply by 12 if monthly
-                if scenario.withdrawal_frequency == "Monthly":
-                    withdrawals *= 12
-        # (No Streamlit/UI debug code here — function must be pure computation)
-        # Fees
-        fees = start_balance * fee_rate
-
-        # Taxes (from withdrawals and liquidity events)
-        taxes = liquidity_event_taxes
-        if scenario.enable_taxes:
-            taxes += withdrawals * tax_rate
-
-        # Growth (deterministic)
-        balance_after_cashflows = (
-            start_balance + contributions + liquidity_net - withdrawals - fees - taxes
-        )
-
-        growth = balance_after_cashflows * nominal_return
-        end_balance_nominal = balance_after_cashflows + growth
-        
-        # Apply Black Swan event if enabled
-        black_swan_loss = 0.0
-        if (hasattr(scenario, 'black_swan_enabled') and scenario.black_swan_enabled and 
-            hasattr(scenario, 'black_swan_age') and age == scenario.black_swan_age):
-            black_swan_loss_pct = getattr(scenario, 'black_swan_loss_pct', 50.0) / 100.0
-            black_swan_loss = end_balance_nominal * black_swan_loss_pct
-            end_balance_nominal -= black_swan_loss
-        
-        if inflation_enabled:
-            if age == scenario.current_age:
-                cpi_index = 1.0
-            end_balance_real = end_balance_nominal / cpi_index
-        else:
-            end_balance_real = end_balance_nominal
-
-        rows.append(TimelineRow(
-            age=age,
-            start_balance_nominal=start_balance,
-            contributions=contributions,
-            liquidity_net=liquidity_net,
-            withdrawals=withdrawals,
-            fees=fees,
-            taxes=taxes,
-            growth=growth,
-            end_balance_nominal=end_balance_nominal,
-            cpi_index=cpi_index,
-            end_balance_real=end_balance_real
-        ))
-
-        # Check for first shortfall (when balance goes negative)
-        if first_shortfall_age is None and end_balance_nominal < 0:
-            first_shortfall_age = age
-
-        # Update for next iteration
-        prior_year_end_balance = end_balance_nominal
-        balance_nominal = end_balance_nominal
-        if inflation_enabled and age != scenario.current_age:
-            cpi_index *= (1 + inflation_rate)
+    ages, cpi_index, kernel_kwargs = _timeline_inputs(scenario, liquidity_events)
+    columns, first_shortfall_age = _simulate_timeline_arrays(ages, cpi_index, kernel_kwargs)
 
     # Convert to DataFrame
-    df = pd.DataFrame([asdict(row) for row in rows])
+    df = pd.DataFrame(columns)
 
     # Metrics
-    terminal_nominal = df.iloc[-1]['end_balance_nominal']
-    terminal_real = df.iloc[-1]['end_balance_real']
+    terminal_nominal = columns['end_balance_nominal'][-1]
+    terminal_real = columns['end_balance_real'][-1]
 
     metrics = {
         'terminal_nominal': terminal_nominal,
@@ -344,7 +703,8 @@ def run_monte_carlo(
     liquidity_events: List[LiquidityEvent],
     runs: int = 1000,
     seed: int = MC_SEED,
-    show_real: bool = True
+    show_real: bool = True,
+    return_paths: bool = True
 ) -> Dict[str, Any]:
     """
     Run Monte Carlo simulation with variable returns.
@@ -355,113 +715,75 @@ def run_monte_carlo(
         runs: Number of Monte Carlo simulations
         seed: Random seed for reproducibility
         show_real: If True, return paths in real (inflation-adjusted) values; if False, return nominal values
+        return_paths: If False, skip recording per-year paths and return None for the percentile bands
     
     Returns metrics including probability of success.
     """
-    np.random.seed(seed)
-    
+    rng = np.random.default_rng(seed)
+    
+    # Read scenario fields once; string options become flags/multipliers
+    current_age = scenario.current_age
+    retirement_age = scenario.retirement_age
+    end_age = scenario.end_age
+    contrib_monthly = scenario.contrib_cadence == "Monthly"
+    withdrawal_is_pct = scenario.withdrawal_method == "Fixed % of prior-year end balance"
+    withdrawal_monthly_mult = 12 if scenario.withdrawal_frequency == "Monthly" else 1
     inflation_rate = scenario.inflation_pct / 100.0
     mean_return = scenario.nominal_return_pct / 100.0
     stdev_return = scenario.return_stdev_pct / 100.0
     fee_rate = scenario.fee_pct / 100.0
     tax_rate = scenario.effective_tax_rate_pct / 100.0 if scenario.enable_taxes else 0.0
     
-    num_years = scenario.end_age - scenario.current_age + 1
-    
-    # Pre-generate all random returns
-    returns = np.random.normal(mean_return, stdev_return, size=(runs, num_years))
-    
-    terminal_values = []
-    min_balances = []
-    
-    # Paths for percentile bands (optional)
-    all_paths = []
-    
-    for run_idx in range(runs):
-        balance_nominal = scenario.current_balance
-        cpi_index = 1.0
-        prior_year_end_balance = balance_nominal
-        
-        path = []
-        min_balance = balance_nominal
-        
-        for year_idx, age in enumerate(range(scenario.current_age, scenario.end_age + 1)):
-            start_balance = balance_nominal
-            
-            # Contributions
-            contributions = 0.0
-            if age < scenario.retirement_age:
-                contributions = scenario.contrib_amount
-                if scenario.contrib_cadence == "Monthly":
-                    contributions *= 12
-            
-            # Liquidity events
-            liquidity_net, _, liquidity_event_taxes = apply_liquidity_events(age, liquidity_events)
-            
-            # Withdrawals
-            withdrawals = 0.0
-            if age >= scenario.retirement_age:
-                if scenario.withdrawal_method == "Fixed % of prior-year end balance":
-                    withdrawal_pct = scenario.withdrawal_pct / 100.0
-                    withdrawals = prior_year_end_balance * withdrawal_pct
-                    
-                    # Apply frequency - convert to annual amount
-                    if scenario.withdrawal_frequency == "Monthly":
-                        withdrawals *= 12  # Monthly rate × 12 = Annual amount
-                else:
-                    real_amount = scenario.withdrawal_real_amount
-                    withdrawals = real_amount * cpi_index
-                    
-                    # Apply frequency - convert to annual amount
-                    if scenario.withdrawal_frequency == "Monthly":
-                        withdrawals *= 12  # Monthly amount × 12 = Annual amount
-            
-            # Fees
-            fees = start_balance * fee_rate
-            
-            # Taxes (from withdrawals and liquidity events)
-            taxes = liquidity_event_taxes
-            if scenario.enable_taxes:
-                taxes += withdrawals * tax_rate
-            
-            # Growth with random return
-            balance_after_cashflows = (
-                start_balance + contributions + liquidity_net - withdrawals - fees - taxes
-            )
-            
-            growth = balance_after_cashflows * returns[run_idx, year_idx]
-            end_balance_nominal = balance_after_cashflows + growth
-            
-            min_balance = min(min_balance, end_balance_nominal)
-            
-            # Store path in real or nominal values based on show_real parameter
-            if show_real:
-                path.append(end_balance_nominal / cpi_index)  # Real values
-            else:
-                path.append(end_balance_nominal)  # Nominal values
-            
-            prior_year_end_balance = end_balance_nominal
-            balance_nominal = end_balance_nominal
-            cpi_index *= (1 + inflation_rate)
-        
-        terminal_values.append(balance_nominal)
-        min_balances.append(min_balance)
-        all_paths.append(path)
-    
-    # Calculate metrics
-    terminal_values = np.array(terminal_values)
-    min_balances = np.array(min_balances)
+    ages = np.arange(current_age, end_age + 1)
+    num_years = len(ages)
+    
+    # Pre-generate all random returns in one draw, one row per year; float32 is
+    # ample for projected dollar balances and halves the memory traffic
+    returns = rng.standard_normal((num_years, runs), dtype=np.float32)
+    returns *= np.float32(stdev_return)
+    returns += np.float32(mean_return)
+    
+    # Contributions (stop after retirement)
+    annual_contrib = scenario.contrib_amount * (12 if contrib_monthly else 1)
+    contributions = np.where(ages < retirement_age, float(annual_contrib), 0.0)
+    
+    # Liquidity events are identical across runs, so resolve them once
+    liquidity_net, liquidity_event_taxes = precompute_liquidity(liquidity_events, current_age, end_age)
+    
+    # CPI index is 1.0 in the first year, then compounds annually
+    cpi_index = np.ones(num_years)
+    cpi_index[1:] = np.cumprod(np.full(num_years - 1, 1 + inflation_rate))
+    
+    # Withdrawals start at retirement; exactly one schedule is non-zero.
+    # Apply frequency - convert to annual amount
+    retired = ages >= retirement_age
+    withdrawal_pct_schedule = np.zeros(num_years)
+    withdrawal_fixed_schedule = np.zeros(num_years)
+    if withdrawal_is_pct:
+        withdrawal_pct_schedule[retired] = scenario.withdrawal_pct / 100.0 * withdrawal_monthly_mult
+    else:
+        withdrawal_real_annual = scenario.withdrawal_real_amount * withdrawal_monthly_mult
+        withdrawal_fixed_schedule[retired] = withdrawal_real_annual * cpi_index[retired]
+    
+    terminal_values, min_balances, all_paths = _monte_carlo_kernel(
+        returns, np.float32(scenario.current_balance),
+        contributions.astype(np.float32), liquidity_net.astype(np.float32),
+        liquidity_event_taxes.astype(np.float32), cpi_index.astype(np.float32),
+        withdrawal_pct_schedule.astype(np.float32), withdrawal_fixed_schedule.astype(np.float32),
+        np.float32(fee_rate), np.float32(tax_rate), show_real, return_paths
+    )
     
+    # Calculate metrics; the simulation ran in float32, reductions run in float64
     probability_no_shortfall = np.mean(min_balances >= 0)
+    terminal_values = terminal_values.astype(np.float64)
     median_terminal = np.median(terminal_values)
     p10_terminal = np.percentile(terminal_values, 10)
     p90_terminal = np.percentile(terminal_values, 90)
     
     # Percentile bands (P10, P50, P90 over time)
-    all_paths = np.array(all_paths)
-    p10_path = np.percentile(all_paths, 10, axis=0)
-    p50_path = np.percentile(all_paths, 50, axis=0)
-    p90_path = np.percentile(all_paths, 90, axis=0)
+    p10_path = p50_path = p90_path = None
+    if return_paths:
+        p10_path, p50_path, p90_path = np.percentile(all_paths.astype(np.float64), (10, 50, 90), axis=1)
     
     return {
         'probability_no_shortfall': probability_no_shortfall,
@@ -479,7 +801,8 @@ def solve_safe_withdrawal_rate(
     liquidity_events: List[LiquidityEvent],
     target_ending_balance_pct: float = 0.0,
     tolerance: float = 0.01,
-    max_iterations: int = 50
+    max_iterations: int = 50,
+    debug: bool = False
 ) -> Optional[float]:
     """
     Binary search to find the maximum withdrawal % where balance meets target ending balance.
@@ -490,24 +813,28 @@ def solve_safe_withdrawal_rate(
         target_ending_balance_pct: Target ending balance as % of retirement starting balance (0-100)
         tolerance: Convergence tolerance for binary search
         max_iterations: Maximum search iterations
+        debug: If True, record each iteration in st.session_state.swr_debug for display
     
     Returns safe withdrawal rate as percentage.
     """
     if scenario.withdrawal_method != "Fixed % of prior-year end balance":
         return None  # Only applicable for percentage-based withdrawals
     
-    # Calculate the target ending balance in dollars
-    # Need to simulate up to retirement to get the starting retirement balance
-    temp_scenario = Scenario(**scenario.to_dict())
-    temp_scenario.withdrawal_pct = 0.0  # No withdrawals to get retirement starting balance
-    temp_df, temp_metrics = build_timeline(temp_scenario, liquidity_events, show_real=True)
+    # Liquidity, contributions and CPI don't depend on the rate, so build them once
+    ages, _, kernel_kwargs = _timeline_inputs(scenario, liquidity_events)
     
-    # Find balance at retirement age
-    retirement_row = temp_df[temp_df['age'] == scenario.retirement_age]
-    if len(retirement_row) == 0:
+    # Withdrawals start at retirement, so the retirement starting balance
+    # is the same for every candidate rate
+    retirement_idx = scenario.retirement_age - scenario.current_age
+    if retirement_idx < 0 or retirement_idx >= len(ages):
         return None
+    retired = ages >= scenario.retirement_age
     
-    retirement_start_balance = retirement_row.iloc[0]['start_balance_nominal']
+    # One schedule buffer is refilled in place for every candidate rate
+    withdrawal_pct_schedule = np.zeros(len(ages))
+    kernel_kwargs['withdrawal_pct_schedule'] = withdrawal_pct_schedule
+    start_balance = _timeline_kernel(**kernel_kwargs)[0]
+    retirement_start_balance = start_balance[retirement_idx]
     target_balance = retirement_start_balance * (target_ending_balance_pct / 100.0)
     
     low, high = 0.0, 50.0  # Search between 0% and 50%
@@ -515,50 +842,74 @@ def solve_safe_withdrawal_rate(
     
     # Debug list to track iterations
     debug_info = []
-    debug_info.append(f"Retirement starting balance: ${retirement_start_balance:,.0f}")
-    debug_info.append(f"Target ending balance: ${target_balance:,.0f} ({target_ending_balance_pct}% of starting)")
-    debug_info.append("")
+    if debug:
+        debug_info.append(f"Retirement starting balance: ${retirement_start_balance:,.0f}")
+        debug_info.append(f"Target ending balance: ${target_balance:,.0f} ({target_ending_balance_pct}% of starting)")
+        debug_info.append("")
     
     for iteration in range(max_iterations):
-        mid = (low + high) / 2.0
+        if high - low < tolerance:
+            break
         
-        # Test this withdrawal rate
-        test_scenario = Scenario(**scenario.to_dict())
-        test_scenario.withdrawal_pct = mid
+        mid = (low + high) / 2.0
         
-        df, metrics = build_timeline(test_scenario, liquidity_events, show_real=True)
+        # Test this withdrawal rate; only the nominal end balances are needed,
+        # so call the kernel directly rather than building timeline columns
+        withdrawal_pct_schedule[retired] = mid / 100.0
+        end_balance_nominal = _timeline_kernel(**kernel_kwargs)[-1]
         
         # Check terminal balance and minimum balance
-        terminal_balance = df.iloc[-1]['end_balance_nominal']
-        min_balance = df['end_balance_nominal'].min()
+        terminal_balance = end_balance_nominal[-1]
+        min_balance = end_balance_nominal.min()
         
         # Success if: (1) never goes negative AND (2) terminal balance >= target
-        if min_balance >= 0 and terminal_balance >= target_balance:
+        solvent = min_balance >= 0 and terminal_balance >= target_balance
+        if solvent:
             # Success, try higher
             best_rate = mid
             low = mid
-            result = f"✓ solvent (terminal: ${terminal_balance:,.0f})"
         else:
             # Failed, try lower
             high = mid
-            if min_balance < 0:
+        
+        if debug:
+            if solvent:
+                result = f"✓ solvent (terminal: ${terminal_balance:,.0f})"
+            elif min_balance < 0:
                 result = f"✗ goes negative (min: ${min_balance:,.0f})"
             else:
                 result = f"✗ below target (terminal: ${terminal_balance:,.0f})"
-        
-        debug_info.append(f"Iter {iteration+1}: {mid:.4f}% → {result}")
-        
-        if high - low < tolerance:
-            break
+            debug_info.append(f"Iter {iteration+1}: {mid:.4f}% → {result}")
     
     # Store debug info in session state for display
-    if 'swr_debug' not in st.session_state:
-        st.session_state.swr_debug = []
-    st.session_state.swr_debug = debug_info
+    if debug:
+        st.session_state.swr_debug = debug_info
     
     return best_rate
 
 
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def cached_timeline(
+    scenario: Scenario,
+    liquidity_events: List[LiquidityEvent],
+    show_real: bool = True
+) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """build_timeline memoized on its inputs, so reruns that don't change the plan skip the projection."""
+    return build_timeline(scenario, liquidity_events, show_real)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def cached_monte_carlo(
+    scenario: Scenario,
+    liquidity_events: List[LiquidityEvent],
+    runs: int = 1000,
+    show_real: bool = True,
+    return_paths: bool = True
+) -> Dict[str, Any]:
+    """run_monte_carlo memoized on its inputs (including the run count) with the default seed."""
+    return run_monte_carlo(scenario, liquidity_events, runs, show_real=show_real, return_paths=return_paths)
+
+
 # ============================================================================
 # EXPORT HELPERS
 # ============================================================================
@@ -568,20 +919,67 @@ def export_csv(df: pd.DataFrame) -> bytes:
     return df.to_csv(index=False).encode('utf-8')
 
 
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False, hash_funcs={go.Figure: lambda fig: fig.to_json()})
 def export_chart_png(fig: go.Figure) -> Optional[bytes]:
-    """Export Plotly figure to PNG bytes."""
+    """
+    Export Plotly figure to PNG bytes (cached on the figure's JSON, so reruns reuse the image).
+    WebGL (scattergl) traces are drawn as SVG scatter for the static image;
+    kaleido renders them the same but several times faster.
+    """
+    spec = fig.to_dict()
+    for trace in spec['data']:
+        if trace.get('type') == 'scattergl':
+            trace['type'] = 'scatter'
     try:
-        img_bytes = fig.to_image(format="png", width=1200, height=600)
+        img_bytes = go.Figure(spec).to_image(format="png", width=1200, height=600)
         return img_bytes
     except (ValueError, ImportError):
         # Kaleido not installed
         return None
 
 
+def _events_to_columns(events: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Lay out a scenario's events column-wise (one list per field) for compact storage."""
+    return {
+        field: [event.get(field, LIQUIDITY_EVENT_DEFAULTS.get(field)) for event in events]
+        for field in LIQUIDITY_EVENT_FIELDS
+    }
+
+
+def _events_from_columns(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Rebuild one dict per event from column-wise storage."""
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
 def save_scenarios(scenarios: Dict[str, Scenario]):
     """Save scenarios to JSON file."""
-    data = {name: scenario.to_dict() for name, scenario in scenarios.items()}
-    SCENARIOS_FILE.write_text(json.dumps(data, indent=2))
+    data = {
+        name: dict(scenario.to_dict(), liquidity_events=_events_to_columns(scenario.liquidity_events))
+        for name, scenario in scenarios.items()
+    }
+    if orjson is not None:
+        SCENARIOS_FILE.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        SCENARIOS_FILE.write_text(json.dumps(data, indent=2))
+    # Don't rely on mtime resolution alone to invalidate the parse caches
+    _read_scenarios_file.clear()
+    _scenarios_cache.clear()
+    _scenarios_table.clear()
+
+
+@st.cache_data(show_spinner=False)
+def _read_scenarios_file(mtime_ns: int) -> Dict[str, Dict[str, Any]]:
+    """Parse the scenarios JSON file; cached across sessions per file modification time."""
+    if orjson is not None:
+        return orjson.loads(SCENARIOS_FILE.read_bytes())
+    return json.loads(SCENARIOS_FILE.read_text())
+
+
+@st.cache_resource(show_spinner=False)
+def _scenarios_cache(mtime_ns: int) -> Dict[str, Scenario]:
+    """Scenario objects for the current file version, shared across reruns and sessions."""
+    data = _read_scenarios_file(mtime_ns)
+    return {name: Scenario.from_dict(scenario_data) for name, scenario_data in data.items()}
 
 
 def load_scenarios() -> Dict[str, Scenario]:
@@ -589,17 +987,91 @@ def load_scenarios() -> Dict[str, Scenario]:
     if not SCENARIOS_FILE.exists():
         return {}
     
-    data = json.loads(SCENARIOS_FILE.read_text())
-    return {name: Scenario.from_dict(scenario_data) for name, scenario_data in data.items()}
+    # Scenarios are frozen, so a shallow copy is all callers need to add/remove entries
+    return dict(_scenarios_cache(SCENARIOS_FILE.stat().st_mtime_ns))
+
+
+# Scenario fields shown on the management page, with their column headings
+SCENARIO_TABLE_COLUMNS = {
+    'current_age': 'Current Age',
+    'retirement_age': 'Retirement Age',
+    'end_age': 'End Age',
+    'current_balance': 'Current Balance',
+    'withdrawal_method': 'Withdrawal Method',
+    'enable_mc': 'Monte Carlo',
+    'enable_taxes': 'Taxes Enabled'
+}
+
+
+@st.cache_data(show_spinner=False)
+def _scenarios_table(mtime_ns: int) -> pd.DataFrame:
+    """Build the saved-scenarios summary table; cached across reruns per file modification time."""
+    data = _read_scenarios_file(mtime_ns)
+    scenarios_df = pd.DataFrame.from_records(
+        [{field: scenario_data[field] for field in SCENARIO_TABLE_COLUMNS} for scenario_data in data.values()],
+        columns=list(SCENARIO_TABLE_COLUMNS)
+    ).astype({
+        'current_age': 'int16',
+        'retirement_age': 'int16',
+        'end_age': 'int16',
+        'current_balance': 'float64',
+        'enable_mc': 'bool',
+        'enable_taxes': 'bool'
+    }).rename(columns=SCENARIO_TABLE_COLUMNS)
+    scenarios_df.insert(0, 'Name', list(data.keys()))
+    return scenarios_df
 
 
 # ============================================================================
 # UI HELPERS
 # ============================================================================
 
-def create_default_events() -> List[Dict[str, Any]]:
-    """Create default liquidity events."""
-    return [
+# Column dtypes for the events table kept in session state
+EVENT_DTYPES = {
+    'enabled': 'bool',
+    'type': 'object',
+    'label': 'object',
+    'start_age': 'int16',
+    'end_age': 'int16',
+    'amount': 'float64',
+    'recurrence': 'object',
+    'taxable': 'bool',
+    'tax_rate': 'float64'
+}
+
+
+def events_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the columnar events table from a list of event dicts (missing optional fields get their defaults)."""
+    defaults = {'enabled': True, 'taxable': False, 'tax_rate': 0.0}
+    events_df = pd.DataFrame.from_records([{**defaults, **record} for record in records], columns=list(EVENT_DTYPES))
+    return events_df.astype(EVENT_DTYPES)
+
+
+# Blank starter row shown when there are no events; as a One-time row its
+# end age is displayed as the start age, so the horizon doesn't matter here
+_EMPTY_EVENTS_TEMPLATE = events_frame([
+    {
+        'enabled': True,
+        'type': 'Credit',
+        'label': '',
+        'start_age': 65,
+        'end_age': END_AGE,
+        'amount': 0.0,
+        'recurrence': 'One-time',
+        'taxable': False,
+        'tax_rate': 0.0
+    }
+])
+
+
+@st.cache_resource(show_spinner=False)
+def create_default_events() -> pd.DataFrame:
+    """
+    Create default liquidity events. Built once per server process and shared by
+    every session; event tables are replaced on Save/Load rather than edited in
+    place, so the shared table is never modified.
+    """
+    return events_frame([
         {
             'type': 'Credit',
             'label': 'Sell House',
@@ -611,7 +1083,138 @@ def create_default_events() -> List[Dict[str, Any]]:
             'taxable': False,
             'tax_rate': 0.0
         }
-    ]
+    ])
+
+
+# Currency symbols, thousands separators and surrounding whitespace in typed amounts
+_MONEY_RE = re.compile(r'^\s+|\s+$|[\$,]')
+
+
+def _parse_number_column(values: pd.Series, default: float) -> pd.Series:
+    """Parse a column of numbers that may contain '$' and ',' formatting; unparseable cells become default."""
+    if values.dtype == object:
+        values = values.astype(str).str.replace(_MONEY_RE, '', regex=True)
+    return pd.to_numeric(values, errors='coerce').astype('float64').fillna(default)
+
+
+def _matches_ignoring_case(values: pd.Series, target: str) -> np.ndarray:
+    """Case-insensitive match of a text column against a lower-case target, lower-casing each distinct value once."""
+    categories = values.astype(str).astype('category')
+    matches = np.asarray(categories.cat.categories.str.lower() == target)
+    return matches[categories.cat.codes.to_numpy()]
+
+
+def validate_events(edited_df: pd.DataFrame, planning_end_age: int) -> pd.DataFrame:
+    """
+    Validate and normalize edited liquidity events column-wise.
+    Rows without a label are dropped; returns the remaining events as an events table.
+    """
+    # Required columns present
+    if not all(col in edited_df.columns for col in ['type', 'label', 'start_age', 'amount', 'recurrence']):
+        return events_frame([])
+
+    df = edited_df.reset_index(drop=True)
+
+    # Skip empty label rows
+    labels = df['label'].astype(str).str.strip()
+    keep = labels != ''
+    df, labels = df[keep], labels[keep]
+
+    # Parse numeric fields robustly
+    parsed = pd.DataFrame({
+        'start_age': _parse_number_column(df['start_age'], default=planning_end_age),
+        'amount': _parse_number_column(df['amount'], default=0.0),
+    })
+    if 'end_age' in df.columns:
+        parsed['end_age'] = _parse_number_column(df['end_age'], default=planning_end_age)
+    else:
+        parsed['end_age'] = parsed['start_age']
+    if 'tax_rate' in df.columns:
+        parsed['tax_rate'] = _parse_number_column(df['tax_rate'], default=0.0)
+    else:
+        parsed['tax_rate'] = 0.0
+
+    # Skip malformed rows (ages that can't be represented as integers)
+    finite = np.isfinite(parsed['start_age']) & np.isfinite(parsed['end_age'])
+    df, labels, parsed = df[finite], labels[finite], parsed[finite]
+    # Ages outside the int16 range lie beyond any planning horizon, so clipping is safe
+    age_limits = np.iinfo(EVENT_DTYPES['start_age'])
+    start_age = np.trunc(parsed['start_age'].clip(age_limits.min, age_limits.max)).astype('int64')
+    end_age = np.trunc(parsed['end_age'].clip(age_limits.min, age_limits.max)).astype('int64')
+    amount = parsed['amount']
+
+    recurrence = df['recurrence'].where(df['recurrence'].notna() & (df['recurrence'] != ''), 'One-time')
+
+    # For One-time events, force end_age to equal start_age; if a recurring
+    # event's end_age is not set or <= start_age, assume full planning horizon
+    end_age = np.where(
+        recurrence == 'One-time',
+        start_age,
+        np.where(end_age <= start_age, planning_end_age, end_age)
+    )
+
+    # Normalize amount sign based on type
+    types = df['type'].astype(str)
+    amount = np.where(_matches_ignoring_case(types, 'debit'), -amount.abs(), amount.abs())
+
+    validated = pd.DataFrame({
+        'enabled': df['enabled'].astype(bool) if 'enabled' in df.columns else True,
+        'type': types,
+        'label': labels,
+        'start_age': start_age,
+        'end_age': end_age,
+        'amount': amount,
+        'recurrence': recurrence,
+        'taxable': df['taxable'].astype(bool) if 'taxable' in df.columns else False,
+        'tax_rate': parsed['tax_rate'],
+    })
+    return validated.reset_index(drop=True).astype(EVENT_DTYPES)
+
+
+# Column setup for the liquidity events editor
+_EVENTS_COLUMN_CONFIG = {
+    "enabled": st.column_config.CheckboxColumn(
+        "Active",
+        default=True,
+        help="Uncheck to disable this event without deleting it"
+    ),
+    "type": st.column_config.SelectboxColumn(
+        "Type",
+        options=["Credit", "Debit"],
+        required=True,
+        help="Credit = money coming in, Debit = money going out"
+    ),
+    "label": st.column_config.TextColumn("Label", required=True, max_chars=50),
+    "start_age": st.column_config.NumberColumn("Start Age", min_value=0, max_value=110, required=True),
+    "end_age": st.column_config.NumberColumn(
+        "End Age", 
+        min_value=0, 
+        max_value=110, 
+        required=False, 
+        help="End age for recurring events (grayed out for one-time events)"
+    ),
+    "amount": st.column_config.NumberColumn(
+        "Amount", 
+        format="$%.2f", 
+        required=True,
+        help="Enter the amount per period (monthly/annual). Debits will automatically be negative."
+    ),
+    "recurrence": st.column_config.SelectboxColumn(
+        "Recurrence",
+        options=["One-time", "Annual", "Monthly"],
+        required=True,
+        help="Monthly amounts will be multiplied by 12 to get annual total"
+    ),
+    "taxable": st.column_config.CheckboxColumn("Taxable?", default=False),
+    "tax_rate": st.column_config.NumberColumn(
+        "Tax Rate (%)",
+        min_value=0.0,
+        max_value=100.0,
+        format="%.2f%%",
+        default=0.0,
+        help="Tax rate for this specific event (0% = tax-free)"
+    )
+}
 
 
 def show_liquidity_events_page(planning_end_age: int = END_AGE):
@@ -625,193 +1228,70 @@ def show_liquidity_events_page(planning_end_age: int = END_AGE):
     if 'events_data' not in st.session_state:
         st.session_state.events_data = create_default_events()
     
+    # The draft shares the saved table until Save/Reset/Load replaces it; event
+    # tables are only ever swapped out wholesale, never mutated in place
     if 'events_draft' not in st.session_state:
-        st.session_state.events_draft = st.session_state.events_data.copy()
+        st.session_state.events_draft = st.session_state.events_data
     
     # Display events table using draft data
     try:
-        if st.session_state.events_draft:
-            events_df = pd.DataFrame(st.session_state.events_draft)
+        if not st.session_state.events_draft.empty:
+            events_df = st.session_state.events_draft
         else:
-            # Create empty template with one row (use planning_end_age as sensible default)
-            events_df = pd.DataFrame([{
-                'enabled': True,
-                'type': 'Credit',
-                'label': '',
-                'start_age': 65,
-                'end_age': planning_end_age,
-                'amount': 0.0,
-                'recurrence': 'One-time',
-                'taxable': False,
-                'tax_rate': 0.0
-            }])
-        
-        # Ensure only expected columns are present
-        expected_columns = ['enabled', 'type', 'label', 'start_age', 'end_age', 'amount', 'recurrence', 'taxable', 'tax_rate']
-        if 'enabled' not in events_df.columns:
-            events_df['enabled'] = True
-        events_df = events_df[[col for col in expected_columns if col in events_df.columns]]
-        
-        # Auto-populate end_age for one-time events (for display purposes)
-        for idx in range(len(events_df)):
-            if events_df.iloc[idx].get('recurrence') == 'One-time':
-                start_age = events_df.iloc[idx].get('start_age')
-                if pd.notna(start_age):
-                    events_df.at[idx, 'end_age'] = start_age
-        
-        # Display debits as negative values in the table
-        display_df = events_df.copy()
-        for idx in range(len(display_df)):
-            if display_df.iloc[idx].get('type', '').lower() == 'debit':
-                # Make sure debits are shown as negative
-                display_df.at[idx, 'amount'] = -abs(display_df.iloc[idx]['amount'])
-            else:
-                # Make sure credits are shown as positive
-                display_df.at[idx, 'amount'] = abs(display_df.iloc[idx]['amount'])
-        
-        # Use data editor - don't auto-save on every change
-        edited_df = st.data_editor(
-            display_df,
-            num_rows="dynamic",
-            width="stretch",
-            key="liquidity_events_editor",
-            column_config={
-                "enabled": st.column_config.CheckboxColumn(
-                    "Active",
-                    default=True,
-                    help="Uncheck to disable this event without deleting it"
-                ),
-                "type": st.column_config.SelectboxColumn(
-                    "Type",
-                    options=["Credit", "Debit"],
-                    required=True,
-                    help="Credit = money coming in, Debit = money going out"
-                ),
-                "label": st.column_config.TextColumn("Label", required=True, max_chars=50),
-                "start_age": st.column_config.NumberColumn("Start Age", min_value=0, max_value=110, required=True),
-                "end_age": st.column_config.NumberColumn(
-                    "End Age", 
-                    min_value=0, 
-                    max_value=110, 
-                    required=False, 
-                    help="End age for recurring events (grayed out for one-time events)"
-                ),
-                "amount": st.column_config.NumberColumn(
-                    "Amount", 
-                    format="$%.2f", 
-                    required=True,
-                    help="Enter the amount per period (monthly/annual). Debits will automatically be negative."
-                ),
-                "recurrence": st.column_config.SelectboxColumn(
-                    "Recurrence",
-                    options=["One-time", "Annual", "Monthly"],
-                    required=True,
-                    help="Monthly amounts will be multiplied by 12 to get annual total"
-                ),
-                "taxable": st.column_config.CheckboxColumn("Taxable?", default=False),
-                "tax_rate": st.column_config.NumberColumn(
-                    "Tax Rate (%)",
-                    min_value=0.0,
-                    max_value=100.0,
-                    format="%.2f%%",
-                    default=0.0,
-                    help="Tax rate for this specific event (0% = tax-free)"
-                )
-            },
-            column_order=["enabled", "type", "recurrence", "label", "start_age", "end_age", "amount", "taxable", "tax_rate"],
-            hide_index=True
+            # Show a single blank row to start from
+            events_df = _EMPTY_EVENTS_TEMPLATE
+        
+        # Auto-populate end_age for one-time events and display debits as
+        # negative values (credits as positive); assign() builds a new frame,
+        # so the shared session table is never modified
+        one_time = events_df['recurrence'].to_numpy() == 'One-time'
+        amounts = events_df['amount'].abs().to_numpy()
+        is_debit = _matches_ignoring_case(events_df['type'], 'debit')
+        display_df = events_df.assign(
+            end_age=np.where(one_time, events_df['start_age'].to_numpy(), events_df['end_age'].to_numpy()),
+            amount=np.where(is_debit, -amounts, amounts)
         )
         
-        st.caption("**Tip**: For One-Time events, set End Age = Start Age. For Monthly events, enter the monthly amount (e.g., $10,000/month will be calculated as $120,000/year). Debit amounts will be converted to negative values when you click Save.")
-        st.markdown("---")
-        
-        # Save button to apply changes
-        col1, col2, col3 = st.columns([2, 1, 1])
-        
-        with col2:
-            if st.button("Save Events", type="primary", width="stretch"):
-                # Process and validate edited data (robust parsing)
-                def _parse_number(val, default=0.0):
-                    try:
-                        if val is None or (isinstance(val, float) and np.isnan(val)):
-                            return default
-                        if isinstance(val, str):
-                            s = val.replace('$', '').replace(',', '').strip()
-                            return float(s) if s != '' else default
-                        return float(val)
-                    except Exception:
-                        return default
-
-                validated_data = []
-                for idx in range(len(edited_df)):
-                    try:
-                        row = edited_df.iloc[idx].to_dict()
-
-                        # Required keys present
-                        if not all(k in row for k in ['type', 'label', 'start_age', 'amount', 'recurrence']):
-                            continue
-
-                        # Skip empty label rows
-                        if not str(row.get('label', '')).strip():
-                            continue
-
-                        # Parse numeric fields robustly
-                        start_age = int(_parse_number(row.get('start_age'), default=planning_end_age))
-                        end_age = int(_parse_number(row.get('end_age', start_age), default=planning_end_age))
-                        amount = _parse_number(row.get('amount'), default=0.0)
-                        tax_rate = _parse_number(row.get('tax_rate', 0.0), default=0.0)
-
-                        recurrence = row.get('recurrence', 'One-time') or 'One-time'
-
-                        # For One-time events, force end_age to equal start_age
-                        if recurrence == 'One-time':
-                            end_age = start_age
-                        # If this is a recurring event but end_age is not set or <= start_age, assume full planning horizon
-                        elif end_age <= start_age:
-                            end_age = planning_end_age
-
-                        # Normalize amount sign based on type
-                        typ = str(row.get('type', 'Debit'))
-                        if typ.lower() == 'debit':
-                            amount = -abs(amount)
-                        else:  # Credit
-                            amount = abs(amount)
-
-                        validated_row = {
-                            'enabled': bool(row.get('enabled', True)),
-                            'type': typ,
-                            'label': str(row.get('label', '')).strip(),
-                            'start_age': start_age,
-                            'end_age': end_age,
-                            'amount': amount,
-                            'recurrence': recurrence,
-                            'taxable': bool(row.get('taxable', False)),
-                            'tax_rate': float(tax_rate)
-                        }
-
-                        validated_data.append(validated_row)
-                    except Exception:
-                        # skip malformed rows
-                        continue
-
-                # Save to session state
-                st.session_state.events_data = validated_data
-                st.session_state.events_draft = validated_data.copy()
-                st.success(f"Saved {len(validated_data)} events!")
-                st.rerun()
-        
-        with col3:
-            if st.button("Reset", width="stretch"):
-                st.session_state.events_draft = st.session_state.events_data.copy()
-                st.rerun()
-        
-        # Initialize session state for Black Swan scenario
-        if 'black_swan_enabled' not in st.session_state:
-            st.session_state.black_swan_enabled = False
-        if 'black_swan_age' not in st.session_state:
-            st.session_state.black_swan_age = 70
-        if 'black_swan_loss_pct' not in st.session_state:
-            st.session_state.black_swan_loss_pct = 50.0
+        # Edits are batched in a form so the page only reruns on Save/Reset,
+        # not on every cell change
+        with st.form("liquidity_events_form", border=False):
+            # Use data editor - don't auto-save on every change
+            edited_df = st.data_editor(
+                display_df,
+                num_rows="dynamic",
+                width="stretch",
+                key="liquidity_events_editor",
+                column_config=_EVENTS_COLUMN_CONFIG,
+                column_order=["enabled", "type", "recurrence", "label", "start_age", "end_age", "amount", "taxable", "tax_rate"],
+                hide_index=True
+            )
+
+            st.caption("**Tip**: For One-Time events, set End Age = Start Age. For Monthly events, enter the monthly amount (e.g., $10,000/month will be calculated as $120,000/year). Debit amounts will be converted to negative values when you click Save.")
+            st.markdown("---")
+
+            # Save button to apply changes
+            col1, col2, col3 = st.columns([2, 1, 1])
+
+            with col2:
+                if st.form_submit_button("Save Events", type="primary", width="stretch"):
+                    # The editor's diff is empty when nothing was changed since the
+                    # last save, so there is nothing to validate or write back
+                    editor_state = st.session_state.get('liquidity_events_editor', {})
+                    if not any(editor_state.get(change) for change in ('edited_rows', 'added_rows', 'deleted_rows')):
+                        st.info("No changes to save.")
+                    else:
+                        validated_data = validate_events(edited_df, planning_end_age)
+
+                        # Save to session state
+                        st.session_state.events_data = validated_data
+                        st.session_state.events_draft = validated_data
+                        st.success(f"Saved {len(validated_data)} events!")
+                        st.rerun()
+
+            with col3:
+                if st.form_submit_button("Reset", width="stretch"):
+                    st.session_state.events_draft = st.session_state.events_data
+                    st.rerun()
         
         # Black Swan Scenario Section
         st.markdown("---")
@@ -872,38 +1352,24 @@ def show_scenarios_page():
     st.markdown("## Scenario Management")
     st.markdown("Manage your saved retirement planning scenarios.")
     
-    # Load saved scenarios
-    if 'saved_scenarios' not in st.session_state:
-        st.session_state.saved_scenarios = load_scenarios()
-    
-    saved_scenarios = st.session_state.saved_scenarios
+    # Load saved scenarios (parsing is cached until the file changes)
+    saved_scenarios = load_scenarios()
     
     if not saved_scenarios:
         st.info("No saved scenarios yet. Return to the dashboard to create and save your first scenario.")
     else:
-        # Initialize selected scenario in session state
-        if 'selected_scenario_for_action' not in st.session_state:
-            st.session_state.selected_scenario_for_action = None
-        
-        # Create DataFrame with key scenario details and selection checkbox
-        scenarios_data = []
-        for name, scenario in saved_scenarios.items():
-            scenarios_data.append({
-                'Select': name == st.session_state.selected_scenario_for_action,
-                'Name': name,
-                'Current Age': scenario.current_age,
-                'Retirement Age': scenario.retirement_age,
-                'End Age': scenario.end_age,
-                'Current Balance': scenario.current_balance,
-                'Withdrawal Method': scenario.withdrawal_method,
-                'Monte Carlo': scenario.enable_mc,
-                'Taxes Enabled': scenario.enable_taxes
-            })
-        
-        scenarios_df = pd.DataFrame(scenarios_data)
+        # Summary table (cached per file version) plus the per-session selection
+        # checkbox; reruns that change neither reuse the table already rendered
+        table_key = (SCENARIOS_FILE.stat().st_mtime_ns, st.session_state.selected_scenario_for_action)
+        if st.session_state.get('scenarios_table_key') != table_key:
+            scenarios_df = _scenarios_table(table_key[0])
+            scenarios_df.insert(0, 'Select', scenarios_df['Name'].eq(st.session_state.selected_scenario_for_action))
+            st.session_state.scenarios_table = scenarios_df
+            st.session_state.scenarios_table_key = table_key
+        scenarios_df = st.session_state.scenarios_table
         
         # Use data_editor to allow checkbox selection
-        edited_df = st.data_editor(
+        st.data_editor(
             scenarios_df,
             use_container_width=True,
             disabled=['Name', 'Current Age', 'Retirement Age', 'End Age', 'Current Balance', 'Withdrawal Method', 'Monte Carlo', 'Taxes Enabled'],
@@ -922,10 +1388,19 @@ def show_scenarios_page():
             key="scenarios_editor"
         )
         
-        # Determine which scenario is selected (only one should be selected)
-        selected_rows = edited_df[edited_df['Select'] == True]
-        if len(selected_rows) > 0:
-            st.session_state.selected_scenario_for_action = selected_rows.iloc[0]['Name']
+        # Determine which scenario is selected from the editor's row diff
+        # rather than rescanning the whole Select column; the first checked
+        # row wins (only one should be selected)
+        edits = st.session_state.get('scenarios_editor', {}).get('edited_rows', {})
+        checked_rows = {int(row) for row, changes in edits.items() if changes.get('Select') is True}
+        unchecked_rows = {int(row) for row, changes in edits.items() if changes.get('Select') is False}
+        previous = st.session_state.selected_scenario_for_action
+        if previous in saved_scenarios:
+            previous_row = list(saved_scenarios).index(previous)
+            if previous_row not in unchecked_rows:
+                checked_rows.add(previous_row)
+        if checked_rows:
+            st.session_state.selected_scenario_for_action = scenarios_df.iloc[min(checked_rows)]['Name']
         else:
             st.session_state.selected_scenario_for_action = None
         
@@ -947,28 +1422,13 @@ def show_scenarios_page():
                 if st.session_state.selected_scenario_for_action:
                     scenario = saved_scenarios[st.session_state.selected_scenario_for_action]
                     
-                    # Update all session state values from the scenario
-                    st.session_state.current_age = scenario.current_age
-                    st.session_state.retirement_age = scenario.retirement_age
-                    st.session_state.end_age = scenario.end_age
-                    st.session_state.current_balance = scenario.current_balance
-                    st.session_state.contrib_amount = scenario.contrib_amount
-                    st.session_state.contrib_cadence = scenario.contrib_cadence
-                    st.session_state.nominal_return_pct = scenario.nominal_return_pct
-                    st.session_state.return_stdev_pct = scenario.return_stdev_pct
-                    st.session_state.inflation_pct = scenario.inflation_pct
-                    st.session_state.fee_pct = scenario.fee_pct
-                    st.session_state.withdrawal_method = scenario.withdrawal_method
-                    st.session_state.withdrawal_pct = scenario.withdrawal_pct
-                    st.session_state.withdrawal_real_amount = scenario.withdrawal_real_amount
-                    st.session_state.withdrawal_frequency = scenario.withdrawal_frequency
-                    st.session_state.events_data = scenario.liquidity_events
-                    st.session_state.events_draft = scenario.liquidity_events.copy()
-                    st.session_state.enable_mc = scenario.enable_mc
-                    st.session_state.mc_runs = scenario.mc_runs
-                    st.session_state.enable_taxes = scenario.enable_taxes
-                    st.session_state.effective_tax_rate_pct = scenario.effective_tax_rate_pct
-                    st.session_state.inflation_enabled = getattr(scenario, 'inflation_enabled', True)
+                    # Update all session state values from the scenario in one merge
+                    loaded_events = events_frame(scenario.liquidity_events)
+                    st.session_state.update(
+                        {field: getattr(scenario, field) for field in SCENARIO_SESSION_FIELDS},
+                        events_data=loaded_events,
+                        events_draft=loaded_events
+                    )
                     
                     st.success(f"Loaded scenario: {st.session_state.selected_scenario_for_action}")
                     st.session_state.selected_scenario_for_action = None  # Reset selection
@@ -982,7 +1442,6 @@ def show_scenarios_page():
                     deleted_name = st.session_state.selected_scenario_for_action
                     # Remove from dict and save
                     del saved_scenarios[deleted_name]
-                    st.session_state.saved_scenarios = saved_scenarios
                     save_scenarios(saved_scenarios)
                     st.session_state.selected_scenario_for_action = None  # Reset selection
                     st.success(f"🗑️ Deleted scenario: {deleted_name}")
@@ -996,277 +1455,1188 @@ def show_scenarios_page():
 
 
 # ============================================================================
-# MAIN APP
+# DISPLAY HELPERS
 # ============================================================================
 
-def main():
-    st.set_page_config(
-        page_title="Gordon Goss | Retirement Planning",
-        page_icon="",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    # Custom CSS for Gordon Goss branding
-    st.markdown("""
-        <style>
-        /* Gordon Goss Brand Styling */
-        .main {
-            background-color: #ffffff;
-        }
-        
-        /* Header styling */
-        h1, h2, h3 {
-            color: #003d29 !important;
-            font-family: 'Helvetica Neue', Arial, sans-serif;
-            font-weight: 300;
-            letter-spacing: 0.5px;
-        }
-        
-        h1 {
-            font-size: 2.5rem !important;
-            margin-bottom: 0.5rem !important;
-            border-bottom: 2px solid #c9a961;
-            padding-bottom: 1rem;
-        }
-        
-        /* Sidebar styling */
-        [data-testid="stSidebar"] {
-            background-color: #f8f8f8;
-            border-right: 1px solid #e0e0e0;
-        }
-        
-        [data-testid="stSidebar"] h1, 
-        [data-testid="stSidebar"] h2, 
-        [data-testid="stSidebar"] h3 {
-            color: #003d29 !important;
-        }
-        
-        /* Metrics styling */
-        [data-testid="stMetricValue"] {
-            color: #003d29 !important;
-            font-weight: 400;
-        }
-        
-        [data-testid="stMetricLabel"] {
-            color: #2c2c2c !important;
-            font-size: 0.9rem;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        
-        /* Button styling */
-        .stButton > button {
-            background-color: #003d29;
-            color: white;
-            border: none;
-            padding: 0.5rem 2rem;
-            font-weight: 400;
-            letter-spacing: 0.5px;
-            transition: all 0.3s ease;
-        }
+@st.cache_data(ttl=3600, show_spinner=False)
+def _current_year() -> int:
+    """Calendar year used for the Year x-axis; refreshed hourly rather than read every rerun."""
+    return datetime.now().year
+
+
+def format_currency(values: pd.Series, spec: str = ",.0f") -> pd.Series:
+    """Format a numeric column as dollar strings, e.g. $1,234 (one bound str.format, no per-cell lambda)."""
+    return values.map(f"${{:{spec}}}".format)
+
+
+def events_by_year(events: List[LiquidityEvent], current_age: int, end_age: int) -> List[List[LiquidityEvent]]:
+    """
+    Group enabled events by the projection years they affect.
+    Returns one list per year, indexed by age - current_age (one-time events
+    land on start_age, recurring events on every age from start_age to end_age).
+    """
+    num_years = end_age - current_age + 1
+    buckets = [[] for _ in range(num_years)]
+    for event in events:
+        if not event.enabled:
+            continue
+        last_age = event.start_age if event.recurrence == "One-time" else event.end_age
+        start_idx = max(event.start_age - current_age, 0)
+        end_idx = min(last_age - current_age, num_years - 1)
+        if start_idx > end_idx:
+            continue
+        for bucket in buckets[start_idx:end_idx + 1]:
+            bucket.append(event)
+    return buckets
+
+
+def event_hover_blocks(events_per_year: List[List[LiquidityEvent]]) -> List[str]:
+    """
+    Build the liquidity-event section of the balance hover text for each
+    projection year; years without events get an empty string.
+    """
+    # Annualized amount and hover line per event, formatted once however many years it recurs
+    event_summaries = {}
+    for events_at_age in events_per_year:
+        for event in events_at_age:
+            if event in event_summaries:
+                continue
+            amount = event.amount
+            recur_label = event.recurrence
+            if event.recurrence == "Monthly":
+                amount *= 12
+                recur_label = "Annual"  # Display as Annual since we show the yearly total
+            event_type = "↑" if amount > 0 else "↓"
+            recur_text = f" ({recur_label})" if event.recurrence != "One-time" else ""
+            event_summaries[event] = (amount, f"  {event_type} {event.label}: ${abs(amount):,.0f}{recur_text}")
+    
+    blocks = []
+    for events_at_age in events_per_year:
+        if not events_at_age:
+            blocks.append("")
+            continue
+        hover_parts = ["", "<b>Liquidity Events:</b>"]
         
-        .stButton > button:hover {
-            background-color: #00563a;
-            box-shadow: 0 2px 8px rgba(0, 61, 41, 0.3);
-        }
+        total_inflow = 0.0
+        total_outflow = 0.0
         
-        /* Download button styling */
-        .stDownloadButton > button {
-            background-color: #c9a961;
-            color: #1a1a1a;
-            border: none;
-            padding: 0.5rem 2rem;
-            font-weight: 400;
-            letter-spacing: 0.5px;
-        }
+        for event in events_at_age:
+            amount, line = event_summaries[event]
+            if amount > 0:
+                total_inflow += amount
+            else:
+                total_outflow += amount
+            hover_parts.append(line)
+        
+        # Add net summary
+        net_amount = total_inflow + total_outflow
+        if net_amount > 0:
+            hover_parts.append(f"  <b>Net: +${net_amount:,.0f}</b>")
+        elif net_amount < 0:
+            hover_parts.append(f"  <b>Net: -${abs(net_amount):,.0f}</b>")
+        else:
+            hover_parts.append(f"  <b>Net: $0</b>")
         
-        .stDownloadButton > button:hover {
-            background-color: #d4b56d;
-            box-shadow: 0 2px 8px rgba(201, 169, 97, 0.4);
-        }
-        
-        /* Dataframe styling */
-        .dataframe {
-            font-family: 'Helvetica Neue', Arial, sans-serif;
-            font-size: 0.9rem;
-        }
-        
-        /* Info/warning box styling */
-        .stAlert {
-            border-left: 4px solid #c9a961;
-        }
-        
-        /* Expander styling */
-        .streamlit-expanderHeader {
-            background-color: #f8f8f8;
-            border: 1px solid #e0e0e0;
-            color: #003d29;
-            font-weight: 400;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-    
-    # Gordon Goss Header
-    st.markdown("""
-        <div style="text-align: left; padding: 1rem 0 2rem 0;">
-            <h1 style="margin: 0; color: #003d29; font-weight: 300; letter-spacing: 2px;">
-                GORDON GOSS
-            </h1>
-            <p style="margin: 0; color: #c9a961; font-size: 1.1rem; letter-spacing: 3px; font-weight: 300;">
-                RETIREMENT PLANNING
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    # Initialize page routing
-    if 'page' not in st.session_state:
-        st.session_state.page = "dashboard"
-    
-    # Check if we should show the liquidity events page
-    if st.session_state.page == "liquidity_events":
-        planning_end_age = st.session_state.get('liquidity_events_end_age', END_AGE)
-        show_liquidity_events_page(planning_end_age)
-        return  # Exit main function after showing liquidity events page
-    
-    # Check if we should show the scenarios management page
-    if st.session_state.page == "scenarios":
-        show_scenarios_page()
-        return  # Exit main function after showing scenarios page
+        blocks.append("<br>" + "<br>".join(hover_parts))
+    return blocks
+
+
+def balance_hover_texts(
+    title: str,
+    timeline: pd.DataFrame,
+    balance_col: str,
+    value_type: str,
+    events_per_year: List[List[LiquidityEvent]]
+) -> List[str]:
+    """
+    Hover text for each year of a balance line: title, age, balance, then any liquidity events.
+    events_per_year is aligned with the timeline rows (see events_by_year).
+    """
+    if not any(events_per_year):
+        # No liquidity events in any year: the text is just title, age and balance
+        return (
+            f"{title}<br>Age: " + timeline['age'].astype(str)
+            + f"<br>Balance ({value_type}): " + format_currency(timeline[balance_col])
+        ).tolist()
+    
+    event_blocks = event_hover_blocks(events_per_year)
+    return [
+        f"{title}<br>Age: {age}<br>Balance ({value_type}): ${balance:,.0f}{event_block}"
+        for age, balance, event_block in zip(timeline['age'].tolist(), timeline[balance_col].tolist(), event_blocks)
+    ]
+
+
+def liquidity_legend_text(
+    header: List[str],
+    recurring_events: List[LiquidityEvent],
+    scenario: Scenario,
+    ages_on_own_line: bool
+) -> str:
+    """
+    Text for a chart's liquidity-event legend box: the header lines, recurring
+    events (credits then debits, as yearly totals) and the scenario's black swan.
+    ages_on_own_line puts each "(Age start-end)" on its own line, for the narrower
+    side-by-side comparison boxes.
+    """
+    legend_lines = list(header)
+    
+    if recurring_events:
+        legend_lines.append("<b>Recurring:</b>")
+        
+        # Credits first, then debits; always per year since we display annual totals
+        # (zero-amount events belong to neither)
+        credits, debits = [], []
+        for event in recurring_events:
+            if event.amount > 0:
+                credits.append(event)
+            elif event.amount < 0:
+                debits.append(event)
+        for sign, events in (("+", credits), ("-", debits)):
+            for event in events:
+                amount = event.amount * 12 if event.recurrence == "Monthly" else event.amount
+                entry = f"  {sign} {event.label}: ${abs(amount):,.0f}/yr"
+                ages = f"(Age {event.start_age}-{event.end_age})"
+                if ages_on_own_line:
+                    legend_lines.extend((entry, f"    {ages}"))
+                else:
+                    legend_lines.append(f"{entry} {ages}")
     
-    # Load saved scenarios
-    saved_scenarios = load_scenarios()
+    # Add Black Swan to legend if enabled
+    if hasattr(scenario, 'black_swan_enabled') and scenario.black_swan_enabled:
+        legend_lines.append("<b>Black Swan:</b>")
+        legend_lines.append(f"  🦢 Portfolio Loss: {getattr(scenario, 'black_swan_loss_pct', 50.0):.1f}%")
+        legend_lines.append(f"    (Age {getattr(scenario, 'black_swan_age', 70)})")
     
-    # Sidebar
-    st.sidebar.markdown("### Configuration")
+    return "<br>".join(legend_lines)
+
+
+def liquidity_events_table(liquidity_events: List[LiquidityEvent]) -> pd.DataFrame:
+    """
+    One row per liquidity event under display headings (Type, Label, Start Age, End Age,
+    Amount, Recurrence, Taxable, Tax Rate); values are left raw for each table to format.
+    """
+    return pd.DataFrame({
+        "Type": [evt.type for evt in liquidity_events],
+        "Label": [evt.label for evt in liquidity_events],
+        "Start Age": [evt.start_age for evt in liquidity_events],
+        "End Age": [evt.end_age for evt in liquidity_events],
+        "Amount": [evt.amount for evt in liquidity_events],
+        "Recurrence": [evt.recurrence for evt in liquidity_events],
+        "Taxable": [evt.taxable for evt in liquidity_events],
+        "Tax Rate": [evt.tax_rate for evt in liquidity_events],
+    })
+
+
+def timeline_key(timeline: pd.DataFrame) -> bytes:
+    """
+    Content digest of a timeline. Cached helpers take it alongside the frame (passed
+    as an underscore argument, which Streamlit doesn't hash), so each timeline is
+    fingerprinted once per rerun instead of once per cached call.
+    """
+    return hashlib.blake2b(pd.util.hash_pandas_object(timeline, index=True).to_numpy().tobytes(), digest_size=16).digest()
+
+
+# Chart figures are pure functions of their arguments. st.cache_resource hands back the
+# stored Figure as-is (no pickling round-trip); callers only render/export it, never mutate it.
+@st.cache_resource(ttl=3600, max_entries=8, show_spinner=False)
+def build_balance_figure(
+    scenario_a: Scenario,
+    liquidity_events_a: List[LiquidityEvent],
+    _timeline_a: pd.DataFrame,
+    timeline_a_key: bytes,
+    scenario_b: Optional[Scenario],
+    _timeline_b: Optional[pd.DataFrame],
+    timeline_b_key: Optional[bytes],
+    mc_results_a: Optional[Dict[str, Any]],
+    show_real: bool,
+    x_axis_mode: str,
+    age_to_year_offset: int,
+    retirement_age: int
+) -> go.Figure:
+    """
+    Build the portfolio balance chart: balance lines, Monte Carlo bands (when
+    mc_results_a is given), event markers, legends and black swan markers.
+    Scenario B is drawn only when comparing, i.e. when scenario_b is given.
+    The timelines are cached by their timeline_key digests.
+    """
+    timeline_a, timeline_b = _timeline_a, _timeline_b
+    compare_scenarios = scenario_b is not None
+    enable_mc = mc_results_a is not None
     
-    # Currency
-    st.sidebar.markdown(f"**Currency:** {CURRENCY}")
+    # Prepare event grouping for chart (needed before creating traces)
+    # Separate one-time and recurring events FOR SCENARIO A
+    one_time_events = []
+    recurring_events = []
     
-    # Basic inputs
-    st.sidebar.markdown("#### Personal Information")
+    for event in liquidity_events_a:
+        if not event.enabled:
+            continue
+        if event.recurrence == "One-time":
+            one_time_events.append(event)
+        else:
+            recurring_events.append(event)
     
-    # Initialize age parameters in session state with defaults if not present
-    if 'current_age' not in st.session_state:
-        st.session_state.current_age = CURRENT_AGE
-    if 'retirement_age' not in st.session_state:
-        st.session_state.retirement_age = RETIREMENT_AGE
-    if 'end_age' not in st.session_state:
-        st.session_state.end_age = END_AGE
+    # Group ALL events (one-time + recurring) by projection year for hover information FOR SCENARIO A
+    events_per_year_a = events_by_year(liquidity_events_a, scenario_a.current_age, scenario_a.end_age)
     
-    # Create sliders with number inputs
-    current_age = st.sidebar.number_input(
-        "Current age",
-        min_value=18,
-        max_value=80,
-        value=int(st.session_state.current_age),
-        help="Your current age",
-        key="current_age_input"
-    )
-    st.session_state.current_age = current_age
+    # Group ONE-TIME events by age for markers on the chart
+    # (with the per-age total accumulated alongside for the marker size/label)
+    one_time_by_age = {}
+    one_time_total_by_age = {}
+    for event in one_time_events:
+        age = event.start_age
+        if age not in one_time_by_age:
+            one_time_by_age[age] = []
+            one_time_total_by_age[age] = 0.0
+        one_time_by_age[age].append(event)
+        one_time_total_by_age[age] += event.amount
     
-    retirement_age = st.sidebar.number_input(
-        "Retirement age",
-        min_value=current_age,
-        max_value=max(current_age + 1, 100),
-        value=int(st.session_state.retirement_age) if st.session_state.retirement_age >= current_age else current_age,
-        help="Age when you plan to retire",
-        key="retirement_age_input"
-    )
-    st.session_state.retirement_age = retirement_age
+    # Prepare event grouping for SCENARIO B if comparing
+    one_time_events_b = []
+    recurring_events_b = []
+    events_per_year_b = []
+    one_time_by_age_b = {}
+    one_time_total_by_age_b = {}
     
-    end_age = st.sidebar.number_input(
-        "End age (planning horizon)",
-        min_value=retirement_age,
-        max_value=max(retirement_age + 1, 110),
-        value=int(st.session_state.end_age) if st.session_state.end_age >= retirement_age else retirement_age,
-        help="Plan until this age",
-        key="end_age_input"
-    )
-    st.session_state.end_age = end_age
+    if compare_scenarios and scenario_b:
+        events_b_list = [event_from_dict(e) for e in scenario_b.liquidity_events]
+        
+        for event in events_b_list:
+            if not event.enabled:
+                continue
+            if event.recurrence == "One-time":
+                one_time_events_b.append(event)
+            else:
+                recurring_events_b.append(event)
+        
+        # Group ALL events by projection year for hover
+        events_per_year_b = events_by_year(events_b_list, scenario_b.current_age, scenario_b.end_age)
+        
+        # Group ONE-TIME events by age for markers
+        for event in one_time_events_b:
+            age = event.start_age
+            if age not in one_time_by_age_b:
+                one_time_by_age_b[age] = []
+                one_time_total_by_age_b[age] = 0.0
+            one_time_by_age_b[age].append(event)
+            one_time_total_by_age_b[age] += event.amount
     
-    # Financial inputs
-    st.sidebar.markdown("#### Current Portfolio")
+    # Balance lines, Monte Carlo bands and event markers are WebGL (Scattergl) traces;
+    # the black swan markers below stay SVG so their emoji label renders reliably
+    fig = go.Figure()
     
-    # Initialize defaults only on first load
-    if 'current_balance' not in st.session_state:
-        st.session_state.current_balance = float(CURRENT_BALANCE)
-    if 'contrib_amount' not in st.session_state:
-        st.session_state.contrib_amount = float(CONTRIB_AMOUNT)
+    # Scenario A
+    balance_col = 'end_balance_real' if show_real else 'end_balance_nominal'
+    value_type = 'Real' if show_real else 'Nominal'
     
-    current_balance = st.sidebar.number_input(
-        "Current combined balance ($)",
-        min_value=0.0,
-        value=float(st.session_state.current_balance),
-        step=10000.0,
-        help="Your total portfolio value today",
-        key="current_balance_input",
-        format="%.2f"
-    )
-    st.session_state.current_balance = current_balance
+    # Build custom hover text that includes event information
+    if compare_scenarios and scenario_b:
+        hover_title_a = f"<b>═══ {scenario_a.name.upper()} ═══</b>"
+    else:
+        hover_title_a = "<b>Portfolio Balance</b>"
+    hover_texts = balance_hover_texts(hover_title_a, timeline_a, balance_col, value_type, events_per_year_a)
     
-    # Display formatted currency
-    st.sidebar.caption(f"**${current_balance:,.2f}**")
+    # Prepare x-axis values based on toggle
+    x_values_a = timeline_a['age'].to_numpy()
+    if x_axis_mode == "Year":
+        x_values_a = x_values_a + age_to_year_offset
     
-    st.sidebar.markdown("#### Ongoing Contributions")
-    contrib_amount = st.sidebar.number_input(
-        "Contribution amount ($)",
-        min_value=0.0,
-        value=float(st.session_state.contrib_amount),
-        step=100.0,
-        help="How much you contribute each period",
-        key="contrib_amount_input",
-        format="%.2f"
-    )
-    st.session_state.contrib_amount = contrib_amount
+    fig.add_trace(go.Scattergl(
+        x=x_values_a,
+        y=timeline_a[balance_col].to_numpy(),
+        mode='lines',
+        name=f"{scenario_a.name} ({value_type})",
+        line=dict(color='#003d29', width=2.5),
+        hovertext=hover_texts,
+        hovertemplate="%{hovertext}<extra></extra>"
+    ))
     
-    # Display formatted currency
-    st.sidebar.caption(f"**${contrib_amount:,.2f}**")
+    # Monte Carlo bands for Scenario A (only if not comparing)
+    if enable_mc and mc_results_a and not compare_scenarios:
+        # Convert to years if needed
+        x_mc_values = np.arange(scenario_a.current_age, scenario_a.end_age + 1)
+        if x_axis_mode == "Year":
+            x_mc_values += age_to_year_offset
+        
+        x_label = "Year" if x_axis_mode == "Year" else "Age"
+        
+        fig.add_trace(go.Scattergl(
+            x=x_mc_values,
+            y=mc_results_a['p90_path'],
+            mode='lines',
+            name='90th Percentile',
+            line=dict(color='#c9a961', width=1, dash='dot'),
+            showlegend=True,
+            hovertemplate=(
+                "<b>90th Percentile</b><br>" +
+                f"{x_label}: %{{x}}<br>" +
+                f"Balance ({value_type}): $%{{y:,.0f}}<br>" +
+                "<extra></extra>"
+            )
+        ))
+        
+        fig.add_trace(go.Scattergl(
+            x=x_mc_values,
+            y=mc_results_a['p10_path'],
+            mode='lines',
+            name='10th Percentile',
+            line=dict(color='#c9a961', width=1, dash='dot'),
+            fill='tonexty',
+            fillcolor='rgba(201, 169, 97, 0.15)',
+            showlegend=True,
+            hovertemplate=(
+                "<b>10th Percentile</b><br>" +
+                f"{x_label}: %{{x}}<br>" +
+                f"Balance ({value_type}): $%{{y:,.0f}}<br>" +
+                "<extra></extra>"
+            )
+        ))
     
-    # Initialize contrib_cadence in session state if not present
-    if 'contrib_cadence' not in st.session_state:
-        st.session_state.contrib_cadence = 'Monthly'
+    # Scenario B
+    if compare_scenarios and timeline_b is not None and scenario_b is not None:
+        # Build custom hover text for scenario B including its events
+        hover_texts_b = balance_hover_texts(
+            f"<b>═══ {scenario_b.name.upper()} ═══</b>", timeline_b, balance_col, value_type, events_per_year_b
+        )
+        
+        # Prepare x-axis for scenario B
+        x_values_b = timeline_b['age'].to_numpy()
+        if x_axis_mode == "Year":
+            x_values_b = x_values_b + age_to_year_offset
+        
+        fig.add_trace(go.Scattergl(
+            x=x_values_b,
+            y=timeline_b[balance_col].to_numpy(),
+            mode='lines',
+            name=f"{scenario_b.name} ({value_type})",
+            line=dict(color='#2c2c2c', width=2, dash='dash'),
+            hovertext=hover_texts_b,
+            hovertemplate="%{hovertext}<extra></extra>"
+        ))
     
-    contrib_cadence = st.sidebar.radio(
-        "Contribution cadence",
-        options=["Monthly", "Annual"],
-        index=0 if st.session_state.contrib_cadence == 'Monthly' else 1,
-        help="Contributions stop automatically at retirement"
+    # Retirement age vertical line
+    retirement_x = retirement_age + age_to_year_offset if x_axis_mode == "Year" else retirement_age
+    fig.add_vline(
+        x=retirement_x,
+        line_dash="dash",
+        line_color="#c9a961",
+        annotation_text="Retirement",
+        annotation_position="top",
+        annotation_font_color="#003d29"
     )
-    st.session_state.contrib_cadence = contrib_cadence
-    
-    # Returns & inflation
-    st.sidebar.markdown("#### Market Assumptions")
-    
-    # Initialize market assumption parameters in session state if not present
-    if 'nominal_return_pct' not in st.session_state:
-        st.session_state.nominal_return_pct = NOMINAL_RETURN_PCT
-    if 'inflation_pct' not in st.session_state:
-        st.session_state.inflation_pct = INFLATION_PCT
-    if 'inflation_enabled' not in st.session_state:
-        st.session_state.inflation_enabled = True
-    if 'fee_pct' not in st.session_state:
-        st.session_state.fee_pct = FEE_PCT
     
-    nominal_return_pct = st.sidebar.number_input(
-        "Expected nominal return (%)",
-        min_value=0.0,
-        max_value=20.0,
-        value=float(st.session_state.nominal_return_pct),
-        step=0.1,
-        help="Expected annual return before inflation",
-        key="nominal_return_input",
-        format="%.1f"
+    # Add zero line to clearly show when portfolio goes negative
+    fig.add_hline(
+        y=0,
+        line_dash="solid",
+        line_color="#8b2635",
+        line_width=1,
+        opacity=0.5
     )
-    st.session_state.nominal_return_pct = nominal_return_pct
     
-    inflation_pct = st.sidebar.number_input(
-        "Inflation (%)",
-        min_value=0.0,
-        max_value=10.0,
-        value=float(st.session_state.inflation_pct),
-        step=0.1,
-        help="Expected annual inflation",
+    # Plot ONE marker per age for ONE-TIME events only, all in a single trace per scenario
+    x_label_text = "Year" if x_axis_mode == "Year" else "Age"
+    # Balance on the line at each age, for placing the event and black swan markers
+    balance_by_age = dict(zip(timeline_a['age'].tolist(), timeline_a[balance_col].tolist()))
+    marker_xs, marker_ys, marker_labels, marker_colors, marker_hovers = [], [], [], [], []
+    for age, events in one_time_by_age.items():
+        if age not in balance_by_age:
+            continue
+        
+        total_amount = one_time_total_by_age[age]
+        
+        # Determine marker color
+        if total_amount > 0:
+            marker_color = '#c9a961'  # Gold for inflow
+        elif total_amount < 0:
+            marker_color = '#8b2635'  # Burgundy for outflow
+        else:
+            marker_color = '#6b6b6b'  # Gray
+        
+        # Create label
+        if len(events) == 1:
+            label_text = events[0].label[:12]
+        else:
+            label_text = f"{len(events)} Events"
+        
+        # Simple hover for the marker (detailed info comes from portfolio line hover)
+        event_names = ", ".join([e.label for e in events])
+        
+        # Calculate x position based on mode
+        marker_x = age + age_to_year_offset if x_axis_mode == "Year" else age
+        
+        # Marker sits on the balance line at this age
+        marker_xs.append(marker_x)
+        marker_ys.append(balance_by_age[age])
+        marker_labels.append(label_text)
+        marker_colors.append(marker_color)
+        marker_hovers.append(f"<b>{event_names}</b><br>{x_label_text} {marker_x}")
+    
+    if marker_xs:
+        fig.add_trace(go.Scattergl(
+            x=marker_xs,
+            y=marker_ys,
+            mode='markers+text',
+            name="One-time events",
+            marker=dict(
+                size=14,
+                color=marker_colors,
+                symbol='diamond',
+                line=dict(color='#003d29', width=2)
+            ),
+            text=marker_labels,
+            textposition='top center',
+            textfont=dict(size=9, color='#003d29', family="Helvetica Neue, Arial, sans-serif"),
+            hovertext=marker_hovers,
+            hovertemplate="%{hovertext}<extra></extra>",
+            hoverlabel=dict(
+                bgcolor='#f8f8f8',
+                font_size=12,
+                font_family="Helvetica Neue, Arial, sans-serif",
+                bordercolor=marker_colors
+            ),
+            showlegend=False
+        ))
+    
+    # Plot markers for Scenario B one-time events
+    if compare_scenarios and timeline_b is not None:
+        # Balance on scenario B's line at each age (also used for its black swan marker)
+        balance_by_age_b = dict(zip(timeline_b['age'].tolist(), timeline_b[balance_col].tolist()))
+        marker_xs_b, marker_ys_b, marker_labels_b, marker_colors_b, marker_hovers_b = [], [], [], [], []
+        for age, events in one_time_by_age_b.items():
+            if age not in balance_by_age_b:
+                continue
+            
+            total_amount = one_time_total_by_age_b[age]
+            
+            # Determine marker color (use slightly different colors for scenario B)
+            if total_amount > 0:
+                marker_color = '#ffd700'  # Bright gold for inflow
+            elif total_amount < 0:
+                marker_color = '#dc143c'  # Crimson for outflow
+            else:
+                marker_color = '#808080'  # Gray
+            
+            # Create label
+            if len(events) == 1:
+                label_text = events[0].label[:12]
+            else:
+                label_text = f"{len(events)} Events"
+            
+            # Simple hover for the marker
+            event_names = ", ".join([e.label for e in events])
+            
+            # Calculate x position based on mode
+            marker_x_b = age + age_to_year_offset if x_axis_mode == "Year" else age
+            
+            # Marker sits on scenario B's balance line at this age
+            marker_xs_b.append(marker_x_b)
+            marker_ys_b.append(balance_by_age_b[age])
+            marker_labels_b.append(label_text)
+            marker_colors_b.append(marker_color)
+            marker_hovers_b.append(f"<b>{scenario_b.name}: {event_names}</b><br>{x_label_text} {marker_x_b}")
+        
+        if marker_xs_b:
+            fig.add_trace(go.Scattergl(
+                x=marker_xs_b,
+                y=marker_ys_b,
+                mode='markers+text',
+                name="One-time events (B)",
+                marker=dict(
+                    size=14,
+                    color=marker_colors_b,
+                    symbol='square',  # Use square for scenario B to differentiate
+                    line=dict(color='#2c2c2c', width=2)
+                ),
+                text=marker_labels_b,
+                textposition='bottom center',
+                textfont=dict(size=9, color='#2c2c2c', family="Helvetica Neue, Arial, sans-serif"),
+                hovertext=marker_hovers_b,
+                hovertemplate="%{hovertext}<extra></extra>",
+                hoverlabel=dict(
+                    bgcolor='#f0f0f0',
+                    font_size=12,
+                    font_family="Helvetica Neue, Arial, sans-serif",
+                    bordercolor=marker_colors_b
+                ),
+                showlegend=False
+            ))
+    
+    # Add recurring events legend box (annotation)
+    # When comparing scenarios, create TWO separate legend boxes for clarity
+    if compare_scenarios and scenario_b and (recurring_events or recurring_events_b):
+        # SCENARIO A LEGEND (Left side)
+        if recurring_events or (hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled):
+            fig.add_annotation(
+                xref="paper", yref="paper",
+                x=0.02, y=0.02,
+                xanchor='left', yanchor='bottom',
+                text=liquidity_legend_text(
+                    [f"<b>{scenario_a.name}</b>", "<b>Liquidity Events:</b>"], recurring_events, scenario_a, ages_on_own_line=True
+                ),
+                showarrow=False,
+                font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
+                bgcolor='rgba(255, 255, 255, 0.9)',
+                bordercolor='#003d29',
+                borderwidth=2,
+                borderpad=8,
+                align='left'
+            )
+        
+        # SCENARIO B LEGEND (Right side)
+        if recurring_events_b or (hasattr(scenario_b, 'black_swan_enabled') and scenario_b.black_swan_enabled):
+            fig.add_annotation(
+                xref="paper", yref="paper",
+                x=0.98, y=0.02,
+                xanchor='right', yanchor='bottom',
+                text=liquidity_legend_text(
+                    [f"<b>{scenario_b.name}</b>", "<b>Liquidity Events:</b>"], recurring_events_b, scenario_b, ages_on_own_line=True
+                ),
+                showarrow=False,
+                font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
+                bgcolor='rgba(255, 255, 255, 0.9)',
+                bordercolor='#2c2c2c',
+                borderwidth=2,
+                borderpad=8,
+                align='left'
+            )
+    
+    # Single scenario legend (original behavior)
+    elif (recurring_events or (hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled)) and not compare_scenarios:
+        fig.add_annotation(
+            xref="paper", yref="paper",
+            x=0.98, y=0.02,
+            xanchor='right', yanchor='bottom',
+            text=liquidity_legend_text(["<b>Liquidity Events:</b>"], recurring_events, scenario_a, ages_on_own_line=False),
+            showarrow=False,
+            font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
+            bgcolor='rgba(255, 255, 255, 0.9)',
+            bordercolor='#003d29',
+            borderwidth=2,
+            borderpad=8,
+            align='left'
+        )
+    
+    # Determine x-axis title for labels
+    x_axis_title_text = "Year" if x_axis_mode == "Year" else "Age"
+    
+    # Add Black Swan marker for Scenario A if enabled
+    if hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled:
+        black_swan_age = getattr(scenario_a, 'black_swan_age', 70)
+        
+        # Get the balance at black swan age from timeline_a
+        try:
+            if black_swan_age in balance_by_age:
+                black_swan_balance = balance_by_age[black_swan_age]
+                
+                # Convert age to year if needed
+                if x_axis_mode == "Year":
+                    marker_x = black_swan_age + age_to_year_offset
+                else:
+                    marker_x = black_swan_age
+                
+                # Add a scatter marker for the black swan event
+                marker_name = f'Black Swan Event ({scenario_a.name})' if compare_scenarios else 'Black Swan Event'
+                fig.add_trace(go.Scatter(
+                    x=[marker_x],
+                    y=[black_swan_balance],
+                    mode='markers+text',
+                    marker=dict(
+                        symbol='circle',
+                        size=15,
+                        color='#003d29',  # Dark green to match scenario A
+                        line=dict(color='white', width=2)
+                    ),
+                    text=['🦢'],
+                    textfont=dict(size=14),
+                    textposition='top center',
+                    name=marker_name,
+                    showlegend=False,
+                    hovertemplate=(
+                        f"<b>Black Swan Event - {scenario_a.name}</b><br>" +
+                        f"{x_axis_title_text}: {marker_x}<br>" +
+                        f"Portfolio Loss: {getattr(scenario_a, 'black_swan_loss_pct', 50.0):.1f}%<br>" +
+                        "<extra></extra>"
+                    )
+                ))
+        except Exception:
+            pass  # Silently skip if black swan age not in timeline
+    
+    # Add Black Swan marker for Scenario B if comparing and enabled
+    if compare_scenarios and scenario_b and hasattr(scenario_b, 'black_swan_enabled') and scenario_b.black_swan_enabled:
+        black_swan_age_b = getattr(scenario_b, 'black_swan_age', 70)
+        
+        # Get the balance at black swan age from timeline_b
+        try:
+            if black_swan_age_b in balance_by_age_b:
+                black_swan_balance_b = balance_by_age_b[black_swan_age_b]
+                
+                # Convert age to year if needed
+                if x_axis_mode == "Year":
+                    marker_x_b = black_swan_age_b + age_to_year_offset
+                else:
+                    marker_x_b = black_swan_age_b
+                
+                # Add a scatter marker for the black swan event (different color for scenario B)
+                fig.add_trace(go.Scatter(
+                    x=[marker_x_b],
+                    y=[black_swan_balance_b],
+                    mode='markers+text',
+                    marker=dict(
+                        symbol='circle',
+                        size=15,
+                        color='#2c2c2c',  # Dark gray to match scenario B
+                        line=dict(color='white', width=2)
+                    ),
+                    text=['🦢'],
+                    textfont=dict(size=14),
+                    textposition='bottom center',  # Different position to avoid overlap
+                    name=f'Black Swan Event ({scenario_b.name})',
+                    showlegend=False,
+                    hovertemplate=(
+                        f"<b>Black Swan Event - {scenario_b.name}</b><br>" +
+                        f"{x_axis_title_text}: {marker_x_b}<br>" +
+                        f"Portfolio Loss: {getattr(scenario_b, 'black_swan_loss_pct', 50.0):.1f}%<br>" +
+                        "<extra></extra>"
+                    )
+                ))
+        except Exception:
+            pass  # Silently skip if black swan age not in timeline
+    
+    fig.update_layout(
+        xaxis_title=x_axis_title_text,
+        yaxis_title=f"Portfolio Balance ({CURRENCY})",
+        # Comparison charts hover the closest point; a unified box listing both scenarios' traces is slow to pick
+        hovermode='closest' if compare_scenarios else 'x unified',
+        height=550,  # Increased height to accommodate labels
+        showlegend=True,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
+        xaxis=dict(gridcolor='#e0e0e0', showgrid=True),
+        yaxis=dict(
+            gridcolor='#e0e0e0', 
+            showgrid=True,
+            rangemode='normal'  # Allow automatic ranging including negative values
+        ),
+        legend=dict(
+            bgcolor='rgba(248, 248, 248, 0.9)',
+            bordercolor='#e0e0e0',
+            borderwidth=1
+        ),
+        margin=dict(t=40, b=40, l=60, r=20)  # Add margin to prevent cutoff
+    )
+    
+    return fig
+
+
+@st.cache_resource(ttl=3600, max_entries=8, show_spinner=False)
+def build_cashflow_figure(
+    scenario_a: Scenario,
+    _timeline_a: pd.DataFrame,
+    timeline_a_key: bytes,
+    scenario_b: Optional[Scenario],
+    _timeline_b: Optional[pd.DataFrame],
+    timeline_b_key: Optional[bytes],
+    x_axis_mode: str,
+    age_to_year_offset: int
+) -> go.Figure:
+    """
+    Build the annual cashflow bar chart for scenario A, plus scenario B when comparing.
+    The timelines are cached by their timeline_key digests.
+    """
+    timeline_a, timeline_b = _timeline_a, _timeline_b
+    compare_scenarios = scenario_b is not None
+    
+    cashflow_fig = go.Figure()
+    
+    # Use same x-axis values as main chart
+    x_values_cashflow = timeline_a['age'].to_numpy()
+    if x_axis_mode == "Year":
+        x_values_cashflow = x_values_cashflow + age_to_year_offset
+    x_label_cashflow = "Year" if x_axis_mode == "Year" else "Age"
+    
+    # Scenario A suffix for comparison mode
+    scenario_a_suffix = f" ({scenario_a.name})" if compare_scenarios and scenario_b else ""
+    
+    # Pull the cashflow columns out as arrays once; the outflow bars share the negations
+    withdrawals_a = timeline_a['withdrawals'].to_numpy()
+    fees_a = timeline_a['fees'].to_numpy()
+    taxes_a = timeline_a['taxes'].to_numpy()
+    
+    # Contributions (green for inflows)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=timeline_a['contributions'].to_numpy(),
+        name=f'Contributions{scenario_a_suffix}',
+        marker_color='#00875a',  # Brighter green for better contrast
+        hovertemplate=f'<b>Contributions{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
+    ))
+    
+    # Withdrawals (red/burgundy for outflows)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=-withdrawals_a,
+        name=f'Withdrawals{scenario_a_suffix}',
+        marker_color='#8b2635',  # Burgundy/wine red for contrast
+        hovertemplate=f'<b>Withdrawals{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+        customdata=withdrawals_a
+    ))
+    
+    # Liquidity Events - split into inflows (positive) and outflows (negative)
+    liquidity_net_a = timeline_a['liquidity_net'].to_numpy()
+    liquidity_inflows = np.maximum(liquidity_net_a, 0.0)  # Positive values only
+    liquidity_outflows = np.minimum(liquidity_net_a, 0.0)  # Negative values only
+    
+    # Liquidity Inflows (gold - Gordon Goss accent)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=liquidity_inflows,
+        name=f'Liquidity Inflows{scenario_a_suffix}',
+        marker_color='#c9a961',  # Gordon Goss gold
+        hovertemplate=f'<b>Liquidity Inflows{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
+    ))
+    
+    # Liquidity Outflows (darker gold/bronze)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=liquidity_outflows,
+        name=f'Liquidity Outflows{scenario_a_suffix}',
+        marker_color='#8b7355',  # Bronze/brown
+        hovertemplate=f'<b>Liquidity Outflows{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+        customdata=np.abs(liquidity_outflows)
+    ))
+    
+    # Fees (dark gray)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=-fees_a,
+        name=f'Fees{scenario_a_suffix}',
+        marker_color='#6b6b6b',
+        hovertemplate=f'<b>Fees{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+        customdata=fees_a
+    ))
+    
+    # Taxes (darker red)
+    cashflow_fig.add_trace(go.Bar(
+        x=x_values_cashflow,
+        y=-taxes_a,
+        name=f'Taxes{scenario_a_suffix}',
+        marker_color='#5c1a1a',
+        hovertemplate=f'<b>Taxes{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+        customdata=taxes_a
+    ))
+    
+    # Add Scenario B cashflow if comparing
+    if compare_scenarios and timeline_b is not None and scenario_b is not None:
+        # Prepare x-axis for scenario B
+        x_values_cashflow_b = timeline_b['age'].to_numpy()
+        if x_axis_mode == "Year":
+            x_values_cashflow_b = x_values_cashflow_b + age_to_year_offset
+    
+        scenario_b_suffix = f" ({scenario_b.name})"
+        withdrawals_b = timeline_b['withdrawals'].to_numpy()
+        fees_b = timeline_b['fees'].to_numpy()
+        taxes_b = timeline_b['taxes'].to_numpy()
+    
+        # Use slightly different colors/patterns for Scenario B to distinguish
+        # Contributions for B (lighter green with pattern)
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=timeline_b['contributions'].to_numpy(),
+            name=f'Contributions{scenario_b_suffix}',
+            marker_color='#4db380',  # Lighter green
+            marker_pattern_shape="/",  # Add pattern for distinction
+            hovertemplate=f'<b>Contributions{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
+        ))
+    
+        # Withdrawals for B (lighter burgundy with pattern)
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=-withdrawals_b,
+            name=f'Withdrawals{scenario_b_suffix}',
+            marker_color='#b8475a',  # Lighter burgundy
+            marker_pattern_shape="/",
+            hovertemplate=f'<b>Withdrawals{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+            customdata=withdrawals_b
+        ))
+    
+        # Liquidity Events for B
+        liquidity_net_b = timeline_b['liquidity_net'].to_numpy()
+        liquidity_inflows_b = np.maximum(liquidity_net_b, 0.0)
+        liquidity_outflows_b = np.minimum(liquidity_net_b, 0.0)
+    
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=liquidity_inflows_b,
+            name=f'Liquidity Inflows{scenario_b_suffix}',
+            marker_color='#ddc98a',  # Lighter gold
+            marker_pattern_shape="/",
+            hovertemplate=f'<b>Liquidity Inflows{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
+        ))
+    
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=liquidity_outflows_b,
+            name=f'Liquidity Outflows{scenario_b_suffix}',
+            marker_color='#a89175',  # Lighter bronze
+            marker_pattern_shape="/",
+            hovertemplate=f'<b>Liquidity Outflows{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+            customdata=np.abs(liquidity_outflows_b)
+        ))
+    
+        # Fees for B
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=-fees_b,
+            name=f'Fees{scenario_b_suffix}',
+            marker_color='#8c8c8c',  # Lighter gray
+            marker_pattern_shape="/",
+            hovertemplate=f'<b>Fees{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+            customdata=fees_b
+        ))
+    
+        # Taxes for B
+        cashflow_fig.add_trace(go.Bar(
+            x=x_values_cashflow_b,
+            y=-taxes_b,
+            name=f'Taxes{scenario_b_suffix}',
+            marker_color='#8b3a3a',  # Lighter dark red
+            marker_pattern_shape="/",
+            hovertemplate=f'<b>Taxes{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
+            customdata=taxes_b
+        ))
+    
+    cashflow_fig.update_layout(
+        barmode='relative',
+        xaxis_title=x_label_cashflow,
+        yaxis_title=f"Annual Cashflow ({CURRENCY})",
+        height=450,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c", size=12),
+        xaxis=dict(
+            gridcolor='#e0e0e0',
+            showgrid=True,
+            zeroline=True,
+            zerolinecolor='#003d29',
+            zerolinewidth=2
+        ),
+        yaxis=dict(
+            gridcolor='#e0e0e0',
+            showgrid=True,
+            zeroline=True,
+            zerolinecolor='#003d29',
+            zerolinewidth=2
+        ),
+        legend=dict(
+            bgcolor='rgba(248, 248, 248, 0.95)',
+            bordercolor='#003d29',
+            borderwidth=1,
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='center',
+            x=0.5
+        ),
+        hovermode='x unified'
+    )
+    
+    return cashflow_fig
+
+
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+def admin_tables(
+    scenario: Scenario,
+    liquidity_events: List[LiquidityEvent],
+    _timeline: pd.DataFrame,
+    timeline_digest: bytes,
+    metrics: Dict[str, Any],
+    effective_tax_rate_pct: float
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Tables for the Administration breakdown, keyed by section: params, events
+    (None when there are none), tax_config, tax_summary and metrics. Cached so
+    reruns that leave the plan unchanged skip the tax pass and DataFrame builds;
+    the timeline is cached by its timeline_key digest.
+    """
+    timeline = _timeline
+    totals = timeline[CASHFLOW_TOTAL_COLUMNS].sum()
+    
+    params_data = {
+        "Parameter": [
+            "Current Age", "Retirement Age", "End Age",
+            "Current Balance", "Contribution Amount", "Contribution Cadence",
+            "Expected Nominal Return", "Return Volatility (Stdev)", "Inflation Rate",
+            "Annual Fee/Expense Drag", "Withdrawal Method", "Withdrawal %/Amount",
+            "Withdrawal Frequency", "Withdrawal Tax Rate", "Monte Carlo Runs"
+        ],
+        "Value": [
+            scenario.current_age, scenario.retirement_age, scenario.end_age,
+            f"${scenario.current_balance:,.2f}", f"${scenario.contrib_amount:,.2f}", scenario.contrib_cadence,
+            f"{scenario.nominal_return_pct}%", f"{scenario.return_stdev_pct}%", f"{scenario.inflation_pct}%",
+            f"{scenario.fee_pct}%", scenario.withdrawal_method,
+            f"{scenario.withdrawal_pct}%" if scenario.withdrawal_method == "Fixed % of prior-year end balance" else f"${scenario.withdrawal_real_amount:,.2f}",
+            scenario.withdrawal_frequency,
+            f"{scenario.effective_tax_rate_pct}% (0% = tax-free)",
+            scenario.mc_runs if scenario.enable_mc else "Disabled"
+        ]
+    }
+    
+    events_detail = None
+    if liquidity_events:
+        events_detail = liquidity_events_table(liquidity_events)
+        events_detail["Amount"] = format_currency(events_detail["Amount"], ",.2f")
+        events_detail["Taxable"] = events_detail["Taxable"].map({True: "Yes", False: "No"})
+        events_detail["Tax Rate"] = events_detail["Tax Rate"].map("{}%".format)
+    
+    tax_config = {
+        "Tax Type": [
+            "Withdrawal Tax Rate",
+            "Per-Event Tax Rates",
+            "Tax Treatment"
+        ],
+        "Configuration": [
+            f"{effective_tax_rate_pct}% (applied to all retirement withdrawals)",
+            "Individual rates set per liquidity event (see table above)",
+            "Only taxable inflows are taxed; outflows/debts are NOT taxed"
+        ]
+    }
+    
+    # Calculate tax breakdown
+    withdrawals = timeline['withdrawals'].to_numpy()
+    total_withdrawal_taxes = 0.0
+    if effective_tax_rate_pct > 0:
+        total_withdrawal_taxes = float((withdrawals[withdrawals > 0] * (effective_tax_rate_pct / 100.0)).sum())
+    
+    # Event taxes: each taxable inflow is taxed once per projection year it falls in.
+    # Events are laid out as one record array so the per-event counts are array ops
+    ages = timeline['age'].to_numpy()
+    total_event_taxes = 0.0
+    if liquidity_events:
+        events = np.rec.fromrecords(
+            [
+                (e.start_age, e.end_age, e.amount, e.recurrence == "Monthly", e.recurrence == "One-time", e.taxable, e.tax_rate)
+                for e in liquidity_events
+            ],
+            names='start_age,end_age,amount,monthly,one_time,taxable,tax_rate'
+        )
+        # One-time events cover only their start age (none if the range is inverted)
+        last_age = np.where(
+            events.one_time,
+            np.where(events.start_age <= events.end_age, events.start_age, events.start_age - 1),
+            events.end_age
+        )
+        # Timeline ages are contiguous, so the overlap length is the number of years taxed
+        years_active = np.clip(np.minimum(last_age, ages[-1]) - np.maximum(events.start_age, ages[0]) + 1, 0, None)
+        annualized = events.amount * np.where(events.monthly, 12, 1)
+        taxed = events.taxable & (events.amount > 0)
+        total_event_taxes = float((annualized * (events.tax_rate / 100.0) * years_active)[taxed].sum())
+    
+    tax_summary = {
+        "Tax Category": [
+            "Withdrawal Taxes",
+            "Liquidity Event Taxes",
+            "Total Taxes Paid"
+        ],
+        "Amount": [
+            f"${total_withdrawal_taxes:,.2f}",
+            f"${total_event_taxes:,.2f}",
+            f"${totals['taxes']:,.2f}"
+        ],
+        "Percentage of Total": [
+            f"{(total_withdrawal_taxes / totals['taxes'] * 100) if totals['taxes'] > 0 else 0:.1f}%",
+            f"{(total_event_taxes / totals['taxes'] * 100) if totals['taxes'] > 0 else 0:.1f}%",
+            "100.0%"
+        ]
+    }
+    
+    metrics_breakdown = {
+        "Metric": [
+            "Terminal Value (Nominal)",
+            "Terminal Value (Real)",
+            "First Shortfall Age",
+            "Total Contributions",
+            "Total Withdrawals",
+            "Total Fees Paid",
+            "Total Taxes Paid",
+            "Total Growth",
+            "Net Liquidity Events"
+        ],
+        "Value": [
+            f"${metrics['terminal_nominal']:,.2f}",
+            f"${metrics['terminal_real']:,.2f}",
+            str(metrics['first_shortfall_age']) if metrics['first_shortfall_age'] else "None (Solvent)",
+            f"${totals['contributions']:,.2f}",
+            f"${totals['withdrawals']:,.2f}",
+            f"${totals['fees']:,.2f}",
+            f"${totals['taxes']:,.2f}",
+            f"${totals['growth']:,.2f}",
+            f"${totals['liquidity_net']:,.2f}"
+        ],
+        "Description": [
+            "Final portfolio balance in future dollars (not inflation-adjusted)",
+            "Final portfolio balance in today's purchasing power (inflation-adjusted)",
+            "First age where balance becomes negative (indicates insolvency)",
+            "Sum of all contributions made during accumulation phase",
+            "Sum of all withdrawals taken during retirement phase",
+            "Sum of all annual fees/expenses charged to portfolio",
+            "Sum of all taxes paid on withdrawals and taxable events",
+            "Sum of all investment returns earned over the planning horizon",
+            "Sum of all liquidity events (positive = net inflows, negative = net outflows)"
+        ]
+    }
+    
+    return {
+        "params": pd.DataFrame(params_data),
+        "events": events_detail,
+        "tax_config": pd.DataFrame(tax_config),
+        "tax_summary": pd.DataFrame(tax_summary),
+        "metrics": pd.DataFrame(metrics_breakdown),
+    }
+
+
+# ============================================================================
+# MAIN APP
+# ============================================================================
+
+def main():
+    st.set_page_config(
+        page_title="Gordon Goss | Retirement Planning",
+        page_icon="",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    start_kernel_warmup()
+    
+    # Custom CSS for Gordon Goss branding (one stylesheet for the whole app)
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+    
+    # Gordon Goss Header
+    st.markdown("""
+        <div style="text-align: left; padding: 1rem 0 2rem 0;">
+            <h1 style="margin: 0; color: #003d29; font-weight: 300; letter-spacing: 2px;">
+                GORDON GOSS
+            </h1>
+            <p style="margin: 0; color: #c9a961; font-size: 1.1rem; letter-spacing: 3px; font-weight: 300;">
+                RETIREMENT PLANNING
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    # Initialize session state defaults (page routing and persistent settings)
+    for key, value in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+    
+    # Check if we should show the liquidity events page
+    if st.session_state.page == "liquidity_events":
+        show_liquidity_events_page(st.session_state.liquidity_events_end_age)
+        return  # Exit main function after showing liquidity events page
+    
+    # Check if we should show the scenarios management page
+    if st.session_state.page == "scenarios":
+        show_scenarios_page()
+        return  # Exit main function after showing scenarios page
+    
+    # Load saved scenarios
+    saved_scenarios = load_scenarios()
+    
+    # Sidebar header, currency and the first section heading share one markdown element
+    st.sidebar.markdown(f"### Configuration\n\n**Currency:** {CURRENCY}\n\n#### Personal Information")
+    
+    # Create sliders with number inputs
+    current_age = st.sidebar.number_input(
+        "Current age",
+        min_value=18,
+        max_value=80,
+        value=int(st.session_state.current_age),
+        help="Your current age",
+        key="current_age_input"
+    )
+    st.session_state.current_age = current_age
+    
+    retirement_age = st.sidebar.number_input(
+        "Retirement age",
+        min_value=current_age,
+        max_value=max(current_age + 1, 100),
+        value=int(st.session_state.retirement_age) if st.session_state.retirement_age >= current_age else current_age,
+        help="Age when you plan to retire",
+        key="retirement_age_input"
+    )
+    st.session_state.retirement_age = retirement_age
+    
+    end_age = st.sidebar.number_input(
+        "End age (planning horizon)",
+        min_value=retirement_age,
+        max_value=max(retirement_age + 1, 110),
+        value=int(st.session_state.end_age) if st.session_state.end_age >= retirement_age else retirement_age,
+        help="Plan until this age",
+        key="end_age_input"
+    )
+    st.session_state.end_age = end_age
+    
+    # Financial inputs
+    st.sidebar.markdown("#### Current Portfolio")
+    
+    current_balance = st.sidebar.number_input(
+        "Current combined balance ($)",
+        min_value=0.0,
+        value=float(st.session_state.current_balance),
+        step=10000.0,
+        help="Your total portfolio value today",
+        key="current_balance_input",
+        format="%.2f"
+    )
+    st.session_state.current_balance = current_balance
+    
+    # Display formatted currency
+    st.sidebar.caption(f"**${current_balance:,.2f}**")
+    
+    st.sidebar.markdown("#### Ongoing Contributions")
+    contrib_amount = st.sidebar.number_input(
+        "Contribution amount ($)",
+        min_value=0.0,
+        value=float(st.session_state.contrib_amount),
+        step=100.0,
+        help="How much you contribute each period",
+        key="contrib_amount_input",
+        format="%.2f"
+    )
+    st.session_state.contrib_amount = contrib_amount
+    
+    # Display formatted currency
+    st.sidebar.caption(f"**${contrib_amount:,.2f}**")
+    
+    contrib_cadence = st.sidebar.radio(
+        "Contribution cadence",
+        options=CONTRIB_CADENCE_OPTIONS,
+        index=0 if st.session_state.contrib_cadence == 'Monthly' else 1,
+        help="Contributions stop automatically at retirement"
+    )
+    st.session_state.contrib_cadence = contrib_cadence
+    
+    # Returns & inflation
+    st.sidebar.markdown("#### Market Assumptions")
+    
+    nominal_return_pct = st.sidebar.number_input(
+        "Expected nominal return (%)",
+        min_value=0.0,
+        max_value=20.0,
+        value=float(st.session_state.nominal_return_pct),
+        step=0.1,
+        help="Expected annual return before inflation",
+        key="nominal_return_input",
+        format="%.1f"
+    )
+    st.session_state.nominal_return_pct = nominal_return_pct
+    
+    inflation_pct = st.sidebar.number_input(
+        "Inflation (%)",
+        min_value=0.0,
+        max_value=10.0,
+        value=float(st.session_state.inflation_pct),
+        step=0.1,
+        help="Expected annual inflation",
         key="inflation_input",
         format="%.1f"
     )
@@ -1295,19 +2665,9 @@ def main():
     # Withdrawal settings
     st.sidebar.markdown("#### Withdrawal Settings")
     
-    # Initialize withdrawal parameters in session state if not present
-    if 'withdrawal_method' not in st.session_state:
-        st.session_state.withdrawal_method = "Fixed % of prior-year end balance"
-    if 'withdrawal_pct' not in st.session_state:
-        st.session_state.withdrawal_pct = WITHDRAWAL_PCT
-    if 'withdrawal_frequency' not in st.session_state:
-        st.session_state.withdrawal_frequency = 'Annual'
-    if 'withdrawal_real_amount' not in st.session_state:
-        st.session_state.withdrawal_real_amount = float(WITHDRAWAL_REAL_AMOUNT)
-    
     withdrawal_method = st.sidebar.radio(
         "Withdrawal method",
-        options=["Fixed % of prior-year end balance", "Fixed real dollars"],
+        options=WITHDRAWAL_METHOD_OPTIONS,
         index=0 if st.session_state.withdrawal_method == "Fixed % of prior-year end balance" else 1,
         help="Choose withdrawal calculation method"
     )
@@ -1345,7 +2705,7 @@ def main():
         
         withdrawal_frequency = st.sidebar.radio(
             "Withdrawal frequency",
-            options=["Annual", "Monthly"],
+            options=WITHDRAWAL_FREQUENCY_OPTIONS,
             index=0 if st.session_state.withdrawal_frequency == "Annual" else 1,
             help="How often withdrawals occur"
         )
@@ -1374,8 +2734,6 @@ def main():
     # Liquidity events - Initialize session state
     if 'events_data' not in st.session_state:
         st.session_state.events_data = create_default_events()
-    if 'liquidity_events_end_age' not in st.session_state:
-        st.session_state.liquidity_events_end_age = end_age
     
     # Liquidity Events Management Button
     st.sidebar.markdown("#### Liquidity Events")
@@ -1386,10 +2744,10 @@ def main():
     
     # Convert saved events to LiquidityEvent objects
     liquidity_events = []
-    if st.session_state.events_data:
-        for event_dict in st.session_state.events_data:
+    if not st.session_state.events_data.empty:
+        for event_dict in st.session_state.events_data.to_dict('records'):
             try:
-                liquidity_events.append(LiquidityEvent.from_dict(event_dict))
+                liquidity_events.append(event_from_dict(event_dict))
             except Exception as e:
                 st.sidebar.error(f"Error loading event: {str(e)}")
     
@@ -1398,19 +2756,11 @@ def main():
     show_real_default = st.session_state.get('show_real_radio', 'Real')
     show_real = st.sidebar.radio(
         "Show values",
-        options=["Real", "Nominal"],
+        options=SHOW_VALUES_OPTIONS,
         index=0 if show_real_default == "Real" else 1,
         key="show_real_radio"
     ) == "Real"
     
-    # Initialize session state for persistent settings across page navigation
-    if 'enable_mc' not in st.session_state:
-        st.session_state.enable_mc = ENABLE_MC
-    if 'mc_runs' not in st.session_state:
-        st.session_state.mc_runs = MC_RUNS
-    if 'effective_tax_rate_pct' not in st.session_state:
-        st.session_state.effective_tax_rate_pct = 0.0
-    
     enable_mc = st.sidebar.checkbox(
         "Enable Monte Carlo",
         value=bool(st.session_state.enable_mc),
@@ -1430,10 +2780,6 @@ def main():
         )
         st.session_state.mc_runs = mc_runs
     
-    # Initialize return_stdev_pct in session state if not present
-    if 'return_stdev_pct' not in st.session_state:
-        st.session_state.return_stdev_pct = RETURN_STDEV_PCT
-    
     return_stdev_pct = st.sidebar.number_input(
         "Return volatility (stdev, %)",
         min_value=0.0,
@@ -1449,10 +2795,6 @@ def main():
     # Withdrawal tax rate
     st.sidebar.markdown("#### Withdrawal Tax Rate")
     
-    # Initialize effective_tax_rate_pct in session state if not present
-    if 'effective_tax_rate_pct' not in st.session_state:
-        st.session_state.effective_tax_rate_pct = 0.0
-    
     effective_tax_rate_pct = st.sidebar.number_input(
         "Withdrawal tax rate (%)",
         min_value=0.0,
@@ -1476,33 +2818,6 @@ def main():
         key="scenario_a_name"
     )
     
-    # Add compact styling for sidebar buttons only
-    st.sidebar.markdown("""
-    <style>
-    /* Compact sidebar scenario buttons */
-    div[data-testid="stSidebar"] button[kind="primary"],
-    div[data-testid="stSidebar"] button[kind="secondary"] {
-        font-size: 11px !important;
-        padding: 0.5rem 0.3rem !important;
-        line-height: 1.2 !important;
-        min-height: 2.5rem !important;
-        max-height: 2.5rem !important;
-        white-space: nowrap !important;
-        overflow: hidden !important;
-        text-overflow: clip !important;
-        width: 100% !important;
-    }
-    div[data-testid="stSidebar"] button p {
-        font-size: 11px !important;
-        margin: 0 !important;
-        white-space: nowrap !important;
-    }
-    div[data-testid="stSidebar"] div[data-testid="column"] {
-        padding: 0 2px !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     save_clicked = st.sidebar.button("Save Scenario", key="save_scenario_btn", use_container_width=True)
     manage_clicked = st.sidebar.button("Manage Scenarios", key="manage_scenarios_btn", use_container_width=True)
     
@@ -1534,9 +2849,9 @@ def main():
                 enable_taxes=enable_taxes,
                 effective_tax_rate_pct=effective_tax_rate_pct,
                 inflation_enabled=inflation_enabled,
-                black_swan_enabled=st.session_state.get('black_swan_enabled', False),
-                black_swan_age=st.session_state.get('black_swan_age', 70),
-                black_swan_loss_pct=st.session_state.get('black_swan_loss_pct', 50.0)
+                black_swan_enabled=st.session_state.black_swan_enabled,
+                black_swan_age=st.session_state.black_swan_age,
+                black_swan_loss_pct=st.session_state.black_swan_loss_pct
             )
             saved_scenarios[scenario_a_name] = scenario_a
             save_scenarios(saved_scenarios)
@@ -1546,20 +2861,12 @@ def main():
     if manage_clicked:
         st.session_state.page = "scenarios"
         st.rerun()
-
-    # Compare scenarios section
-    st.sidebar.markdown("#### Compare Scenarios")
-    compare_names = [name for name in saved_scenarios.keys()]
-    compare_a = st.sidebar.selectbox("Scenario 1", ["<none>"] + compare_names, key="compare_a")
-    compare_b = st.sidebar.selectbox("Scenario 2", ["<none>"] + [n for n in compare_names if n != compare_a], key="compare_b")
-    
-    # Initialize comparison state in session_state if not present
-    if 'comparison_active' not in st.session_state:
-        st.session_state.comparison_active = False
-    if 'comparison_scenario_a' not in st.session_state:
-        st.session_state.comparison_scenario_a = None
-    if 'comparison_scenario_b' not in st.session_state:
-        st.session_state.comparison_scenario_b = None
+
+    # Compare scenarios section
+    st.sidebar.markdown("#### Compare Scenarios")
+    compare_options = ["<none>", *saved_scenarios]
+    compare_a = st.sidebar.selectbox("Scenario 1", compare_options, key="compare_a")
+    compare_b = st.sidebar.selectbox("Scenario 2", [n for n in compare_options if n != compare_a or n == "<none>"], key="compare_b")
     
     # Compare and Clear buttons stacked vertically
     compare_triggered = st.sidebar.button("Compare Scenarios", key="compare_btn", use_container_width=True)
@@ -1594,972 +2901,327 @@ def main():
     if compare_scenarios:
         if (st.session_state.comparison_scenario_a in saved_scenarios and 
             st.session_state.comparison_scenario_b in saved_scenarios):
-            scenario_a = saved_scenarios[st.session_state.comparison_scenario_a]
-            scenario_b = saved_scenarios[st.session_state.comparison_scenario_b]
-        else:
-            # Scenarios no longer exist, clear comparison
-            st.session_state.comparison_active = False
-            compare_scenarios = False
-    
-    # Tax Rate Reference Legend
-    st.sidebar.markdown("---")
-    with st.sidebar.expander("Tax Rate Reference Guide"):
-        st.markdown("""
-        **Common Tax Rates by Jurisdiction:**
-        
-        **Tax-Free Havens:**
-        - **Cayman Islands**: 0%
-        - **Bermuda**: 0%
-        - **Monaco**: 0%
-        - **UAE (Dubai)**: 0%
-        
-        **Low Tax Countries:**
-        - **Singapore**: ~10-15%
-        - **Hong Kong**: ~15%
-        - **Switzerland**: ~15-20%
-        - **Portugal (NHR)**: ~10%
-        
-        **Moderate Tax Countries:**
-        - **Spain**: ~19-26%
-        - **Italy**: ~23-43%
-        - **UK**: ~20-45%
-        - **Germany**: ~25-45%
-        
-        **High Tax Countries:**
-        - **USA**: ~25-37% (Federal + State)
-        - **Canada**: ~30-50%
-        - **France**: ~30-45%
-        - **Sweden**: ~30-55%
-        
-        **How to Use:**
-        - Set **Withdrawal Tax Rate** for retirement income
-        - Set **Tax Rate (%)** per liquidity event for specific transactions
-        - Enable **Taxable?** checkbox for events subject to tax
-        """)
-    
-    # Admin Panel (placeholder for future advanced features)
-    st.sidebar.markdown("---")
-    with st.sidebar.expander("Admin Panel", expanded=False):
-        st.markdown(f"""
-        **Version {__version__} - October 21, 2025**
-        
-        **Recent Updates (v2.1.0):**
-        
-        **UI/UX Improvements:**
-        - Age/Year toggle on projection graphs (X-axis switch)
-        - Annual Cashflow Analysis - now open by default
-        - Debug Monitor - now closed by default
-        - Admin Panel - now closed by default
-        
-        **Liquidity Events:**
-        - Auto-populate end age for one-time events
-        - Simplified event types (Credit/Debit)
-        - Recurrence field moved next to Type for better UX
-        - Removed emojis from UI elements
-        
-        **Bug Fixes:**
-        - First Shortfall Age detection now works correctly
-        - Fixed calculation to properly detect negative balances
-        
-        **Notes:**
-        - Graph displays end-of-year balances (industry standard)
-        - Percentage-based withdrawals adjust with balance
-        - Use "Fixed real dollars" to see First Shortfall Age
-        
-        **Future Features:**
-        - Batch scenario imports/exports
-        - Advanced debugging tools
-        - Custom calculation overrides
-        - Data integrity checks
-        """)
-    
-    # Build current scenario A (only if not comparing - otherwise use saved scenario)
-    if not compare_scenarios:
-        scenario_a = Scenario(
-            name=scenario_a_name,
-            current_age=current_age,
-            retirement_age=retirement_age,
-            end_age=end_age,
-            current_balance=current_balance,
-            contrib_amount=contrib_amount,
-            contrib_cadence=contrib_cadence,
-            nominal_return_pct=nominal_return_pct,
-            return_stdev_pct=return_stdev_pct,
-            inflation_pct=inflation_pct,
-            fee_pct=fee_pct,
-            withdrawal_method=withdrawal_method,
-            withdrawal_pct=withdrawal_pct,
-            withdrawal_real_amount=withdrawal_real_amount,
-            withdrawal_frequency=withdrawal_frequency,
-            liquidity_events=[e.to_dict() for e in liquidity_events],
-            enable_mc=enable_mc,
-            mc_runs=mc_runs,
-            enable_taxes=enable_taxes,
-            effective_tax_rate_pct=effective_tax_rate_pct,
-            inflation_enabled=inflation_enabled,
-            black_swan_enabled=st.session_state.get('black_swan_enabled', False),
-            black_swan_age=st.session_state.get('black_swan_age', 70),
-            black_swan_loss_pct=st.session_state.get('black_swan_loss_pct', 50.0)
-        )
-    
-    # Get liquidity events for scenario A
-    if compare_scenarios:
-        liquidity_events_a = [LiquidityEvent.from_dict(e) for e in scenario_a.liquidity_events]
-    else:
-        liquidity_events_a = liquidity_events
-    
-    # Calculate timeline for Scenario A
-    timeline_a, metrics_a = build_timeline(scenario_a, liquidity_events_a, show_real)
-    
-    # Monte Carlo for Scenario A (use scenario's own MC settings when comparing)
-    mc_results_a = None
-    mc_enabled_a = scenario_a.enable_mc if compare_scenarios else enable_mc
-    mc_runs_a = scenario_a.mc_runs if compare_scenarios else mc_runs
-    if mc_enabled_a:
-        mc_results_a = run_monte_carlo(scenario_a, liquidity_events_a, mc_runs_a, show_real=show_real)
-        metrics_a.update(mc_results_a)
-    
-    # Calculate for Scenario B if comparing
-    timeline_b = None
-    metrics_b = None
-    mc_results_b = None
-    
-    if compare_scenarios and scenario_b:
-        events_b = [LiquidityEvent.from_dict(e) for e in scenario_b.liquidity_events]
-        timeline_b, metrics_b = build_timeline(scenario_b, events_b, show_real)
-        
-        if scenario_b.enable_mc:
-            mc_results_b = run_monte_carlo(scenario_b, events_b, scenario_b.mc_runs, show_real=show_real)
-            metrics_b.update(mc_results_b)
-    
-    # ========================================================================
-    # MAIN CONTENT
-    # ========================================================================
-    
-    # KPI Row
-    st.markdown("## Key Performance Metrics")
-    
-    # Primary Metrics Row
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            label="Terminal Value (Real)",
-            value=f"${metrics_a['terminal_real']:,.0f}",
-            help="Inflation-adjusted portfolio value at end of planning horizon"
-        )
-    
-    with col2:
-        st.metric(
-            label="Terminal Value (Nominal)",
-            value=f"${metrics_a['terminal_nominal']:,.0f}",
-            help="Actual dollar value at end of planning horizon without inflation adjustment"
-        )
-    
-    with col3:
-        prob_value = f"{metrics_a['probability_no_shortfall']*100:.1f}%" if metrics_a['probability_no_shortfall'] is not None else "N/A"
-        st.metric(
-            label="Probability of Success",
-            value=prob_value,
-            help="Percentage of Monte Carlo simulations where portfolio never goes negative"
-        )
-    
-    with col4:
-        shortfall_value = str(metrics_a['first_shortfall_age']) if metrics_a['first_shortfall_age'] else "None"
-        st.metric(
-            label="First Shortfall Age",
-            value=shortfall_value,
-            help="Age when portfolio balance first goes negative, or None if solvent throughout"
-        )
-    
-    # Monte Carlo Analysis (if enabled)
-    if enable_mc and mc_results_a:
-        with st.expander("Monte Carlo Analysis", expanded=True):
-            mc_col1, mc_col2, mc_col3 = st.columns(3)
-            
-            with mc_col1:
-                st.metric(
-                    label="Median Terminal (MC)",
-                    value=f"${mc_results_a['median_terminal']:,.0f}",
-                    help="50th percentile outcome across all Monte Carlo simulations"
-                )
-            
-            with mc_col2:
-                st.metric(
-                    label="P10 Terminal (MC)",
-                    value=f"${mc_results_a['p10_terminal']:,.0f}",
-                    help="10th percentile - only 10% of outcomes are worse than this value"
-                )
-            
-            with mc_col3:
-                st.metric(
-                    label="P90 Terminal (MC)",
-                    value=f"${mc_results_a['p90_terminal']:,.0f}",
-                    help="90th percentile - only 10% of outcomes are better than this value"
-                )
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Safe Withdrawal Rate Calculator
-            st.markdown("#### Safe Withdrawal Rate Calculator")
-            
-            # Input field for target ending balance percentage and button in same row
-            col_input, col_button = st.columns([1, 2])
-            
-            with col_input:
-                target_ending_pct = st.number_input(
-                    "Target ending balance (%)",
-                    min_value=0.0,
-                    max_value=100.0,
-                    value=0.0,
-                    step=5.0,
-                    format="%.1f",
-                    help="Percentage of your retirement starting balance to preserve at terminal age. 0% = deplete to $0, 25% = leave 25% remaining for legacy/safety margin"
-                )
-            
-            with col_button:
-                # Add spacing to align button with input field
-                st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
-                if st.button("Calculate Safe Withdrawal Rate", use_container_width=True):
-                    if scenario_a.withdrawal_method == "Fixed % of prior-year end balance":
-                        with st.spinner("Calculating optimal withdrawal rate..."):
-                            swr = solve_safe_withdrawal_rate(
-                                scenario_a, 
-                                liquidity_events_a,
-                                target_ending_balance_pct=target_ending_pct
-                            )
-                            if target_ending_pct > 0:
-                                st.success(f"**Safe Withdrawal Rate: {swr:.2f}%**")
-                                st.caption(f"Maximum withdrawal rate preserving {target_ending_pct}% ending balance")
-                            else:
-                                st.success(f"**Safe Withdrawal Rate: {swr:.2f}%**")
-                                st.caption("Maximum withdrawal rate where portfolio remains solvent")
-                    else:
-                        st.warning("SWR solver requires '% of prior-year balance' withdrawal method")
-    
-    # Comparison metrics
-    if compare_scenarios and scenario_b and metrics_b:
-        st.markdown("### Scenario Comparison")
-        comp_data = {
-            "Metric": ["Terminal (Real)", "Terminal (Nominal)", "First Shortfall Age"],
-            scenario_a.name: [
-                f"${metrics_a['terminal_real']:,.0f}",
-                f"${metrics_a['terminal_nominal']:,.0f}",
-                str(metrics_a['first_shortfall_age']) if metrics_a['first_shortfall_age'] else "None"
-            ],
-            scenario_b.name: [
-                f"${metrics_b['terminal_real']:,.0f}",
-                f"${metrics_b['terminal_nominal']:,.0f}",
-                str(metrics_b['first_shortfall_age']) if metrics_b['first_shortfall_age'] else "None"
-            ]
-        }
-        
-        if metrics_a['probability_no_shortfall'] is not None or metrics_b['probability_no_shortfall'] is not None:
-            comp_data["Metric"].append("Probability of Success")
-            comp_data[scenario_a.name].append(
-                f"{metrics_a['probability_no_shortfall']*100:.1f}%" if metrics_a['probability_no_shortfall'] is not None else "N/A"
-            )
-            comp_data[scenario_b.name].append(
-                f"{metrics_b['probability_no_shortfall']*100:.1f}%" if metrics_b['probability_no_shortfall'] is not None else "N/A"
-            )
-        
-        # Ensure all columns have the same length
-        max_len = max(len(comp_data["Metric"]), len(comp_data[scenario_a.name]), len(comp_data[scenario_b.name]))
-        for key in comp_data.keys():
-            while len(comp_data[key]) < max_len:
-                comp_data[key].append("N/A")
-        
-        st.dataframe(pd.DataFrame(comp_data), width="stretch", hide_index=True)
-    
-    # Main Chart
-    st.markdown("## Portfolio Balance Projection")
-    
-    # Add X-axis toggle (Age vs Year)
-    col_left, col_right = st.columns([4, 1])
-    with col_right:
-        x_axis_mode = st.radio(
-            "X-Axis:",
-            options=["Age", "Year"],
-            index=0,
-            horizontal=True,
-            key="x_axis_toggle",
-            help="Switch between Age and Calendar Year"
-        )
-    
-    # Calculate year values (assuming current age = current year 2025)
-    from datetime import datetime
-    current_year = datetime.now().year
-    age_to_year_offset = current_year - current_age
-    
-    # Prepare event grouping for chart (needed before creating traces)
-    # Separate one-time and recurring events FOR SCENARIO A
-    one_time_events = []
-    recurring_events = []
-    
-    for event in liquidity_events_a:
-        if not event.enabled:
-            continue
-        if event.recurrence == "One-time":
-            one_time_events.append(event)
+            scenario_a = saved_scenarios[st.session_state.comparison_scenario_a]
+            scenario_b = saved_scenarios[st.session_state.comparison_scenario_b]
         else:
-            recurring_events.append(event)
+            # Scenarios no longer exist, clear comparison
+            st.session_state.comparison_active = False
+            compare_scenarios = False
     
-    # Group ALL events (one-time + recurring) by age for hover information FOR SCENARIO A
-    all_events_by_age = {}
-    for event in liquidity_events_a:
-        if not event.enabled:
-            continue
-            
-        # Determine which ages this event affects
-        if event.recurrence == "One-time":
-            ages_affected = [event.start_age]
-        else:
-            ages_affected = range(event.start_age, event.end_age + 1)
+    # Tax Rate Reference Legend (separated by the sidebar expander rule in APP_CSS)
+    with st.sidebar.expander("Tax Rate Reference Guide"):
+        st.markdown("""
+        **Common Tax Rates by Jurisdiction:**
         
-        for age in ages_affected:
-            if age not in all_events_by_age:
-                all_events_by_age[age] = []
-            all_events_by_age[age].append(event)
-    
-    # Group ONE-TIME events by age for markers on the chart
-    one_time_by_age = {}
-    for event in one_time_events:
-        age = event.start_age
-        if age not in one_time_by_age:
-            one_time_by_age[age] = []
-        one_time_by_age[age].append(event)
-    
-    # Prepare event grouping for SCENARIO B if comparing
-    one_time_events_b = []
-    recurring_events_b = []
-    all_events_by_age_b = {}
-    one_time_by_age_b = {}
-    
-    if compare_scenarios and scenario_b:
-        events_b_list = [LiquidityEvent.from_dict(e) for e in scenario_b.liquidity_events]
+        **Tax-Free Havens:**
+        - **Cayman Islands**: 0%
+        - **Bermuda**: 0%
+        - **Monaco**: 0%
+        - **UAE (Dubai)**: 0%
         
-        for event in events_b_list:
-            if not event.enabled:
-                continue
-            if event.recurrence == "One-time":
-                one_time_events_b.append(event)
-            else:
-                recurring_events_b.append(event)
+        **Low Tax Countries:**
+        - **Singapore**: ~10-15%
+        - **Hong Kong**: ~15%
+        - **Switzerland**: ~15-20%
+        - **Portugal (NHR)**: ~10%
         
-        # Group ALL events by age for hover
-        for event in events_b_list:
-            if not event.enabled:
-                continue
-            
-            if event.recurrence == "One-time":
-                ages_affected = [event.start_age]
-            else:
-                ages_affected = range(event.start_age, event.end_age + 1)
-            
-            for age in ages_affected:
-                if age not in all_events_by_age_b:
-                    all_events_by_age_b[age] = []
-                all_events_by_age_b[age].append(event)
+        **Moderate Tax Countries:**
+        - **Spain**: ~19-26%
+        - **Italy**: ~23-43%
+        - **UK**: ~20-45%
+        - **Germany**: ~25-45%
         
-        # Group ONE-TIME events by age for markers
-        for event in one_time_events_b:
-            age = event.start_age
-            if age not in one_time_by_age_b:
-                one_time_by_age_b[age] = []
-            one_time_by_age_b[age].append(event)
-    
-    fig = go.Figure()
-    
-    # Scenario A
-    balance_col = 'end_balance_real' if show_real else 'end_balance_nominal'
-    value_type = 'Real' if show_real else 'Nominal'
+        **High Tax Countries:**
+        - **USA**: ~25-37% (Federal + State)
+        - **Canada**: ~30-50%
+        - **France**: ~30-45%
+        - **Sweden**: ~30-55%
+        
+        **How to Use:**
+        - Set **Withdrawal Tax Rate** for retirement income
+        - Set **Tax Rate (%)** per liquidity event for specific transactions
+        - Enable **Taxable?** checkbox for events subject to tax
+        """)
     
-    # Build custom hover text that includes event information
-    hover_texts = []
-    for _, row in timeline_a.iterrows():
-        age = int(row['age'])
-        balance = row[balance_col]
-        
-        # Start with base hover text - include scenario name if comparing
-        if compare_scenarios and scenario_b:
-            hover_parts = [
-                f"<b>═══ {scenario_a.name.upper()} ═══</b>",
-                f"Age: {age}",
-                f"Balance ({value_type}): ${balance:,.0f}"
-            ]
-        else:
-            hover_parts = [
-                f"<b>Portfolio Balance</b>",
-                f"Age: {age}",
-                f"Balance ({value_type}): ${balance:,.0f}"
-            ]
+    # Admin Panel (placeholder for future advanced features)
+    with st.sidebar.expander("Admin Panel", expanded=False):
+        st.markdown(f"""
+        **Version {__version__} - October 21, 2025**
         
-        # Add event information if there are any events at this age
-        if age in all_events_by_age:
-            events_at_age = all_events_by_age[age]
-            hover_parts.append("")
-            hover_parts.append("<b>Liquidity Events:</b>")
-            
-            total_inflow = 0.0
-            total_outflow = 0.0
-            
-            for event in events_at_age:
-                amount = event.amount
-                recur_label = event.recurrence
-                if event.recurrence == "Monthly":
-                    amount *= 12
-                    recur_label = "Annual"  # Display as Annual since we show the yearly total
-                
-                if amount > 0:
-                    total_inflow += amount
-                else:
-                    total_outflow += amount
-                
-                event_type = "↑" if amount > 0 else "↓"
-                recur_text = f" ({recur_label})" if event.recurrence != "One-time" else ""
-                hover_parts.append(f"  {event_type} {event.label}: ${abs(amount):,.0f}{recur_text}")
-            
-            # Add net summary
-            net_amount = total_inflow + total_outflow
-            if net_amount > 0:
-                hover_parts.append(f"  <b>Net: +${net_amount:,.0f}</b>")
-            elif net_amount < 0:
-                hover_parts.append(f"  <b>Net: -${abs(net_amount):,.0f}</b>")
-            else:
-                hover_parts.append(f"  <b>Net: $0</b>")
+        **Recent Updates (v2.1.0):**
         
-        hover_texts.append("<br>".join(hover_parts))
-    
-    # Prepare x-axis values based on toggle
-    if x_axis_mode == "Year":
-        x_values_a = [age + age_to_year_offset for age in timeline_a['age']]
-    else:
-        x_values_a = timeline_a['age']
-    
-    fig.add_trace(go.Scatter(
-        x=x_values_a,
-        y=timeline_a[balance_col],
-        mode='lines',
-        name=f"{scenario_a.name} ({value_type})",
-        line=dict(color='#003d29', width=2.5),
-        hovertext=hover_texts,
-        hovertemplate="%{hovertext}<extra></extra>"
-    ))
-    
-    # Monte Carlo bands for Scenario A (only if not comparing)
-    if enable_mc and mc_results_a and not compare_scenarios:
-        ages = list(range(scenario_a.current_age, scenario_a.end_age + 1))
+        **UI/UX Improvements:**
+        - Age/Year toggle on projection graphs (X-axis switch)
+        - Annual Cashflow Analysis - now open by default
+        - Debug Monitor - now closed by default
+        - Admin Panel - now closed by default
         
-        # Convert to years if needed
-        if x_axis_mode == "Year":
-            x_mc_values = [age + age_to_year_offset for age in ages]
-        else:
-            x_mc_values = ages
+        **Liquidity Events:**
+        - Auto-populate end age for one-time events
+        - Simplified event types (Credit/Debit)
+        - Recurrence field moved next to Type for better UX
+        - Removed emojis from UI elements
         
-        x_label = "Year" if x_axis_mode == "Year" else "Age"
+        **Bug Fixes:**
+        - First Shortfall Age detection now works correctly
+        - Fixed calculation to properly detect negative balances
         
-        fig.add_trace(go.Scatter(
-            x=x_mc_values,
-            y=mc_results_a['p90_path'],
-            mode='lines',
-            name='90th Percentile',
-            line=dict(color='#c9a961', width=1, dash='dot'),
-            showlegend=True,
-            hovertemplate=(
-                "<b>90th Percentile</b><br>" +
-                f"{x_label}: %{{x}}<br>" +
-                f"Balance ({value_type}): $%{{y:,.0f}}<br>" +
-                "<extra></extra>"
-            )
-        ))
+        **Notes:**
+        - Graph displays end-of-year balances (industry standard)
+        - Percentage-based withdrawals adjust with balance
+        - Use "Fixed real dollars" to see First Shortfall Age
         
-        fig.add_trace(go.Scatter(
-            x=x_mc_values,
-            y=mc_results_a['p10_path'],
-            mode='lines',
-            name='10th Percentile',
-            line=dict(color='#c9a961', width=1, dash='dot'),
-            fill='tonexty',
-            fillcolor='rgba(201, 169, 97, 0.15)',
-            showlegend=True,
-            hovertemplate=(
-                "<b>10th Percentile</b><br>" +
-                f"{x_label}: %{{x}}<br>" +
-                f"Balance ({value_type}): $%{{y:,.0f}}<br>" +
-                "<extra></extra>"
+        **Future Features:**
+        - Batch scenario imports/exports
+        - Advanced debugging tools
+        - Custom calculation overrides
+        - Data integrity checks
+        """)
+    
+    # Build current scenario A (only if not comparing - otherwise use saved scenario).
+    # Reruns that leave every input unchanged reuse the scenario already built.
+    if not compare_scenarios:
+        black_swan_enabled = st.session_state.black_swan_enabled
+        black_swan_age = st.session_state.black_swan_age
+        black_swan_loss_pct = st.session_state.black_swan_loss_pct
+        scenario_inputs = (
+            scenario_a_name, current_age, retirement_age, end_age, current_balance,
+            contrib_amount, contrib_cadence, nominal_return_pct, return_stdev_pct,
+            inflation_pct, fee_pct, withdrawal_method, withdrawal_pct,
+            withdrawal_real_amount, withdrawal_frequency, tuple(liquidity_events),
+            enable_mc, mc_runs, enable_taxes, effective_tax_rate_pct, inflation_enabled,
+            black_swan_enabled, black_swan_age, black_swan_loss_pct
+        )
+        if st.session_state.get('current_scenario_inputs') != scenario_inputs:
+            st.session_state.current_scenario = Scenario(
+                name=scenario_a_name,
+                current_age=current_age,
+                retirement_age=retirement_age,
+                end_age=end_age,
+                current_balance=current_balance,
+                contrib_amount=contrib_amount,
+                contrib_cadence=contrib_cadence,
+                nominal_return_pct=nominal_return_pct,
+                return_stdev_pct=return_stdev_pct,
+                inflation_pct=inflation_pct,
+                fee_pct=fee_pct,
+                withdrawal_method=withdrawal_method,
+                withdrawal_pct=withdrawal_pct,
+                withdrawal_real_amount=withdrawal_real_amount,
+                withdrawal_frequency=withdrawal_frequency,
+                liquidity_events=[e.to_dict() for e in liquidity_events],
+                enable_mc=enable_mc,
+                mc_runs=mc_runs,
+                enable_taxes=enable_taxes,
+                effective_tax_rate_pct=effective_tax_rate_pct,
+                inflation_enabled=inflation_enabled,
+                black_swan_enabled=black_swan_enabled,
+                black_swan_age=black_swan_age,
+                black_swan_loss_pct=black_swan_loss_pct
             )
-        ))
+            st.session_state.current_scenario_inputs = scenario_inputs
+        scenario_a = st.session_state.current_scenario
     
-    # Scenario B
-    if compare_scenarios and timeline_b is not None and scenario_b is not None:
-        # Build custom hover text for scenario B including its events
-        hover_texts_b = []
-        for _, row in timeline_b.iterrows():
-            age = int(row['age'])
-            balance = row[balance_col]
-            
-            hover_parts_b = [
-                f"<b>═══ {scenario_b.name.upper()} ═══</b>",
-                f"Age: {age}",
-                f"Balance ({value_type}): ${balance:,.0f}"
-            ]
-            
-            # Add event information if there are any events at this age for scenario B
-            if age in all_events_by_age_b:
-                events_at_age_b = all_events_by_age_b[age]
-                hover_parts_b.append("")
-                hover_parts_b.append("<b>Liquidity Events:</b>")
-                
-                total_inflow = 0.0
-                total_outflow = 0.0
-                
-                for event in events_at_age_b:
-                    amount = event.amount
-                    recur_label = event.recurrence
-                    if event.recurrence == "Monthly":
-                        amount *= 12
-                        recur_label = "Annual"  # Display as Annual since we show the yearly total
-                    
-                    if amount > 0:
-                        total_inflow += amount
-                    else:
-                        total_outflow += amount
-                    
-                    event_type = "↑" if amount > 0 else "↓"
-                    recur_text = f" ({recur_label})" if event.recurrence != "One-time" else ""
-                    hover_parts_b.append(f"  {event_type} {event.label}: ${abs(amount):,.0f}{recur_text}")
-                
-                # Add net summary
-                net_amount = total_inflow + total_outflow
-                if net_amount > 0:
-                    hover_parts_b.append(f"  <b>Net: +${net_amount:,.0f}</b>")
-                elif net_amount < 0:
-                    hover_parts_b.append(f"  <b>Net: -${abs(net_amount):,.0f}</b>")
-                else:
-                    hover_parts_b.append(f"  <b>Net: $0</b>")
-            
-            hover_texts_b.append("<br>".join(hover_parts_b))
-        
-        # Prepare x-axis for scenario B
-        if x_axis_mode == "Year":
-            x_values_b = [age + age_to_year_offset for age in timeline_b['age']]
-        else:
-            x_values_b = timeline_b['age']
+    # Get liquidity events for scenario A
+    if compare_scenarios:
+        liquidity_events_a = [event_from_dict(e) for e in scenario_a.liquidity_events]
+    else:
+        liquidity_events_a = liquidity_events
+    
+    # Calculate timeline for Scenario A
+    timeline_a, metrics_a = cached_timeline(scenario_a, liquidity_events_a, show_real)
+    timeline_a_key = timeline_key(timeline_a)
+    # Lifetime cashflow totals, reduced together for the summary metrics and tables
+    totals_a = timeline_a[CASHFLOW_TOTAL_COLUMNS].sum()
+    
+    # Monte Carlo for Scenario A (use scenario's own MC settings when comparing)
+    mc_results_a = None
+    mc_enabled_a = scenario_a.enable_mc if compare_scenarios else enable_mc
+    mc_runs_a = scenario_a.mc_runs if compare_scenarios else mc_runs
+    if mc_enabled_a:
+        mc_results_a = cached_monte_carlo(scenario_a, liquidity_events_a, mc_runs_a, show_real=show_real)
+        metrics_a.update(mc_results_a)
+    
+    # Calculate for Scenario B if comparing
+    timeline_b = None
+    timeline_b_key = None
+    metrics_b = None
+    totals_b = None
+    mc_results_b = None
+    
+    if compare_scenarios and scenario_b:
+        events_b = [event_from_dict(e) for e in scenario_b.liquidity_events]
+        timeline_b, metrics_b = cached_timeline(scenario_b, events_b, show_real)
+        timeline_b_key = timeline_key(timeline_b)
+        totals_b = timeline_b[CASHFLOW_TOTAL_COLUMNS].sum()
         
-        fig.add_trace(go.Scatter(
-            x=x_values_b,
-            y=timeline_b[balance_col],
-            mode='lines',
-            name=f"{scenario_b.name} ({value_type})",
-            line=dict(color='#2c2c2c', width=2, dash='dash'),
-            hovertext=hover_texts_b,
-            hovertemplate="%{hovertext}<extra></extra>"
-        ))
+        if scenario_b.enable_mc:
+            # Only Scenario A's percentile bands are charted
+            mc_results_b = cached_monte_carlo(scenario_b, events_b, scenario_b.mc_runs, show_real=show_real, return_paths=False)
+            metrics_b.update(mc_results_b)
     
-    # Retirement age vertical line
-    retirement_x = retirement_age + age_to_year_offset if x_axis_mode == "Year" else retirement_age
-    fig.add_vline(
-        x=retirement_x,
-        line_dash="dash",
-        line_color="#c9a961",
-        annotation_text="Retirement",
-        annotation_position="top",
-        annotation_font_color="#003d29"
-    )
+    # ========================================================================
+    # MAIN CONTENT
+    # ========================================================================
+    
+    # Scenario A headline values, formatted once for the KPI row and the comparison table
+    terminal_real_a = f"${metrics_a['terminal_real']:,.0f}"
+    terminal_nominal_a = f"${metrics_a['terminal_nominal']:,.0f}"
+    shortfall_a = str(metrics_a['first_shortfall_age']) if metrics_a['first_shortfall_age'] else "None"
+    success_a = f"{metrics_a['probability_no_shortfall']*100:.1f}%" if metrics_a['probability_no_shortfall'] is not None else "N/A"
+    
+    # KPI Row
+    st.markdown("## Key Performance Metrics")
+    
+    # Primary Metrics Row
+    col1, col2, col3, col4 = st.columns(4)
     
-    # Add zero line to clearly show when portfolio goes negative
-    fig.add_hline(
-        y=0,
-        line_dash="solid",
-        line_color="#8b2635",
-        line_width=1,
-        opacity=0.5
-    )
+    with col1:
+        st.metric(
+            label="Terminal Value (Real)",
+            value=terminal_real_a,
+            help="Inflation-adjusted portfolio value at end of planning horizon"
+        )
     
-    # Plot ONE marker per age for ONE-TIME events only
-    for age, events in one_time_by_age.items():
-        age_row = timeline_a[timeline_a['age'] == age]
-        if age_row.empty:
-            continue
-            
-        # Get the balance at this age on the chart line
-        balance_on_line = age_row.iloc[0][balance_col]
-        
-        # Calculate total for one-time events at this age
-        total_amount = sum(e.amount for e in events)
-        
-        # Determine marker color
-        if total_amount > 0:
-            marker_color = '#c9a961'  # Gold for inflow
-        elif total_amount < 0:
-            marker_color = '#8b2635'  # Burgundy for outflow
-        else:
-            marker_color = '#6b6b6b'  # Gray
-        
-        # Create label
-        if len(events) == 1:
-            label_text = events[0].label[:12]
-        else:
-            label_text = f"{len(events)} Events"
-        
-        # Simple hover for the marker (detailed info comes from portfolio line hover)
-        event_names = ", ".join([e.label for e in events])
-        
-        # Calculate x position based on mode
-        marker_x = age + age_to_year_offset if x_axis_mode == "Year" else age
-        x_label_text = "Year" if x_axis_mode == "Year" else "Age"
-        
-        fig.add_trace(go.Scatter(
-            x=[marker_x],
-            y=[balance_on_line],
-            mode='markers+text',
-            name=label_text,
-            marker=dict(
-                size=14,
-                color=marker_color,
-                symbol='diamond',
-                line=dict(color='#003d29', width=2)
-            ),
-            text=[label_text],
-            textposition='top center',
-            textfont=dict(size=9, color='#003d29', family="Helvetica Neue, Arial, sans-serif"),
-            hovertemplate=f"<b>{event_names}</b><br>{x_label_text} {marker_x}<extra></extra>",
-            hoverlabel=dict(
-                bgcolor='#f8f8f8',
-                font_size=12,
-                font_family="Helvetica Neue, Arial, sans-serif",
-                bordercolor=marker_color
-            ),
-            showlegend=False
-        ))
+    with col2:
+        st.metric(
+            label="Terminal Value (Nominal)",
+            value=terminal_nominal_a,
+            help="Actual dollar value at end of planning horizon without inflation adjustment"
+        )
     
-    # Plot markers for Scenario B one-time events
-    if compare_scenarios and timeline_b is not None:
-        for age, events in one_time_by_age_b.items():
-            age_row = timeline_b[timeline_b['age'] == age]
-            if age_row.empty:
-                continue
-                
-            # Get the balance at this age on scenario B's line
-            balance_on_line = age_row.iloc[0][balance_col]
-            
-            # Calculate total for one-time events at this age
-            total_amount = sum(e.amount for e in events)
-            
-            # Determine marker color (use slightly different colors for scenario B)
-            if total_amount > 0:
-                marker_color = '#ffd700'  # Bright gold for inflow
-            elif total_amount < 0:
-                marker_color = '#dc143c'  # Crimson for outflow
-            else:
-                marker_color = '#808080'  # Gray
-            
-            # Create label
-            if len(events) == 1:
-                label_text = events[0].label[:12]
-            else:
-                label_text = f"{len(events)} Events"
-            
-            # Simple hover for the marker
-            event_names = ", ".join([e.label for e in events])
-            
-            # Calculate x position based on mode
-            marker_x_b = age + age_to_year_offset if x_axis_mode == "Year" else age
-            x_label_text = "Year" if x_axis_mode == "Year" else "Age"
-            
-            fig.add_trace(go.Scatter(
-                x=[marker_x_b],
-                y=[balance_on_line],
-                mode='markers+text',
-                name=f"{label_text} (B)",
-                marker=dict(
-                    size=14,
-                    color=marker_color,
-                    symbol='square',  # Use square for scenario B to differentiate
-                    line=dict(color='#2c2c2c', width=2)
-                ),
-                text=[label_text],
-                textposition='bottom center',
-                textfont=dict(size=9, color='#2c2c2c', family="Helvetica Neue, Arial, sans-serif"),
-                hovertemplate=f"<b>{scenario_b.name}: {event_names}</b><br>{x_label_text} {marker_x_b}<extra></extra>",
-                hoverlabel=dict(
-                    bgcolor='#f0f0f0',
-                    font_size=12,
-                    font_family="Helvetica Neue, Arial, sans-serif",
-                    bordercolor=marker_color
-                ),
-                showlegend=False
-            ))
+    with col3:
+        st.metric(
+            label="Probability of Success",
+            value=success_a,
+            help="Percentage of Monte Carlo simulations where portfolio never goes negative"
+        )
     
-    # Add recurring events legend box (annotation)
-    # When comparing scenarios, create TWO separate legend boxes for clarity
-    if compare_scenarios and scenario_b and (recurring_events or recurring_events_b):
-        # SCENARIO A LEGEND (Left side)
-        if recurring_events or (hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled):
-            legend_lines_a = [f"<b>{scenario_a.name}</b>", "<b>Liquidity Events:</b>"]
-            
-            if recurring_events:
-                legend_lines_a.append("<b>Recurring:</b>")
-                
-                # Separate credits and debits
-                credits = [e for e in recurring_events if e.amount > 0]
-                debits = [e for e in recurring_events if e.amount < 0]
-                
-                if credits:
-                    for event in credits:
-                        amount = event.amount
-                        freq = "yr"  # Always show per year since we display annual totals
-                        if event.recurrence == "Monthly":
-                            amount *= 12
-                        amount_str = f"${abs(amount):,.0f}"
-                        legend_lines_a.append(f"  + {event.label}: {amount_str}/{freq}")
-                        legend_lines_a.append(f"    (Age {event.start_age}-{event.end_age})")
-                
-                if debits:
-                    for event in debits:
-                        amount = event.amount
-                        freq = "yr"  # Always show per year since we display annual totals
-                        if event.recurrence == "Monthly":
-                            amount *= 12
-                        amount_str = f"${abs(amount):,.0f}"
-                        legend_lines_a.append(f"  - {event.label}: {amount_str}/{freq}")
-                        legend_lines_a.append(f"    (Age {event.start_age}-{event.end_age})")
+    with col4:
+        st.metric(
+            label="First Shortfall Age",
+            value=shortfall_a,
+            help="Age when portfolio balance first goes negative, or None if solvent throughout"
+        )
+    
+    # Monte Carlo Analysis (if enabled)
+    if enable_mc and mc_results_a:
+        with st.expander("Monte Carlo Analysis", expanded=True):
+            mc_col1, mc_col2, mc_col3 = st.columns(3)
             
-            # Add Black Swan to legend if enabled for Scenario A
-            if hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled:
-                legend_lines_a.append("<b>Black Swan:</b>")
-                black_swan_age = getattr(scenario_a, 'black_swan_age', 70)
-                black_swan_loss = getattr(scenario_a, 'black_swan_loss_pct', 50.0)
-                legend_lines_a.append(f"  🦢 Portfolio Loss: {black_swan_loss:.1f}%")
-                legend_lines_a.append(f"    (Age {black_swan_age})")
+            with mc_col1:
+                st.metric(
+                    label="Median Terminal (MC)",
+                    value=f"${mc_results_a['median_terminal']:,.0f}",
+                    help="50th percentile outcome across all Monte Carlo simulations"
+                )
             
-            fig.add_annotation(
-                xref="paper", yref="paper",
-                x=0.02, y=0.02,
-                xanchor='left', yanchor='bottom',
-                text="<br>".join(legend_lines_a),
-                showarrow=False,
-                font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
-                bgcolor='rgba(255, 255, 255, 0.9)',
-                bordercolor='#003d29',
-                borderwidth=2,
-                borderpad=8,
-                align='left'
-            )
-        
-        # SCENARIO B LEGEND (Right side)
-        if recurring_events_b or (hasattr(scenario_b, 'black_swan_enabled') and scenario_b.black_swan_enabled):
-            legend_lines_b = [f"<b>{scenario_b.name}</b>", "<b>Liquidity Events:</b>"]
+            with mc_col2:
+                st.metric(
+                    label="P10 Terminal (MC)",
+                    value=f"${mc_results_a['p10_terminal']:,.0f}",
+                    help="10th percentile - only 10% of outcomes are worse than this value"
+                )
             
-            if recurring_events_b:
-                legend_lines_b.append("<b>Recurring:</b>")
-                
-                # Separate credits and debits for scenario B
-                credits_b = [e for e in recurring_events_b if e.amount > 0]
-                debits_b = [e for e in recurring_events_b if e.amount < 0]
-                
-                if credits_b:
-                    for event in credits_b:
-                        amount = event.amount
-                        freq = "yr"  # Always show per year since we display annual totals
-                        if event.recurrence == "Monthly":
-                            amount *= 12
-                        amount_str = f"${abs(amount):,.0f}"
-                        legend_lines_b.append(f"  + {event.label}: {amount_str}/{freq}")
-                        legend_lines_b.append(f"    (Age {event.start_age}-{event.end_age})")
-                
-                if debits_b:
-                    for event in debits_b:
-                        amount = event.amount
-                        freq = "yr"  # Always show per year since we display annual totals
-                        if event.recurrence == "Monthly":
-                            amount *= 12
-                        amount_str = f"${abs(amount):,.0f}"
-                        legend_lines_b.append(f"  - {event.label}: {amount_str}/{freq}")
-                        legend_lines_b.append(f"    (Age {event.start_age}-{event.end_age})")
+            with mc_col3:
+                st.metric(
+                    label="P90 Terminal (MC)",
+                    value=f"${mc_results_a['p90_terminal']:,.0f}",
+                    help="90th percentile - only 10% of outcomes are better than this value"
+                )
             
-            # Add Black Swan to legend if enabled for Scenario B
-            if hasattr(scenario_b, 'black_swan_enabled') and scenario_b.black_swan_enabled:
-                legend_lines_b.append("<b>Black Swan:</b>")
-                black_swan_age_b = getattr(scenario_b, 'black_swan_age', 70)
-                black_swan_loss_b = getattr(scenario_b, 'black_swan_loss_pct', 50.0)
-                legend_lines_b.append(f"  🦢 Portfolio Loss: {black_swan_loss_b:.1f}%")
-                legend_lines_b.append(f"    (Age {black_swan_age_b})")
+            st.markdown("<br>", unsafe_allow_html=True)
             
-            fig.add_annotation(
-                xref="paper", yref="paper",
-                x=0.98, y=0.02,
-                xanchor='right', yanchor='bottom',
-                text="<br>".join(legend_lines_b),
-                showarrow=False,
-                font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
-                bgcolor='rgba(255, 255, 255, 0.9)',
-                bordercolor='#2c2c2c',
-                borderwidth=2,
-                borderpad=8,
-                align='left'
-            )
-    
-    # Single scenario legend (original behavior)
-    elif (recurring_events or (hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled)) and not compare_scenarios:
-        legend_lines = ["<b>Liquidity Events:</b>"]
-        
-        if recurring_events:
-            legend_lines.append("<b>Recurring:</b>")
+            # Safe Withdrawal Rate Calculator
+            st.markdown("#### Safe Withdrawal Rate Calculator")
             
-            # Separate credits and debits
-            credits = [e for e in recurring_events if e.amount > 0]
-            debits = [e for e in recurring_events if e.amount < 0]
+            # Input field for target ending balance percentage and button in same row
+            col_input, col_button = st.columns([1, 2])
             
-            if credits:
-                for event in credits:
-                    amount = event.amount
-                    freq = "yr"  # Always show per year since we display annual totals
-                    if event.recurrence == "Monthly":
-                        amount *= 12
-                    amount_str = f"${abs(amount):,.0f}"
-                    legend_lines.append(f"  + {event.label}: {amount_str}/{freq} (Age {event.start_age}-{event.end_age})")
+            with col_input:
+                target_ending_pct = st.number_input(
+                    "Target ending balance (%)",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=0.0,
+                    step=5.0,
+                    format="%.1f",
+                    help="Percentage of your retirement starting balance to preserve at terminal age. 0% = deplete to $0, 25% = leave 25% remaining for legacy/safety margin"
+                )
             
-            if debits:
-                for event in debits:
-                    amount = event.amount
-                    freq = "yr"  # Always show per year since we display annual totals
-                    if event.recurrence == "Monthly":
-                        amount *= 12
-                    amount_str = f"${abs(amount):,.0f}"
-                    legend_lines.append(f"  - {event.label}: {amount_str}/{freq} (Age {event.start_age}-{event.end_age})")
-        
-        # Add Black Swan to legend if enabled
-        if hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled:
-            legend_lines.append("<b>Black Swan:</b>")
-            black_swan_age = getattr(scenario_a, 'black_swan_age', 70)
-            black_swan_loss = getattr(scenario_a, 'black_swan_loss_pct', 50.0)
-            legend_lines.append(f"  🦢 Portfolio Loss: {black_swan_loss:.1f}%")
-            legend_lines.append(f"    (Age {black_swan_age})")
-        
-        fig.add_annotation(
-            xref="paper", yref="paper",
-            x=0.98, y=0.02,
-            xanchor='right', yanchor='bottom',
-            text="<br>".join(legend_lines),
-            showarrow=False,
-            font=dict(size=10, family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
-            bgcolor='rgba(255, 255, 255, 0.9)',
-            bordercolor='#003d29',
-            borderwidth=2,
-            borderpad=8,
-            align='left'
-        )
-    
-    # Determine x-axis title for labels
-    x_axis_title_text = "Year" if x_axis_mode == "Year" else "Age"
-    
-    # Add Black Swan marker for Scenario A if enabled
-    if hasattr(scenario_a, 'black_swan_enabled') and scenario_a.black_swan_enabled:
-        black_swan_age = getattr(scenario_a, 'black_swan_age', 70)
-        
-        # Get the balance at black swan age from timeline_a
-        try:
-            black_swan_row = timeline_a[timeline_a['age'] == black_swan_age]
-            if not black_swan_row.empty:
-                black_swan_balance = black_swan_row[balance_col].values[0]
-                
-                # Convert age to year if needed
-                if x_axis_mode == "Year":
-                    marker_x = black_swan_age + age_to_year_offset
-                else:
-                    marker_x = black_swan_age
-                
-                # Add a scatter marker for the black swan event
-                marker_name = f'Black Swan Event ({scenario_a.name})' if compare_scenarios else 'Black Swan Event'
-                fig.add_trace(go.Scatter(
-                    x=[marker_x],
-                    y=[black_swan_balance],
-                    mode='markers+text',
-                    marker=dict(
-                        symbol='circle',
-                        size=15,
-                        color='#003d29',  # Dark green to match scenario A
-                        line=dict(color='white', width=2)
-                    ),
-                    text=['🦢'],
-                    textfont=dict(size=14),
-                    textposition='top center',
-                    name=marker_name,
-                    showlegend=False,
-                    hovertemplate=(
-                        f"<b>Black Swan Event - {scenario_a.name}</b><br>" +
-                        f"{x_axis_title_text}: {marker_x}<br>" +
-                        f"Portfolio Loss: {getattr(scenario_a, 'black_swan_loss_pct', 50.0):.1f}%<br>" +
-                        "<extra></extra>"
-                    )
-                ))
-        except Exception:
-            pass  # Silently skip if black swan age not in timeline
+            with col_button:
+                # Add spacing to align button with input field
+                st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
+                if st.button("Calculate Safe Withdrawal Rate", use_container_width=True):
+                    if scenario_a.withdrawal_method == "Fixed % of prior-year end balance":
+                        with st.spinner("Calculating optimal withdrawal rate..."):
+                            swr = solve_safe_withdrawal_rate(
+                                scenario_a, 
+                                liquidity_events_a,
+                                target_ending_balance_pct=target_ending_pct,
+                                debug=True
+                            )
+                            if target_ending_pct > 0:
+                                st.success(f"**Safe Withdrawal Rate: {swr:.2f}%**")
+                                st.caption(f"Maximum withdrawal rate preserving {target_ending_pct}% ending balance")
+                            else:
+                                st.success(f"**Safe Withdrawal Rate: {swr:.2f}%**")
+                                st.caption("Maximum withdrawal rate where portfolio remains solvent")
+                    else:
+                        st.warning("SWR solver requires '% of prior-year balance' withdrawal method")
     
-    # Add Black Swan marker for Scenario B if comparing and enabled
-    if compare_scenarios and scenario_b and hasattr(scenario_b, 'black_swan_enabled') and scenario_b.black_swan_enabled:
-        black_swan_age_b = getattr(scenario_b, 'black_swan_age', 70)
+    # Comparison metrics
+    if compare_scenarios and scenario_b and metrics_b:
+        st.markdown("### Scenario Comparison")
+        comp_data = {
+            "Metric": ["Terminal (Real)", "Terminal (Nominal)", "First Shortfall Age"],
+            scenario_a.name: [terminal_real_a, terminal_nominal_a, shortfall_a],
+            scenario_b.name: [
+                f"${metrics_b['terminal_real']:,.0f}",
+                f"${metrics_b['terminal_nominal']:,.0f}",
+                str(metrics_b['first_shortfall_age']) if metrics_b['first_shortfall_age'] else "None"
+            ]
+        }
         
-        # Get the balance at black swan age from timeline_b
-        try:
-            black_swan_row_b = timeline_b[timeline_b['age'] == black_swan_age_b]
-            if not black_swan_row_b.empty:
-                black_swan_balance_b = black_swan_row_b[balance_col].values[0]
-                
-                # Convert age to year if needed
-                if x_axis_mode == "Year":
-                    marker_x_b = black_swan_age_b + age_to_year_offset
-                else:
-                    marker_x_b = black_swan_age_b
-                
-                # Add a scatter marker for the black swan event (different color for scenario B)
-                fig.add_trace(go.Scatter(
-                    x=[marker_x_b],
-                    y=[black_swan_balance_b],
-                    mode='markers+text',
-                    marker=dict(
-                        symbol='circle',
-                        size=15,
-                        color='#2c2c2c',  # Dark gray to match scenario B
-                        line=dict(color='white', width=2)
-                    ),
-                    text=['🦢'],
-                    textfont=dict(size=14),
-                    textposition='bottom center',  # Different position to avoid overlap
-                    name=f'Black Swan Event ({scenario_b.name})',
-                    showlegend=False,
-                    hovertemplate=(
-                        f"<b>Black Swan Event - {scenario_b.name}</b><br>" +
-                        f"{x_axis_title_text}: {marker_x_b}<br>" +
-                        f"Portfolio Loss: {getattr(scenario_b, 'black_swan_loss_pct', 50.0):.1f}%<br>" +
-                        "<extra></extra>"
-                    )
-                ))
-        except Exception:
-            pass  # Silently skip if black swan age not in timeline
+        if metrics_a['probability_no_shortfall'] is not None or metrics_b['probability_no_shortfall'] is not None:
+            comp_data["Metric"].append("Probability of Success")
+            comp_data[scenario_a.name].append(success_a)
+            comp_data[scenario_b.name].append(
+                f"{metrics_b['probability_no_shortfall']*100:.1f}%" if metrics_b['probability_no_shortfall'] is not None else "N/A"
+            )
+        
+        # Ensure all columns have the same length
+        max_len = max(len(comp_data["Metric"]), len(comp_data[scenario_a.name]), len(comp_data[scenario_b.name]))
+        for key in comp_data.keys():
+            while len(comp_data[key]) < max_len:
+                comp_data[key].append("N/A")
+        
+        # A dict of columns renders directly; no DataFrame needed for a handful of rows
+        st.dataframe(comp_data, width="stretch", hide_index=True)
     
-    fig.update_layout(
-        xaxis_title=x_axis_title_text,
-        yaxis_title=f"Portfolio Balance ({CURRENCY})",
-        hovermode='x unified',  # Show all traces at same x position
-        height=550,  # Increased height to accommodate labels
-        showlegend=True,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c"),
-        xaxis=dict(gridcolor='#e0e0e0', showgrid=True),
-        yaxis=dict(
-            gridcolor='#e0e0e0', 
-            showgrid=True,
-            rangemode='normal'  # Allow automatic ranging including negative values
-        ),
-        legend=dict(
-            bgcolor='rgba(248, 248, 248, 0.9)',
-            bordercolor='#e0e0e0',
-            borderwidth=1
-        ),
-        margin=dict(t=40, b=40, l=60, r=20)  # Add margin to prevent cutoff
+    # Main Chart
+    st.markdown("## Portfolio Balance Projection")
+    
+    # Add X-axis toggle (Age vs Year)
+    col_left, col_right = st.columns([4, 1])
+    with col_right:
+        x_axis_mode = st.radio(
+            "X-Axis:",
+            options=X_AXIS_OPTIONS,
+            index=0,
+            horizontal=True,
+            key="x_axis_toggle",
+            help="Switch between Age and Calendar Year"
+        )
+    
+    # Calculate year values (current age is taken to be this calendar year)
+    age_to_year_offset = _current_year() - current_age
+    
+    # Figures are rebuilt only when one of their inputs changes (see build_balance_figure)
+    fig = build_balance_figure(
+        scenario_a, liquidity_events_a, timeline_a, timeline_a_key, scenario_b, timeline_b, timeline_b_key,
+        mc_results_a if enable_mc and not compare_scenarios else None,
+        show_real, x_axis_mode, age_to_year_offset, retirement_age
     )
     
     st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True})
@@ -2572,187 +3234,9 @@ def main():
         else:
             st.markdown("**This chart shows all cash inflows and outflows by year.**")
         
-        cashflow_fig = go.Figure()
-        
-        # Use same x-axis values as main chart
-        x_values_cashflow = x_values_a  # Reuse the calculated values from main chart
-        x_label_cashflow = "Year" if x_axis_mode == "Year" else "Age"
-        
-        # Scenario A suffix for comparison mode
-        scenario_a_suffix = f" ({scenario_a.name})" if compare_scenarios and scenario_b else ""
-        
-        # Contributions (green for inflows)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=timeline_a['contributions'],
-            name=f'Contributions{scenario_a_suffix}',
-            marker_color='#00875a',  # Brighter green for better contrast
-            hovertemplate=f'<b>Contributions{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
-        ))
-        
-        # Withdrawals (red/burgundy for outflows)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=-timeline_a['withdrawals'],
-            name=f'Withdrawals{scenario_a_suffix}',
-            marker_color='#8b2635',  # Burgundy/wine red for contrast
-            hovertemplate=f'<b>Withdrawals{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-            customdata=timeline_a['withdrawals']
-        ))
-        
-        # Liquidity Events - split into inflows (positive) and outflows (negative)
-        liquidity_inflows = timeline_a['liquidity_net'].clip(lower=0)  # Positive values only
-        liquidity_outflows = timeline_a['liquidity_net'].clip(upper=0)  # Negative values only
-        
-        # Liquidity Inflows (gold - Gordon Goss accent)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=liquidity_inflows,
-            name=f'Liquidity Inflows{scenario_a_suffix}',
-            marker_color='#c9a961',  # Gordon Goss gold
-            hovertemplate=f'<b>Liquidity Inflows{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
-        ))
-        
-        # Liquidity Outflows (darker gold/bronze)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=liquidity_outflows,
-            name=f'Liquidity Outflows{scenario_a_suffix}',
-            marker_color='#8b7355',  # Bronze/brown
-            hovertemplate=f'<b>Liquidity Outflows{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-            customdata=abs(liquidity_outflows)
-        ))
-        
-        # Fees (dark gray)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=-timeline_a['fees'],
-            name=f'Fees{scenario_a_suffix}',
-            marker_color='#6b6b6b',
-            hovertemplate=f'<b>Fees{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-            customdata=timeline_a['fees']
-        ))
-        
-        # Taxes (darker red)
-        cashflow_fig.add_trace(go.Bar(
-            x=x_values_cashflow,
-            y=-timeline_a['taxes'],
-            name=f'Taxes{scenario_a_suffix}',
-            marker_color='#5c1a1a',
-            hovertemplate=f'<b>Taxes{scenario_a_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-            customdata=timeline_a['taxes']
-        ))
-        
-        # Add Scenario B cashflow if comparing
-        if compare_scenarios and timeline_b is not None and scenario_b is not None:
-            # Prepare x-axis for scenario B
-            if x_axis_mode == "Year":
-                x_values_cashflow_b = [age + age_to_year_offset for age in timeline_b['age']]
-            else:
-                x_values_cashflow_b = timeline_b['age']
-            
-            scenario_b_suffix = f" ({scenario_b.name})"
-            
-            # Use slightly different colors/patterns for Scenario B to distinguish
-            # Contributions for B (lighter green with pattern)
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=timeline_b['contributions'],
-                name=f'Contributions{scenario_b_suffix}',
-                marker_color='#4db380',  # Lighter green
-                marker_pattern_shape="/",  # Add pattern for distinction
-                hovertemplate=f'<b>Contributions{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
-            ))
-            
-            # Withdrawals for B (lighter burgundy with pattern)
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=-timeline_b['withdrawals'],
-                name=f'Withdrawals{scenario_b_suffix}',
-                marker_color='#b8475a',  # Lighter burgundy
-                marker_pattern_shape="/",
-                hovertemplate=f'<b>Withdrawals{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-                customdata=timeline_b['withdrawals']
-            ))
-            
-            # Liquidity Events for B
-            liquidity_inflows_b = timeline_b['liquidity_net'].clip(lower=0)
-            liquidity_outflows_b = timeline_b['liquidity_net'].clip(upper=0)
-            
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=liquidity_inflows_b,
-                name=f'Liquidity Inflows{scenario_b_suffix}',
-                marker_color='#ddc98a',  # Lighter gold
-                marker_pattern_shape="/",
-                hovertemplate=f'<b>Liquidity Inflows{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: $%{{y:,.0f}}<extra></extra>'
-            ))
-            
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=liquidity_outflows_b,
-                name=f'Liquidity Outflows{scenario_b_suffix}',
-                marker_color='#a89175',  # Lighter bronze
-                marker_pattern_shape="/",
-                hovertemplate=f'<b>Liquidity Outflows{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-                customdata=abs(liquidity_outflows_b)
-            ))
-            
-            # Fees for B
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=-timeline_b['fees'],
-                name=f'Fees{scenario_b_suffix}',
-                marker_color='#8c8c8c',  # Lighter gray
-                marker_pattern_shape="/",
-                hovertemplate=f'<b>Fees{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-                customdata=timeline_b['fees']
-            ))
-            
-            # Taxes for B
-            cashflow_fig.add_trace(go.Bar(
-                x=x_values_cashflow_b,
-                y=-timeline_b['taxes'],
-                name=f'Taxes{scenario_b_suffix}',
-                marker_color='#8b3a3a',  # Lighter dark red
-                marker_pattern_shape="/",
-                hovertemplate=f'<b>Taxes{scenario_b_suffix}</b><br>{x_label_cashflow}: %{{x}}<br>Amount: -$%{{customdata:,.0f}}<extra></extra>',
-                customdata=timeline_b['taxes']
-            ))
-        
-        cashflow_fig.update_layout(
-            barmode='relative',
-            xaxis_title=x_axis_title_text,
-            yaxis_title=f"Annual Cashflow ({CURRENCY})",
-            height=450,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family="Helvetica Neue, Arial, sans-serif", color="#2c2c2c", size=12),
-            xaxis=dict(
-                gridcolor='#e0e0e0',
-                showgrid=True,
-                zeroline=True,
-                zerolinecolor='#003d29',
-                zerolinewidth=2
-            ),
-            yaxis=dict(
-                gridcolor='#e0e0e0',
-                showgrid=True,
-                zeroline=True,
-                zerolinecolor='#003d29',
-                zerolinewidth=2
-            ),
-            legend=dict(
-                bgcolor='rgba(248, 248, 248, 0.95)',
-                bordercolor='#003d29',
-                borderwidth=1,
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='center',
-                x=0.5
-            ),
-            hovermode='x unified'
+        cashflow_fig = build_cashflow_figure(
+            scenario_a, timeline_a, timeline_a_key, scenario_b, timeline_b, timeline_b_key,
+            x_axis_mode, age_to_year_offset
         )
         
         st.plotly_chart(cashflow_fig, use_container_width=True, config={'displayModeBar': True})
@@ -2765,46 +3249,46 @@ def main():
             st.markdown(f"**{scenario_a.name}**")
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                total_contrib = timeline_a['contributions'].sum()
+                total_contrib = totals_a['contributions']
                 st.metric("Total Contributions", f"${total_contrib:,.0f}")
             with col2:
-                total_withdraw = timeline_a['withdrawals'].sum()
+                total_withdraw = totals_a['withdrawals']
                 st.metric("Total Withdrawals", f"${total_withdraw:,.0f}")
             with col3:
-                total_fees = timeline_a['fees'].sum()
+                total_fees = totals_a['fees']
                 st.metric("Total Fees", f"${total_fees:,.0f}")
             with col4:
-                total_taxes = timeline_a['taxes'].sum()
+                total_taxes = totals_a['taxes']
                 st.metric("Total Taxes", f"${total_taxes:,.0f}")
             
             st.markdown(f"**{scenario_b.name}**")
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                total_contrib_b = timeline_b['contributions'].sum()
+                total_contrib_b = totals_b['contributions']
                 st.metric("Total Contributions", f"${total_contrib_b:,.0f}")
             with col2:
-                total_withdraw_b = timeline_b['withdrawals'].sum()
+                total_withdraw_b = totals_b['withdrawals']
                 st.metric("Total Withdrawals", f"${total_withdraw_b:,.0f}")
             with col3:
-                total_fees_b = timeline_b['fees'].sum()
+                total_fees_b = totals_b['fees']
                 st.metric("Total Fees", f"${total_fees_b:,.0f}")
             with col4:
-                total_taxes_b = timeline_b['taxes'].sum()
+                total_taxes_b = totals_b['taxes']
                 st.metric("Total Taxes", f"${total_taxes_b:,.0f}")
         else:
             # Single scenario summary
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                total_contrib = timeline_a['contributions'].sum()
+                total_contrib = totals_a['contributions']
                 st.metric("Total Contributions", f"${total_contrib:,.0f}")
             with col2:
-                total_withdraw = timeline_a['withdrawals'].sum()
+                total_withdraw = totals_a['withdrawals']
                 st.metric("Total Withdrawals", f"${total_withdraw:,.0f}")
             with col3:
-                total_fees = timeline_a['fees'].sum()
+                total_fees = totals_a['fees']
                 st.metric("Total Fees", f"${total_fees:,.0f}")
             with col4:
-                total_taxes = timeline_a['taxes'].sum()
+                total_taxes = totals_a['taxes']
                 st.metric("Total Taxes", f"${total_taxes:,.0f}")
     
     # Timeline Table
@@ -2814,34 +3298,44 @@ def main():
         # COMPARISON TABLE: Show both scenarios side by side with deltas
         st.markdown(f"**Comparing: {scenario_a.name} vs {scenario_b.name}**")
         
+        # Year-by-year differences (B - A), aligned by row
+        delta_nominal = timeline_b['end_balance_nominal'] - timeline_a['end_balance_nominal']
+        delta_real = timeline_b['end_balance_real'] - timeline_a['end_balance_real']
+        
         # Create comparison dataframe
         comp_timeline_df = pd.DataFrame({
             'Age': timeline_a['age'],
             
             # Scenario A columns
-            f'{scenario_a.name} - End Balance (Nominal)': timeline_a['end_balance_nominal'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_a.name} - End Balance (Real)': timeline_a['end_balance_real'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_a.name} - Growth': timeline_a['growth'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_a.name} - Contributions': timeline_a['contributions'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_a.name} - Withdrawals': timeline_a['withdrawals'].apply(lambda x: f"${x:,.0f}"),
+            f'{scenario_a.name} - End Balance (Nominal)': timeline_a['end_balance_nominal'],
+            f'{scenario_a.name} - End Balance (Real)': timeline_a['end_balance_real'],
+            f'{scenario_a.name} - Growth': timeline_a['growth'],
+            f'{scenario_a.name} - Contributions': timeline_a['contributions'],
+            f'{scenario_a.name} - Withdrawals': timeline_a['withdrawals'],
             
             # Scenario B columns
-            f'{scenario_b.name} - End Balance (Nominal)': timeline_b['end_balance_nominal'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_b.name} - End Balance (Real)': timeline_b['end_balance_real'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_b.name} - Growth': timeline_b['growth'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_b.name} - Contributions': timeline_b['contributions'].apply(lambda x: f"${x:,.0f}"),
-            f'{scenario_b.name} - Withdrawals': timeline_b['withdrawals'].apply(lambda x: f"${x:,.0f}"),
-            
-            # Delta columns (raw values for calculation)
-            'Δ End Balance (Nominal)': (timeline_b['end_balance_nominal'] - timeline_a['end_balance_nominal']).apply(
-                lambda x: f"${x:+,.0f}" if x != 0 else "$0"
-            ),
-            'Δ End Balance (Real)': (timeline_b['end_balance_real'] - timeline_a['end_balance_real']).apply(
-                lambda x: f"${x:+,.0f}" if x != 0 else "$0"
-            ),
+            f'{scenario_b.name} - End Balance (Nominal)': timeline_b['end_balance_nominal'],
+            f'{scenario_b.name} - End Balance (Real)': timeline_b['end_balance_real'],
+            f'{scenario_b.name} - Growth': timeline_b['growth'],
+            f'{scenario_b.name} - Contributions': timeline_b['contributions'],
+            f'{scenario_b.name} - Withdrawals': timeline_b['withdrawals'],
+            
+            # Delta columns stay preformatted to keep the explicit +/- sign and the "$0" case
+            'Δ End Balance (Nominal)': format_currency(delta_nominal, "+,.0f").where(delta_nominal != 0, "$0"),
+            'Δ End Balance (Real)': format_currency(delta_real, "+,.0f").where(delta_real != 0, "$0"),
         })
         
-        st.dataframe(comp_timeline_df, width="stretch", hide_index=True)
+        # Balances go to the browser as numbers and are formatted (and sorted) client-side
+        st.dataframe(
+            comp_timeline_df,
+            width="stretch",
+            hide_index=True,
+            column_config={
+                col: st.column_config.NumberColumn(format="dollar")
+                for col in comp_timeline_df.columns
+                if col != 'Age' and not col.startswith('Δ')
+            }
+        )
         
     else:
         # SINGLE SCENARIO TABLE: Original detailed view
@@ -2857,9 +3351,9 @@ def main():
             'end_balance_nominal',
             'cpi_index',
             'end_balance_real'
-        ]].copy()
+        ]]
         
-        # Format for display
+        # Formatted in the browser, so the columns stay numeric (and sortable)
         currency_cols = [
             'start_balance_nominal',
             'contributions',
@@ -2871,13 +3365,10 @@ def main():
             'end_balance_nominal',
             'end_balance_real'
         ]
+        display_config = {col: st.column_config.NumberColumn(format="dollar") for col in currency_cols}
+        display_config['cpi_index'] = st.column_config.NumberColumn(format="%.4f")
         
-        for col in currency_cols:
-            display_df[col] = display_df[col].apply(lambda x: f"${x:,.2f}")
-        
-        display_df['cpi_index'] = display_df['cpi_index'].apply(lambda x: f"{x:.4f}")
-        
-        st.dataframe(display_df, width="stretch", hide_index=True)
+        st.dataframe(display_df, width="stretch", hide_index=True, column_config=display_config)
     
     # Export buttons
     st.markdown("## Export & Download")
@@ -2911,437 +3402,310 @@ def main():
     st.markdown("---")
     st.markdown("## Debug Monitor")
     
-    with st.expander("**LIVE CALCULATION TRACKER** - Verify Math in Real-Time", expanded=False):
-        st.markdown("**This panel updates automatically as you change parameters above. Watch the calculations update!**")
-        st.markdown("---")
-        
-        # Show current configuration snapshot
-        st.markdown("### Current Configuration")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Current Age", scenario_a.current_age)
-            st.metric("Retirement Age", scenario_a.retirement_age)
-            st.metric("End Age", scenario_a.end_age)
-        with col2:
-            st.metric("Starting Balance", f"${scenario_a.current_balance:,.0f}")
-            st.metric("Contribution", f"${scenario_a.contrib_amount:,.0f}")
-            st.metric("Contrib Cadence", scenario_a.contrib_cadence)
-        with col3:
-            st.metric("Nominal Return", f"{scenario_a.nominal_return_pct}%")
-            st.metric("Inflation", f"{scenario_a.inflation_pct}%")
-            st.metric("Fee Rate", f"{scenario_a.fee_pct}%")
-        with col4:
-            if scenario_a.withdrawal_method == "Fixed % of prior-year end balance":
-                st.metric("Withdrawal %", f"{scenario_a.withdrawal_pct}%")
-            else:
-                st.metric("Withdrawal Amt", f"${scenario_a.withdrawal_real_amount:,.0f}")
-            st.metric("Withdrawal Freq", scenario_a.withdrawal_frequency)
-            st.metric("Withdrawal Tax", f"{effective_tax_rate_pct}%")
-        
-        st.markdown("---")
-        st.markdown("### Sample Year: Detailed Step-by-Step Calculation")
-        
-        # Calculate one sample year at retirement age
-        sample_age = scenario_a.retirement_age
-        sample_row = timeline_a[timeline_a['age'] == sample_age]
-        
-        if not sample_row.empty:
-            row = sample_row.iloc[0]
+    # Collapsed sections aren't laid out (or computed) until the user asks for them
+    if st.toggle("Show live calculation tracker", key="show_debug_monitor"):
+        with st.expander("**LIVE CALCULATION TRACKER** - Verify Math in Real-Time", expanded=True):
+            st.markdown("**This panel updates automatically as you change parameters above. Watch the calculations update!**")
+            st.markdown("---")
             
-            # Get prior year balance
-            if sample_age > scenario_a.current_age:
-                prior_row = timeline_a[timeline_a['age'] == sample_age - 1]
-                prior_balance = prior_row.iloc[0]['end_balance_nominal'] if not prior_row.empty else scenario_a.current_balance
-            else:
-                prior_balance = scenario_a.current_balance
+            # Show current configuration snapshot
+            st.markdown("### Current Configuration")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Current Age", scenario_a.current_age)
+                st.metric("Retirement Age", scenario_a.retirement_age)
+                st.metric("End Age", scenario_a.end_age)
+            with col2:
+                st.metric("Starting Balance", f"${scenario_a.current_balance:,.0f}")
+                st.metric("Contribution", f"${scenario_a.contrib_amount:,.0f}")
+                st.metric("Contrib Cadence", scenario_a.contrib_cadence)
+            with col3:
+                st.metric("Nominal Return", f"{scenario_a.nominal_return_pct}%")
+                st.metric("Inflation", f"{scenario_a.inflation_pct}%")
+                st.metric("Fee Rate", f"{scenario_a.fee_pct}%")
+            with col4:
+                if scenario_a.withdrawal_method == "Fixed % of prior-year end balance":
+                    st.metric("Withdrawal %", f"{scenario_a.withdrawal_pct}%")
+                else:
+                    st.metric("Withdrawal Amt", f"${scenario_a.withdrawal_real_amount:,.0f}")
+                st.metric("Withdrawal Freq", scenario_a.withdrawal_frequency)
+                st.metric("Withdrawal Tax", f"{effective_tax_rate_pct}%")
             
-            st.info(f"**Analyzing Age {sample_age} (First Year of Retirement)**")
+            st.markdown("---")
+            st.markdown("### Sample Year: Detailed Step-by-Step Calculation")
             
-            # Starting balance
-            st.markdown("#### 1️⃣ Starting Balance")
-            st.code(f"Starting Balance = ${row['start_balance_nominal']:,.2f}")
-            st.caption(f"Note: This is the ending balance from age {sample_age - 1}")
+            # Calculate one sample year at retirement age
+            sample_age = scenario_a.retirement_age
+            # Timeline rows run one per age from current_age, so the row is found by position
+            sample_idx = sample_age - scenario_a.current_age
             
-            # Contributions
-            st.markdown("#### 2️⃣ Contributions")
-            contrib_calc = scenario_a.contrib_amount
-            if sample_age < scenario_a.retirement_age:
-                if scenario_a.contrib_cadence == "Monthly":
-                    st.code(f"Contributions = ${scenario_a.contrib_amount:,.2f} × 12 (monthly cadence) = ${contrib_calc * 12:,.2f}")
+            if 0 <= sample_idx < len(timeline_a):
+                row = timeline_a.iloc[sample_idx]
+                
+                st.info(f"**Analyzing Age {sample_age} (First Year of Retirement)**")
+                
+                # Starting balance
+                st.markdown("#### 1️⃣ Starting Balance")
+                st.code(f"Starting Balance = ${row['start_balance_nominal']:,.2f}")
+                st.caption(f"Note: This is the ending balance from age {sample_age - 1}")
+                
+                # Contributions
+                st.markdown("#### 2️⃣ Contributions")
+                contrib_calc = scenario_a.contrib_amount
+                if sample_age < scenario_a.retirement_age:
+                    if scenario_a.contrib_cadence == "Monthly":
+                        st.code(f"Contributions = ${scenario_a.contrib_amount:,.2f} × 12 (monthly cadence) = ${contrib_calc * 12:,.2f}")
+                    else:
+                        st.code(f"Contributions = ${contrib_calc:,.2f} (annual cadence)")
+                    contrib_calc = contrib_calc * 12 if scenario_a.contrib_cadence == "Monthly" else contrib_calc
                 else:
-                    st.code(f"Contributions = ${contrib_calc:,.2f} (annual cadence)")
-                contrib_calc = contrib_calc * 12 if scenario_a.contrib_cadence == "Monthly" else contrib_calc
-            else:
-                st.code(f"Contributions = $0.00")
-                st.caption("Contributions stop at retirement age")
-                contrib_calc = 0
-            st.caption(f"**Actual from timeline: ${row['contributions']:,.2f}**")
-            
-            # Check if matches
-            if abs(contrib_calc - row['contributions']) < 0.01:
-                st.success("Match!")
-            else:
-                st.error(f"Mismatch! Expected ${contrib_calc:,.2f}, got ${row['contributions']:,.2f}")
+                    st.code(f"Contributions = $0.00")
+                    st.caption("Contributions stop at retirement age")
+                    contrib_calc = 0
+                st.caption(f"**Actual from timeline: ${row['contributions']:,.2f}**")
+                
+                # Check if matches
+                if abs(contrib_calc - row['contributions']) < 0.01:
+                    st.success("Match!")
+                else:
+                    st.error(f"Mismatch! Expected ${contrib_calc:,.2f}, got ${row['contributions']:,.2f}")
+                
+                # (Debug/verification panel removed to keep UI professional and avoid
+                #  intermittent references to internal variables. Calculations are
+                #  performed deterministically in build_timeline; use unit tests
+                #  or a dedicated admin/debug page if deep inspection is required.)
             
-            # (Debug/verification panel removed to keep UI professional and avoid
-            #  intermittent references to internal variables. Calculations are
-            #  performed deterministically in build_timeline; use unit tests
-            #  or a dedicated admin/debug page if deep inspection is required.)
-        
-        st.markdown("---")
-        st.markdown("### Timeline Preview (First & Last 5 Years)")
-        
-        # Show first 5 years
-        st.markdown("**First 5 Years:**")
-        first_years = timeline_a.head(5).copy()
-        first_years_display = first_years[['age', 'start_balance_nominal', 'contributions', 'liquidity_net', 
-                                           'withdrawals', 'fees', 'taxes', 'growth', 'end_balance_nominal']].copy()
-        
-        # Format as currency
-        for col in first_years_display.columns:
-            if col != 'age':
-                first_years_display[col] = first_years_display[col].apply(lambda x: f"${x:,.0f}")
-        st.dataframe(first_years_display, width="stretch", hide_index=True)
-
-        # Show last 5 years
-        st.markdown("**Last 5 Years:**")
-        last_years = timeline_a.tail(5).copy()
-        last_years_display = last_years[['age', 'start_balance_nominal', 'contributions', 'liquidity_net', 
-                                         'withdrawals', 'fees', 'taxes', 'growth', 'end_balance_nominal']].copy()
-        for col in last_years_display.columns:
-            if col != 'age':
-                last_years_display[col] = last_years_display[col].apply(lambda x: f"${x:,.0f}")
-        st.dataframe(last_years_display, width="stretch", hide_index=True)
-        
-        # Liquidity Events Debug
-        if liquidity_events:
             st.markdown("---")
-            st.markdown("### Liquidity Events Active in Timeline")
-            for evt in liquidity_events:
-                with st.container():
-                    st.write(f"**{evt.label}** ({evt.type})")
-                    st.write(f"  • Amount: ${evt.amount:,.2f}")
-                    st.write(f"  • Active ages: {evt.start_age} to {evt.end_age}")
-                    st.write(f"  • Recurrence: {evt.recurrence}")
-                    st.write(f"  • Taxable: {evt.taxable} (Rate: {evt.tax_rate}%)")
-                    
-                    # Show when it applies
-                    if evt.recurrence == "One-time":
-                        st.caption(f"Applies ONCE at age {evt.start_age}")
-                    elif evt.recurrence == "Monthly":
-                        annual_amount = evt.amount * 12
-                        st.caption(f"Applies EVERY YEAR from {evt.start_age} to {evt.end_age}, annualized to ${annual_amount:,.2f}/year")
-                    else:
-                        st.caption(f"Applies EVERY YEAR from {evt.start_age} to {evt.end_age}")
+            st.markdown("### Timeline Preview (First & Last 5 Years)")
+            
+            # First and last 5 years, with every column but age shown as currency
+            preview_currency_columns = ['start_balance_nominal', 'contributions', 'liquidity_net',
+                                        'withdrawals', 'fees', 'taxes', 'growth', 'end_balance_nominal']
+            for preview_label, preview_years in (("First 5 Years", timeline_a.head(5)), ("Last 5 Years", timeline_a.tail(5))):
+                st.markdown(f"**{preview_label}:**")
+                preview_display = preview_years[['age']].assign(
+                    **{col: format_currency(preview_years[col]) for col in preview_currency_columns}
+                )
+                st.dataframe(preview_display, width="stretch", hide_index=True)
+            
+            # Liquidity Events Debug
+            if liquidity_events:
+                st.markdown("---")
+                st.markdown("### Liquidity Events Active in Timeline")
+                # Same per-event table as the admin breakdown, laid out for tracing the timeline
+                events_table = liquidity_events_table(liquidity_events)
+                active_events = events_table[["Label", "Type", "Amount", "Start Age", "End Age", "Recurrence"]].assign(
+                    Taxable=events_table["Taxable"].astype(str) + " (Rate: " + events_table["Tax Rate"].astype(str) + "%)"
+                )
+                # When each event applies, chosen per row by recurrence
+                every_year = (
+                    "EVERY YEAR from " + active_events["Start Age"].astype(str)
+                    + " to " + active_events["End Age"].astype(str)
+                )
+                active_events["Applies"] = np.select(
+                    [active_events["Recurrence"] == "One-time", active_events["Recurrence"] == "Monthly"],
+                    [
+                        "ONCE at age " + active_events["Start Age"].astype(str),
+                        every_year + ", annualized to " + format_currency(active_events["Amount"] * 12, ",.2f") + "/year"
+                    ],
+                    default=every_year
+                )
+                active_events["Amount"] = format_currency(active_events["Amount"], ",.2f")
+                st.dataframe(active_events, width="stretch", hide_index=True)
     
     # Admin Section - Detailed Calculation Breakdown
     st.markdown("---")
     st.markdown("## Administration")
     
-    with st.expander("Show Detailed Calculation Breakdown", expanded=False):
-        st.markdown("### Calculation Verification & Audit Trail")
-        
-        # Scenario Parameters
-        with st.expander("Scenario Parameters", expanded=True):
-            st.markdown("#### Input Configuration")
-            params_data = {
-                "Parameter": [
-                    "Current Age", "Retirement Age", "End Age",
-                    "Current Balance", "Contribution Amount", "Contribution Cadence",
-                    "Expected Nominal Return", "Return Volatility (Stdev)", "Inflation Rate",
-                    "Annual Fee/Expense Drag", "Withdrawal Method", "Withdrawal %/Amount",
-                    "Withdrawal Frequency", "Withdrawal Tax Rate", "Monte Carlo Runs"
-                ],
-                "Value": [
-                    scenario_a.current_age, scenario_a.retirement_age, scenario_a.end_age,
-                    f"${scenario_a.current_balance:,.2f}", f"${scenario_a.contrib_amount:,.2f}", scenario_a.contrib_cadence,
-                    f"{scenario_a.nominal_return_pct}%", f"{scenario_a.return_stdev_pct}%", f"{scenario_a.inflation_pct}%",
-                    f"{scenario_a.fee_pct}%", scenario_a.withdrawal_method,
-                    f"{scenario_a.withdrawal_pct}%" if scenario_a.withdrawal_method == "Fixed % of prior-year end balance" else f"${scenario_a.withdrawal_real_amount:,.2f}",
-                    scenario_a.withdrawal_frequency,
-                    f"{scenario_a.effective_tax_rate_pct}% (0% = tax-free)",
-                    scenario_a.mc_runs if scenario_a.enable_mc else "Disabled"
-                ]
-            }
-            st.dataframe(pd.DataFrame(params_data), hide_index=True, width="stretch")
-        
-        # Safe Withdrawal Rate Calculation Details
-        if 'swr_debug' in st.session_state and st.session_state.swr_debug:
-            with st.expander("Safe Withdrawal Rate Calculation Details", expanded=False):
-                st.markdown("#### Binary Search Iterations")
-                st.caption("Shows how the algorithm narrows down the maximum sustainable withdrawal rate:")
-                for line in st.session_state.swr_debug:
-                    st.code(line, language=None)
+    if st.toggle("Show detailed calculation breakdown", key="show_admin_breakdown"):
+        admin = admin_tables(
+            scenario_a, liquidity_events, timeline_a, timeline_a_key,
+            {key: metrics_a[key] for key in ('terminal_nominal', 'terminal_real', 'first_shortfall_age')},
+            effective_tax_rate_pct
+        )
+        
+        with st.expander("Show Detailed Calculation Breakdown", expanded=True):
+            st.markdown("### Calculation Verification & Audit Trail")
+            
+            # Scenario Parameters
+            with st.expander("Scenario Parameters", expanded=True):
+                st.markdown("#### Input Configuration")
+                st.dataframe(admin["params"], hide_index=True, width="stretch")
+            
+            # Safe Withdrawal Rate Calculation Details
+            if 'swr_debug' in st.session_state and st.session_state.swr_debug:
+                with st.expander("Safe Withdrawal Rate Calculation Details", expanded=False):
+                    st.markdown("#### Binary Search Iterations")
+                    st.caption("Shows how the algorithm narrows down the maximum sustainable withdrawal rate:")
+                    for line in st.session_state.swr_debug:
+                        st.code(line, language=None)
+                    
+                    st.markdown("""
+                    **Algorithm Explanation:**
+                    - Searches between 0% and 50% withdrawal rate
+                    - Tests each rate by simulating the full timeline
+                    - If portfolio stays positive: tries a higher rate
+                    - If portfolio goes negative: tries a lower rate
+                    - Converges to within 0.01% tolerance
+                    """)
+            
+            # Liquidity Events Detail
+            with st.expander("Liquidity Events Configuration", expanded=True):
+                st.markdown("#### All Configured Events")
+                if admin["events"] is not None:
+                    st.dataframe(admin["events"], hide_index=True, width="stretch")
+                else:
+                    st.info("No liquidity events configured")
+            
+            # Tax Configuration & Breakdown
+            with st.expander("Tax Configuration & Breakdown", expanded=True):
+                st.markdown("#### Tax Settings")
+                st.dataframe(admin["tax_config"], hide_index=True, width="stretch")
                 
+                st.markdown("#### Tax Calculation Methodology")
                 st.markdown("""
-                **Algorithm Explanation:**
-                - Searches between 0% and 50% withdrawal rate
-                - Tests each rate by simulating the full timeline
-                - If portfolio stays positive: tries a higher rate
-                - If portfolio goes negative: tries a lower rate
-                - Converges to within 0.01% tolerance
+                **Annual Tax Calculation:**
+                ```
+                Total Taxes (per year) = Withdrawal Taxes + Event Taxes
+                
+                Where:
+                  Withdrawal Taxes = Annual Withdrawals × Withdrawal Tax Rate
+                  
+                  Event Taxes = Σ (Taxable Event Amount × Event Tax Rate)
+                               for all taxable events with positive amounts
+                ```
+                
+                **Important Notes:**
+                - **Taxed**: Withdrawals, taxable liquidity event inflows (positive amounts)
+                - **NOT Taxed**: Contributions, fees, negative liquidity events (debts/outflows)
+                - Each liquidity event can have its own tax rate (0-100%)
+                - Default 0% = tax-free (Cayman Islands treatment)
                 """)
-        
-        # Liquidity Events Detail
-        with st.expander("Liquidity Events Configuration", expanded=True):
-            st.markdown("#### All Configured Events")
-            if liquidity_events:
-                events_detail = []
-                for evt in liquidity_events:
-                    events_detail.append({
-                        "Type": evt.type,
-                        "Label": evt.label,
-                        "Start Age": evt.start_age,
-                        "End Age": evt.end_age,
-                        "Amount": f"${evt.amount:,.2f}",
-                        "Recurrence": evt.recurrence,
-                        "Taxable": "Yes" if evt.taxable else "No",
-                        "Tax Rate": f"{evt.tax_rate}%"
-                    })
-                st.dataframe(pd.DataFrame(events_detail), hide_index=True, width="stretch")
-            else:
-                st.info("No liquidity events configured")
-        
-        # Tax Configuration & Breakdown
-        with st.expander("Tax Configuration & Breakdown", expanded=True):
-            st.markdown("#### Tax Settings")
-            tax_config = {
-                "Tax Type": [
-                    "Withdrawal Tax Rate",
-                    "Per-Event Tax Rates",
-                    "Tax Treatment"
-                ],
-                "Configuration": [
-                    f"{effective_tax_rate_pct}% (applied to all retirement withdrawals)",
-                    "Individual rates set per liquidity event (see table above)",
-                    "Only taxable inflows are taxed; outflows/debts are NOT taxed"
-                ]
-            }
-            st.dataframe(pd.DataFrame(tax_config), hide_index=True, width="stretch")
-            
-            st.markdown("#### Tax Calculation Methodology")
-            st.markdown("""
-            **Annual Tax Calculation:**
-            ```
-            Total Taxes (per year) = Withdrawal Taxes + Event Taxes
-            
-            Where:
-              Withdrawal Taxes = Annual Withdrawals × Withdrawal Tax Rate
-              
-              Event Taxes = Σ (Taxable Event Amount × Event Tax Rate)
-                           for all taxable events with positive amounts
-            ```
-            
-            **Important Notes:**
-            - **Taxed**: Withdrawals, taxable liquidity event inflows (positive amounts)
-            - **NOT Taxed**: Contributions, fees, negative liquidity events (debts/outflows)
-            - Each liquidity event can have its own tax rate (0-100%)
-            - Default 0% = tax-free (Cayman Islands treatment)
-            """)
-            
-            # Calculate tax breakdown
-            total_withdrawal_taxes = 0.0
-            total_event_taxes = 0.0
+                
+                st.markdown("#### Lifetime Tax Summary")
+                st.dataframe(admin["tax_summary"], hide_index=True, width="stretch")
             
-            for idx, row in timeline_a.iterrows():
-                age = int(row['age'])
-                year_taxes = row['taxes']
+            # Year-by-Year Calculation Logic
+            with st.expander("Year-by-Year Calculation Details", expanded=True):
+                st.markdown("#### Annual Calculation Formulas")
+                st.markdown("""
+                **For each year (age), the following calculations are performed:**
                 
-                # Withdrawal tax for this year
-                if row['withdrawals'] > 0 and effective_tax_rate_pct > 0:
-                    total_withdrawal_taxes += row['withdrawals'] * (effective_tax_rate_pct / 100.0)
+                1. **Start Balance** = Previous year's End Balance (or Current Balance for first year)
                 
-                # Event taxes for this year
-                for event in liquidity_events:
-                    if event.start_age <= age <= event.end_age and event.taxable:
-                        if event.recurrence == "One-time":
-                            if age == event.start_age and event.amount > 0:
-                                total_event_taxes += event.amount * (event.tax_rate / 100.0)
-                        else:
-                            if event.amount > 0:
-                                event_amount = event.amount
-                                if event.recurrence == "Monthly":
-                                    event_amount *= 12
-                                total_event_taxes += event_amount * (event.tax_rate / 100.0)
-            
-            st.markdown("#### Lifetime Tax Summary")
-            tax_summary = {
-                "Tax Category": [
-                    "Withdrawal Taxes",
-                    "Liquidity Event Taxes",
-                    "Total Taxes Paid"
-                ],
-                "Amount": [
-                    f"${total_withdrawal_taxes:,.2f}",
-                    f"${total_event_taxes:,.2f}",
-                    f"${timeline_a['taxes'].sum():,.2f}"
-                ],
-                "Percentage of Total": [
-                    f"{(total_withdrawal_taxes / timeline_a['taxes'].sum() * 100) if timeline_a['taxes'].sum() > 0 else 0:.1f}%",
-                    f"{(total_event_taxes / timeline_a['taxes'].sum() * 100) if timeline_a['taxes'].sum() > 0 else 0:.1f}%",
-                    "100.0%"
-                ]
-            }
-            st.dataframe(pd.DataFrame(tax_summary), hide_index=True, width="stretch")
-        
-        # Year-by-Year Calculation Logic
-        with st.expander("Year-by-Year Calculation Details", expanded=True):
-            st.markdown("#### Annual Calculation Formulas")
-            st.markdown("""
-            **For each year (age), the following calculations are performed:**
-            
-            1. **Start Balance** = Previous year's End Balance (or Current Balance for first year)
-            
-            2. **Contributions** = 
-               - If age < retirement age: Contribution Amount × (12 if Monthly, else 1)
-               - If age ≥ retirement age: $0
-            
-            3. **Liquidity Events** = Sum of all applicable events for this age:
-               - **One-time events** (or Recurrence = "One-time"): Applied only at start_age
-               - **Recurring events**: Applied every year from start_age to end_age
-               - **Monthly recurring**: Amount × 12 (annualized)
-               - **Negative amounts**: Treated as outflows/debts (subtracted from balance)
-               - **Positive amounts**: Treated as inflows (added to balance)
-            
-            4. **Withdrawals** = 
-               - If age < retirement age: $0
-               - If "Fixed % of prior-year balance": 
-                 * Base Amount = Prior Year End Balance × Withdrawal %
-                 * If Monthly frequency: Annual Withdrawals = Base Amount × 12
-                 * If Annual frequency: Annual Withdrawals = Base Amount
-                 * (The % represents monthly or annual rate depending on frequency)
-               - If "Fixed real dollars": 
-                 * Base Amount = Withdrawal Amount × CPI Index (inflation-adjusted)
-                 * If Monthly frequency: Annual Withdrawals = Base Amount × 12
-                 * If Annual frequency: Annual Withdrawals = Base Amount
-            
-            5. **Fees** = Start Balance × Fee Rate
-            
-            6. **Taxes** = Tax Component A + Tax Component B
-               - **Component A (Withdrawal Taxes)**: 
-                 * If Withdrawal Tax Rate > 0: Withdrawals × Withdrawal Tax Rate
-               - **Component B (Liquidity Event Taxes)**: 
-                 * For each taxable liquidity event this year:
-                 * If Taxable = True AND Amount > 0 (inflow):
-                 * Event Tax = Event Amount × Event Tax Rate
-                 * Total Event Taxes = Sum of all event taxes
-               - **Note**: Only positive (inflow) events are taxed; outflows/debts are not taxed
-            
-            7. **Growth** = (Start Balance + Contributions + Liquidity - Withdrawals - Fees - Taxes) × Nominal Return Rate
-            
-            8. **End Balance (Nominal)** = Start Balance + Contributions + Liquidity - Withdrawals - Fees - Taxes + Growth
-            
-            9. **CPI Index** = Compounds annually by (1 + Inflation Rate)^(year - current_year)
-            
-            10. **End Balance (Real)** = End Balance (Nominal) / CPI Index
-            """)
-            
-            st.markdown("#### Important: Withdrawal Frequency Behavior")
-            st.markdown("""
-            **How Withdrawal Frequency Works:**
-            
-            The **Withdrawal Frequency** setting (Annual vs Monthly) determines how to interpret your withdrawal percentage or amount:
-            
-            - **For "Fixed % of prior-year balance" method:**
-              - **Annual**: The % is applied once per year
-                - Example: 4% of $1M = $40,000/year
-              - **Monthly**: The % represents a monthly rate, multiplied by 12
-                - Example: 4% monthly × $1M × 12 months = $480,000/year
-            
-            - **For "Fixed real dollars" method:**
-              - **Annual**: The amount is withdrawn once per year
-                - Example: $50,000 = $50,000/year
-              - **Monthly**: The amount is a monthly withdrawal, multiplied by 12
-                - Example: $50,000/month × 12 months = $600,000/year
-            
-            ⚠️ **Note**: When using Monthly frequency with percentage withdrawals, the percentage is interpreted as a **monthly rate**. 
-            A 4% monthly withdrawal rate equals 48% annually, which is typically unsustainable. For traditional retirement 
-            planning (3-4% annual withdrawal rate), use **Annual** frequency.
-            """)
-            
-            st.markdown("#### Sample Year Calculation (First 3 years)")
-            sample_years = timeline_a.head(3).copy()
-            
-            for idx, row in sample_years.iterrows():
-                st.markdown(f"**Age {int(row['age'])}:**")
-                st.code(f"""
-Start Balance:     ${row['start_balance_nominal']:>15,.2f}
-+ Contributions:   ${row['contributions']:>15,.2f}
-+ Liquidity Net:   ${row['liquidity_net']:>15,.2f}
-- Withdrawals:     ${row['withdrawals']:>15,.2f}
-- Fees:            ${row['fees']:>15,.2f}
-- Taxes:           ${row['taxes']:>15,.2f}
-+ Growth:          ${row['growth']:>15,.2f}
-= End Balance:     ${row['end_balance_nominal']:>15,.2f}
-
-CPI Index:         {row['cpi_index']:>18.4f}
-Real End Balance:  ${row['end_balance_real']:>15,.2f}
-                """, language="text")
-        
-        # Monte Carlo Details
-        if enable_mc and mc_results_a:
-            with st.expander("Monte Carlo Simulation Details", expanded=True):
-                st.markdown("#### Simulation Methodology")
-                st.markdown(f"""
-                **Configuration:**
-                - Number of Simulations: {scenario_a.mc_runs:,}
-                - Random Seed: {MC_SEED} (for reproducibility)
-                - Distribution: Normal(μ={scenario_a.nominal_return_pct}%, σ={scenario_a.return_stdev_pct}%)
+                2. **Contributions** = 
+                   - If age < retirement age: Contribution Amount × (12 if Monthly, else 1)
+                   - If age ≥ retirement age: $0
+                
+                3. **Liquidity Events** = Sum of all applicable events for this age:
+                   - **One-time events** (or Recurrence = "One-time"): Applied only at start_age
+                   - **Recurring events**: Applied every year from start_age to end_age
+                   - **Monthly recurring**: Amount × 12 (annualized)
+                   - **Negative amounts**: Treated as outflows/debts (subtracted from balance)
+                   - **Positive amounts**: Treated as inflows (added to balance)
+                
+                4. **Withdrawals** = 
+                   - If age < retirement age: $0
+                   - If "Fixed % of prior-year balance": 
+                     * Base Amount = Prior Year End Balance × Withdrawal %
+                     * If Monthly frequency: Annual Withdrawals = Base Amount × 12
+                     * If Annual frequency: Annual Withdrawals = Base Amount
+                     * (The % represents monthly or annual rate depending on frequency)
+                   - If "Fixed real dollars": 
+                     * Base Amount = Withdrawal Amount × CPI Index (inflation-adjusted)
+                     * If Monthly frequency: Annual Withdrawals = Base Amount × 12
+                     * If Annual frequency: Annual Withdrawals = Base Amount
+                
+                5. **Fees** = Start Balance × Fee Rate
                 
-                **Process:**
-                1. For each simulation, generate {scenario_a.end_age - scenario_a.current_age + 1} random returns
-                2. Each return follows: Return ~ Normal(μ, σ)
-                3. Run the same timeline calculation with randomized returns
-                4. Record final balance and whether portfolio stayed solvent
+                6. **Taxes** = Tax Component A + Tax Component B
+                   - **Component A (Withdrawal Taxes)**: 
+                     * If Withdrawal Tax Rate > 0: Withdrawals × Withdrawal Tax Rate
+                   - **Component B (Liquidity Event Taxes)**: 
+                     * For each taxable liquidity event this year:
+                     * If Taxable = True AND Amount > 0 (inflow):
+                     * Event Tax = Event Amount × Event Tax Rate
+                     * Total Event Taxes = Sum of all event taxes
+                   - **Note**: Only positive (inflow) events are taxed; outflows/debts are not taxed
                 
-                **Results:**
-                - Probability of Success: {mc_results_a['probability_no_shortfall']*100:.2f}% ({int(mc_results_a['probability_no_shortfall']*scenario_a.mc_runs):,} out of {scenario_a.mc_runs:,} simulations)
-                - P10 Terminal Value: ${mc_results_a['p10_terminal']:,.2f} (10th percentile - worst 10%)
-                - P50 Terminal Value: ${mc_results_a['median_terminal']:,.2f} (median outcome)
-                - P90 Terminal Value: ${mc_results_a['p90_terminal']:,.2f} (90th percentile - best 10%)
+                7. **Growth** = (Start Balance + Contributions + Liquidity - Withdrawals - Fees - Taxes) × Nominal Return Rate
+                
+                8. **End Balance (Nominal)** = Start Balance + Contributions + Liquidity - Withdrawals - Fees - Taxes + Growth
+                
+                9. **CPI Index** = Compounds annually by (1 + Inflation Rate)^(year - current_year)
+                
+                10. **End Balance (Real)** = End Balance (Nominal) / CPI Index
                 """)
-        
-        # Key Metrics Breakdown
-        with st.expander("Key Metrics Calculation", expanded=True):
-            st.markdown("#### Metric Definitions & Values")
-            metrics_breakdown = {
-                "Metric": [
-                    "Terminal Value (Nominal)",
-                    "Terminal Value (Real)",
-                    "First Shortfall Age",
-                    "Total Contributions",
-                    "Total Withdrawals",
-                    "Total Fees Paid",
-                    "Total Taxes Paid",
-                    "Total Growth",
-                    "Net Liquidity Events"
-                ],
-                "Value": [
-                    f"${metrics_a['terminal_nominal']:,.2f}",
-                    f"${metrics_a['terminal_real']:,.2f}",
-                    str(metrics_a['first_shortfall_age']) if metrics_a['first_shortfall_age'] else "None (Solvent)",
-                    f"${timeline_a['contributions'].sum():,.2f}",
-                    f"${timeline_a['withdrawals'].sum():,.2f}",
-                    f"${timeline_a['fees'].sum():,.2f}",
-                    f"${timeline_a['taxes'].sum():,.2f}",
-                    f"${timeline_a['growth'].sum():,.2f}",
-                    f"${timeline_a['liquidity_net'].sum():,.2f}"
-                ],
-                "Description": [
-                    "Final portfolio balance in future dollars (not inflation-adjusted)",
-                    "Final portfolio balance in today's purchasing power (inflation-adjusted)",
-                    "First age where balance becomes negative (indicates insolvency)",
-                    "Sum of all contributions made during accumulation phase",
-                    "Sum of all withdrawals taken during retirement phase",
-                    "Sum of all annual fees/expenses charged to portfolio",
-                    "Sum of all taxes paid on withdrawals and taxable events",
-                    "Sum of all investment returns earned over the planning horizon",
-                    "Sum of all liquidity events (positive = net inflows, negative = net outflows)"
-                ]
-            }
-            st.dataframe(pd.DataFrame(metrics_breakdown), hide_index=True, width="stretch")
-        
-        st.success("Calculation breakdown complete. All logic and formulas are documented above for manual verification.")
+                
+                st.markdown("#### Important: Withdrawal Frequency Behavior")
+                st.markdown("""
+                **How Withdrawal Frequency Works:**
+                
+                The **Withdrawal Frequency** setting (Annual vs Monthly) determines how to interpret your withdrawal percentage or amount:
+                
+                - **For "Fixed % of prior-year balance" method:**
+                  - **Annual**: The % is applied once per year
+                    - Example: 4% of $1M = $40,000/year
+                  - **Monthly**: The % represents a monthly rate, multiplied by 12
+                    - Example: 4% monthly × $1M × 12 months = $480,000/year
+                
+                - **For "Fixed real dollars" method:**
+                  - **Annual**: The amount is withdrawn once per year
+                    - Example: $50,000 = $50,000/year
+                  - **Monthly**: The amount is a monthly withdrawal, multiplied by 12
+                    - Example: $50,000/month × 12 months = $600,000/year
+                
+                ⚠️ **Note**: When using Monthly frequency with percentage withdrawals, the percentage is interpreted as a **monthly rate**. 
+                A 4% monthly withdrawal rate equals 48% annually, which is typically unsustainable. For traditional retirement 
+                planning (3-4% annual withdrawal rate), use **Annual** frequency.
+                """)
+                
+                st.markdown("#### Sample Year Calculation (First 3 years)")
+                sample_years = timeline_a.head(3)
+                sample_table = pd.DataFrame({
+                    'Age': sample_years['age'],
+                    'Start Balance': format_currency(sample_years['start_balance_nominal'], ",.2f"),
+                    '+ Contributions': format_currency(sample_years['contributions'], ",.2f"),
+                    '+ Liquidity Net': format_currency(sample_years['liquidity_net'], ",.2f"),
+                    '- Withdrawals': format_currency(sample_years['withdrawals'], ",.2f"),
+                    '- Fees': format_currency(sample_years['fees'], ",.2f"),
+                    '- Taxes': format_currency(sample_years['taxes'], ",.2f"),
+                    '+ Growth': format_currency(sample_years['growth'], ",.2f"),
+                    '= End Balance': format_currency(sample_years['end_balance_nominal'], ",.2f"),
+                    'CPI Index': sample_years['cpi_index'].map("{:.4f}".format),
+                    'Real End Balance': format_currency(sample_years['end_balance_real'], ",.2f")
+                })
+                st.dataframe(sample_table, hide_index=True, width="stretch")
+            
+            # Monte Carlo Details
+            if enable_mc and mc_results_a:
+                with st.expander("Monte Carlo Simulation Details", expanded=True):
+                    st.markdown("#### Simulation Methodology")
+                    st.markdown(f"""
+                    **Configuration:**
+                    - Number of Simulations: {scenario_a.mc_runs:,}
+                    - Random Seed: {MC_SEED} (for reproducibility)
+                    - Distribution: Normal(μ={scenario_a.nominal_return_pct}%, σ={scenario_a.return_stdev_pct}%)
+                    
+                    **Process:**
+                    1. For each simulation, generate {scenario_a.end_age - scenario_a.current_age + 1} random returns
+                    2. Each return follows: Return ~ Normal(μ, σ)
+                    3. Run the same timeline calculation with randomized returns
+                    4. Record final balance and whether portfolio stayed solvent
+                    
+                    **Results:**
+                    - Probability of Success: {mc_results_a['probability_no_shortfall']*100:.2f}% ({int(mc_results_a['probability_no_shortfall']*scenario_a.mc_runs):,} out of {scenario_a.mc_runs:,} simulations)
+                    - P10 Terminal Value: ${mc_results_a['p10_terminal']:,.2f} (10th percentile - worst 10%)
+                    - P50 Terminal Value: ${mc_results_a['median_terminal']:,.2f} (median outcome)
+                    - P90 Terminal Value: ${mc_results_a['p90_terminal']:,.2f} (90th percentile - best 10%)
+                    """)
+            
+            # Key Metrics Breakdown
+            with st.expander("Key Metrics Calculation", expanded=True):
+                st.markdown("#### Metric Definitions & Values")
+                st.dataframe(admin["metrics"], hide_index=True, width="stretch")
+            
+            st.success("Calculation breakdown complete. All logic and formulas are documented above for manual verification.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Round-trip check for the scenarios file.
+Loads a scenarios.json written by older app versions (one dict per event,
+without the optional enabled/taxable/tax_rate keys) and saves it again.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import app
+
+OLD_FORMAT_SCENARIOS = {
+    "Legacy": {
+        "name": "Legacy",
+        "current_age": 30,
+        "retirement_age": 65,
+        "end_age": 95,
+        "current_balance": 100000.0,
+        "contrib_amount": 500.0,
+        "contrib_cadence": "Monthly",
+        "nominal_return_pct": 7.0,
+        "return_stdev_pct": 15.0,
+        "inflation_pct": 3.0,
+        "fee_pct": 0.5,
+        "withdrawal_method": "Fixed % of prior-year end balance",
+        "withdrawal_pct": 4.0,
+        "withdrawal_real_amount": 50000,
+        "withdrawal_frequency": "Annual",
+        "liquidity_events": [
+            {"type": "Credit", "label": "Sell House", "start_age": 66, "end_age": 66,
+             "amount": 250000.0, "recurrence": "One-time"},
+            {"type": "Debit", "label": "College", "start_age": 45, "end_age": 52,
+             "amount": -20000.0, "recurrence": "Annual", "enabled": False},
+        ],
+        "enable_mc": True,
+        "mc_runs": 1000,
+        "enable_taxes": False,
+        "effective_tax_rate_pct": 15.0,
+    }
+}
+
+
+def test_old_format_file_loads_and_resaves():
+    original_file = app.SCENARIOS_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        app.SCENARIOS_FILE = Path(tmp) / "scenarios.json"
+        try:
+            app.SCENARIOS_FILE.write_text(json.dumps(OLD_FORMAT_SCENARIOS, indent=2))
+            scenarios = app.load_scenarios()
+            app.save_scenarios(scenarios)
+            reloaded = app.load_scenarios()
+        finally:
+            app.SCENARIOS_FILE = original_file
+
+    events = [app.LiquidityEvent.from_dict(dict(e)) for e in reloaded["Legacy"].liquidity_events]
+    assert [e.label for e in events] == ["Sell House", "College"]
+    # Missing optional keys are saved with the LiquidityEvent defaults
+    assert events[0] == app.LiquidityEvent("Credit", "Sell House", 66, 66, 250000.0, "One-time")
+    assert events[1].enabled is False
+    assert events[1].taxable is False and events[1].tax_rate == 0.0
+
+
+if __name__ == "__main__":
+    test_old_format_file_loads_and_resaves()
+    print("Old-format scenarios file loads and re-saves: OK")
@@ -4,21 +4,67 @@ Independent verification of Safe Withdrawal Rate calculation.
 Tests whether the app's SWR calculation is correct.
 """
 
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the simulation core runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _sim_core(initial_balance, years, withdrawal_rate, return_rate, fee_rate):
+    """
+    Print-free simulate_portfolio loop. Returns (final_balance, minimum_balance).
+    Folds the loop-invariant rates into two coefficients, so results match the
+    verbose loop up to floating-point rounding.
+    """
+    growth_factor = 1.0 + return_rate
+    prior_coef = -withdrawal_rate * growth_factor
+    start_coef = (1.0 - fee_rate) * growth_factor
+    balance = initial_balance
+    min_balance = balance
+    prior_year_balance = balance
+    
+    for year in range(years):
+        balance = balance * start_coef + prior_year_balance * prior_coef
+        if balance < min_balance:
+            min_balance = balance
+        prior_year_balance = balance
+    
+    return balance, min_balance
+
+
 def simulate_portfolio(
     initial_balance: float,
     years: int,
     withdrawal_rate: float,  # as decimal (e.g., 0.04 for 4%)
     return_rate: float,  # as decimal (e.g., 0.07 for 7%)
     fee_rate: float = 0.0,
-    inflation_rate: float = 0.0
+    inflation_rate: float = 0.0,
+    verbose: bool = False
 ) -> tuple[float, float]:
     """
     Simulate portfolio balance over time with percentage-based withdrawals.
+    Prints every year when verbose, otherwise runs the compiled _sim_core.
     Returns (final_balance, minimum_balance)
     """
+    if not verbose:
+        return _sim_core(
+            float(initial_balance), int(years), float(withdrawal_rate),
+            float(return_rate), float(fee_rate)
+        )
+    
     balance = initial_balance
     min_balance = balance
     prior_year_balance = balance
+    lines = []
     
     for year in range(years):
         # Start balance
@@ -46,56 +92,168 @@ def simulate_portfolio(
         # Update prior year balance for next iteration
         prior_year_balance = balance
         
-        print(f"Year {year+1}: Start=${start_balance:,.0f}, Withdrawal=${withdrawal:,.0f}, "
-              f"Growth=${growth:,.0f}, End=${balance:,.0f}")
+        lines.append(f"Year {year+1}: Start=${start_balance:,.0f}, Withdrawal=${withdrawal:,.0f}, "
+                     f"Growth=${growth:,.0f}, End=${balance:,.0f}")
     
+    if lines:
+        print("\n".join(lines))
     return balance, min_balance
 
 
+def _min_balance_closed_form(
+    initial_balance: float,
+    years: int,
+    withdrawal_rate,
+    return_rate: float,
+    fee_rate: float = 0.0
+):
+    """
+    Minimum balance of simulate_portfolio's path, without stepping through the years.
+    
+    Withdrawals are taken on the prior year's ending balance, which is also this
+    year's start balance, so every year scales the balance by the same factor
+    q = (1 - withdrawal_rate - fee_rate) * (1 + return_rate), i.e. B_n = initial * q^n.
+    Odd and even years are each monotone, so the extremes sit at n = 1, 2, years-1, years.
+    Any argument but years may be an array; they broadcast together.
+    """
+    initial_balance = np.asarray(initial_balance, dtype=float)
+    q = (1.0 - np.asarray(withdrawal_rate, dtype=float) - fee_rate) * (1.0 + return_rate)
+    min_balance = np.array(np.broadcast_to(initial_balance, np.broadcast_shapes(initial_balance.shape, q.shape)))
+    for n in {n for n in (1, 2, years - 1, years) if 1 <= n <= years}:
+        np.minimum(min_balance, initial_balance * q ** n, out=min_balance)
+    return min_balance[()]
+
+
+def accumulated_balance(
+    initial_balance: float,
+    contribution: float,
+    years,
+    return_rate: float,
+    fee_rate: float = 0.0
+):
+    """
+    Balance after `years` of (balance + contribution - fees) * (1 + return_rate).
+    Geometric series in g = (1 - fee_rate) * (1 + return_rate); years may be an array.
+    """
+    g = (1.0 - fee_rate) * (1.0 + return_rate)
+    n = np.asarray(years, dtype=float)
+    gn = g ** n
+    series = n if g == 1.0 else (gn - 1.0) / (g - 1.0)
+    return initial_balance * gn + contribution * (1.0 + return_rate) * series
+
+
 def find_safe_withdrawal_rate(
     initial_balance: float,
     years: int,
     return_rate: float,
     fee_rate: float = 0.0,
     tolerance: float = 0.0001,
-    max_iterations: int = 50
+    max_iterations: int = 50,
+    grid_size: int = 4096,
+    initial_bracket: tuple[float, float] = (0.0, 0.20),
+    prev_rate: Optional[float] = None
 ) -> float:
     """
-    Binary search to find maximum withdrawal rate where balance never goes negative.
+    Find the maximum withdrawal rate where balance never goes negative.
+    Evaluates a grid of candidate rates in one vectorized pass, then bisects
+    between the last solvent and first negative grid rate if the grid is
+    coarser than tolerance. Passing prev_rate from a related search (same years,
+    return and fee) starts from a window of +/-1% around it.
     Returns safe withdrawal rate as decimal (e.g., 0.0399 for 3.99%).
     """
-    low, high = 0.0, 0.20  # Search between 0% and 20%
+    low, high = initial_bracket  # Search between 0% and 20% by default
     best_rate = 0.0
+    window = (low, high) if prev_rate is None else (max(low, prev_rate - 0.01), min(high, prev_rate + 0.01))
     
-    print(f"\n=== Finding Safe Withdrawal Rate ===")
+    print("\n=== Finding Safe Withdrawal Rate ===")
     print(f"Parameters: Balance=${initial_balance:,.0f}, Years={years}, Return={return_rate*100:.1f}%, Fee={fee_rate*100:.2f}%")
-    print(f"\nBinary Search Iterations:")
     
-    for iteration in range(max_iterations):
-        mid = (low + high) / 2.0
+    rates = np.linspace(window[0], window[1], grid_size)
+    solvent = _min_balance_closed_form(initial_balance, years, rates, return_rate, fee_rate) >= 0
+    if (solvent.all() and window[1] < high) or (not solvent.any() and window[0] > low):
+        # Answer lies outside the warm-start window; search the full bracket
+        rates = np.linspace(low, high, grid_size)
+        solvent = _min_balance_closed_form(initial_balance, years, rates, return_rate, fee_rate) >= 0
+    print(f"\nGrid Search: {grid_size} rates from {rates[0]*100:.2f}% to {rates[-1]*100:.2f}% → "
+          f"{int(solvent.sum())} solvent")
+    
+    if solvent.any():
+        idx = int(np.flatnonzero(solvent)[-1])
+        best_rate = float(rates[idx])
         
-        # Test this withdrawal rate
-        final_balance, min_balance = simulate_portfolio(
-            initial_balance, years, mid, return_rate, fee_rate
-        )
+        if idx + 1 < grid_size:
+            # Refine between the last solvent and first negative grid rate,
+            # testing 7 evenly spaced rates per step (bracket shrinks 8x per step)
+            low, high = best_rate, float(rates[idx + 1])
+            print("\nRefinement:")
+            
+            for iteration in range(max_iterations):
+                if high - low < tolerance:
+                    break
+                
+                mids = np.linspace(low, high, 9)[1:-1]
+                min_balances = _min_balance_closed_form(initial_balance, years, mids, return_rate, fee_rate)
+                n_solvent = int(np.count_nonzero(min_balances >= 0))
+                
+                if n_solvent:
+                    best_rate = low = float(mids[n_solvent - 1])
+                if n_solvent < len(mids):
+                    high = float(mids[n_solvent])
+                
+                print(f"Iter {iteration+1}: Rates={mids[0]*100:.4f}%-{mids[-1]*100:.4f}% → "
+                      f"{n_solvent}/{len(mids)} solvent, bracket {low*100:.4f}%-{high*100:.4f}%")
+    
+    print(f"\n=== RESULT: Safe Withdrawal Rate = {best_rate*100:.4f}% ===\n")
+    
+    # Cross-check the closed form against the year-by-year simulation at the result
+    print("Year-by-year check at the safe withdrawal rate:")
+    simulate_portfolio(initial_balance, years, best_rate, return_rate, fee_rate, verbose=True)
+    return best_rate
+
+
+def find_safe_withdrawal_rate_batch(
+    initial_balances,
+    years: int,
+    return_rates,
+    fee_rates,
+    tolerance: float = 0.0001,
+    max_iterations: int = 50,
+    initial_bracket: tuple[float, float] = (0.0, 0.20)
+) -> np.ndarray:
+    """
+    Safe withdrawal rate for many (initial_balance, return_rate, fee_rate) scenarios at once.
+    Inputs broadcast to a common shape; every scenario is bisected in lockstep with
+    array ops, and scenarios solvent at the top of the bracket return it directly.
+    Prints nothing. Returns an array of rates as decimals.
+    """
+    initial_balances, return_rates, fee_rates = np.broadcast_arrays(
+        np.asarray(initial_balances, dtype=float),
+        np.asarray(return_rates, dtype=float),
+        np.asarray(fee_rates, dtype=float)
+    )
+    low = np.full(initial_balances.shape, float(initial_bracket[0]))
+    high = np.full(initial_balances.shape, float(initial_bracket[1]))
+    best_rates = np.zeros(initial_balances.shape)
+    
+    solvent_at_high = _min_balance_closed_form(initial_balances, years, high, return_rates, fee_rates) >= 0
+    best_rates[solvent_at_high] = high[solvent_at_high]
+    active = ~solvent_at_high
+    
+    for iteration in range(max_iterations):
+        if not active.any():
+            break
         
-        if min_balance >= 0:
-            # Success, try higher
-            best_rate = mid
-            low = mid
-            result = "✓ SOLVENT"
-        else:
-            # Failed, try lower
-            high = mid
-            result = "✗ NEGATIVE"
+        mid = (low + high) / 2.0
+        solvent = _min_balance_closed_form(initial_balances, years, mid, return_rates, fee_rates) >= 0
         
-        print(f"Iter {iteration+1}: Rate={mid*100:.4f}% → Min Balance=${min_balance:,.0f} {result}")
+        raise_low = active & solvent
+        best_rates[raise_low] = low[raise_low] = mid[raise_low]
+        lower_high = active & ~solvent
+        high[lower_high] = mid[lower_high]
         
-        if high - low < tolerance:
-            break
+        active &= (high - low) >= tolerance
     
-    print(f"\n=== RESULT: Safe Withdrawal Rate = {best_rate*100:.4f}% ===\n")
-    return best_rate
+    return best_rates
 
 
 if __name__ == "__main__":
@@ -138,17 +296,14 @@ if __name__ == "__main__":
     fee_rate = 0.005
     
     print("\nACCUMULATION PHASE (Age 30-64, 35 years):")
-    for year in range(35):
-        age = 30 + year
-        start_balance = balance
-        fees = start_balance * fee_rate
-        balance_after_cashflows = start_balance + contribution - fees
-        growth = balance_after_cashflows * return_rate
-        balance = balance_after_cashflows + growth
-        
-        if year == 0 or year == 34 or year % 10 == 9:
-            print(f"Age {age}: Start=${start_balance:,.0f}, Contrib=${contribution:,.0f}, "
-                  f"Growth=${growth:,.0f}, End=${balance:,.0f}")
+    checkpoint_years = np.array([0, 9, 19, 29, 34])
+    start_balances = accumulated_balance(balance, contribution, checkpoint_years, return_rate, fee_rate)
+    end_balances = accumulated_balance(balance, contribution, checkpoint_years + 1, return_rate, fee_rate)
+    growths = (start_balances + contribution - start_balances * fee_rate) * return_rate
+    for year, start_balance, growth, end_balance in zip(checkpoint_years, start_balances, growths, end_balances):
+        print(f"Age {30 + year}: Start=${start_balance:,.0f}, Contrib=${contribution:,.0f}, "
+              f"Growth=${growth:,.0f}, End=${end_balance:,.0f}")
+    balance = float(end_balances[-1])
     
     print(f"\nBalance at retirement (age 65): ${balance:,.0f}")
     
@@ -158,5 +313,6 @@ if __name__ == "__main__":
         initial_balance=balance,
         years=30,
         return_rate=0.07,
-        fee_rate=0.005
+        fee_rate=0.005,
+        prev_rate=swr  # Same years/return/fee as TEST 2
     )